@@ -0,0 +1,201 @@
+"""Análise em lote de partidas gravadas: refaz cada partida no Board, avalia todas as posições
+com o engine (profundidade ou tempo fixos) e aponta os erros graves, as jogadas que perdem
+muito em relação à melhor.
+
+Lê arquivos de game_record.py e os JSON por linha do self_play.py. As partidas são divididas
+entre processos em blocos de `--chunk-size`, e cada uma gera um relatório JSON em `--output`.
+
+    python analyze.py games.pdn --depth 6 --workers 8 --output reports
+    python analyze.py games.jsonl --time-ms 200 --threshold 200
+"""
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from board import Board
+from engine import Engine
+from game_record import RESULTS, GameRecord, read_games, replay
+from move import Move
+from self_play import PLAYER_NAMES
+
+DEFAULT_DEPTH = 6
+DEFAULT_THRESHOLD = 150 # Perda, do ponto de vista de quem jogou, para um erro grave (1,5 peão)
+DEFAULT_TT_MB = 16
+SCORE_LIMIT = 3000 # Scores de vitória forçada são limitados a isto ao calcular as perdas
+MAX_FORCED_PLIES = 64 # Lances forçados seguidos percorridos antes de buscar mesmo assim
+NO_TIME_LIMIT_MS = 10 ** 9
+PROGRESS_INTERVAL = 1.0 # Segundos entre linhas de progresso
+
+_engine: Optional[Engine] = None # Um motor por processo, para reaproveitar a tabela de transposição
+_options: Dict = {}
+
+
+def read_self_play_games(path: str) -> Iterator[GameRecord]:
+    """Partidas de um arquivo JSON por linha gerado por self_play.py"""
+
+    owners = {name: owner for owner, name in PLAYER_NAMES.items()}
+    with open(path) as games:
+        for line in games:
+            if line.strip():
+                game = json.loads(line)
+                tags = {"Player1": game["player1"], "Player2": game["player2"], "Round": str(game["game"])}
+                yield GameRecord(tags, game["moves"], RESULTS[owners.get(game["winner"])])
+
+
+def load_games(path: str) -> Iterator[GameRecord]:
+    if path.endswith((".jsonl", ".json")):
+        return read_self_play_games(path)
+    return read_games(path)
+
+
+def position_score(board: Board, engine: Engine, time_ms: int, depth: int) -> Tuple[int, Optional[Move]]:
+    """(score para quem joga, melhor lance). O engine não busca quando só há um lance, então
+    posições forçadas recebem o score da primeira posição com escolha depois delas (até
+    MAX_FORCED_PLIES lances)"""
+
+    forced_move = None
+    plies = 0
+    try:
+        while plies < MAX_FORCED_PLIES:
+            moves = board.generate_legal_moves()
+            if len(moves) != 1:
+                break
+            forced_move = forced_move or moves[0]
+            board.make_move(moves[0])
+            plies += 1
+        result = engine.search(board, time_ms, depth)
+    finally:
+        for _ in range(plies):
+            board.unmake_move()
+    score = -result.score if plies % 2 else result.score
+    return score, forced_move if plies else result.best_move
+
+
+def _clamp(score: int) -> int:
+    return max(-SCORE_LIMIT, min(SCORE_LIMIT, score))
+
+
+def analyze_game(record: GameRecord, engine: Engine, time_ms: int, depth: int, threshold: int) -> Dict:
+    """Avalia as posições de uma partida e as perdas de cada jogada.
+
+    O score de cada posição é do ponto de vista de quem joga nela, então a perda da jogada i é
+    score[i] + score[i + 1]: o que quem jogou podia ter menos o que sobrou depois do lance."""
+
+    played = []
+    scores = []
+    board = None
+    for board, move in replay(record):
+        score, best_move = position_score(board, engine, time_ms, depth)
+        played.append((move, best_move))
+        scores.append(score)
+    if board is not None: # replay já aplicou a última jogada
+        scores.append(position_score(board, engine, time_ms, depth)[0])
+
+    moves = []
+    blunders = []
+    for ply, (move, best_move) in enumerate(played):
+        loss = max(0, _clamp(scores[ply]) + _clamp(scores[ply + 1]))
+        entry = {
+            "ply": ply,
+            "move": move.notation,
+            "best": best_move.notation if best_move is not None else None,
+            "score": scores[ply],
+            "loss": loss,
+        }
+        moves.append(entry)
+        if loss >= threshold and best_move != move:
+            blunders.append(entry)
+    return {"tags": record.tags, "result": record.result, "plies": len(played), "moves": moves, "blunders": blunders}
+
+
+def _init_worker(options: Dict) -> None:
+    global _engine, _options
+    _engine = Engine(options["tt_mb"])
+    _options = options
+
+
+def _analyze_task(task: Tuple[str, int, GameRecord]) -> Dict:
+    source, index, record = task
+    start = time.perf_counter()
+    # A tabela muda os scores da busca; limpa a cada partida para o relatório não depender da divisão do trabalho
+    _engine.transposition_table.clear()
+    try:
+        report = analyze_game(record, _engine, _options["time_ms"], _options["depth"], _options["threshold"])
+    except Exception as error: # Jogada ilegal, arquivo corrompido ou falha na análise: a partida é pulada
+        report = {"tags": record.tags, "result": record.result, "error": f"{type(error).__name__}: {error}",
+                  "moves": [], "blunders": []}
+    report.update(source=source, game=index, time_ms=round((time.perf_counter() - start) * 1000, 1))
+    if _options["output"]:
+        name = f"{os.path.splitext(os.path.basename(source))[0]}-{index:06d}.json"
+        with open(os.path.join(_options["output"], name), "w") as output:
+            json.dump(report, output, indent=1)
+    return report
+
+
+def _tasks(paths: List[str]) -> Iterator[Tuple[str, int, GameRecord]]:
+    for path in paths:
+        for index, record in enumerate(load_games(path)):
+            yield path, index, record
+
+
+def analyze_files(paths: List[str], options: Dict, workers: int = 1, chunk_size: int = 4) -> Iterator[Dict]:
+    """Gera os relatórios das partidas dos arquivos, na ordem em que terminam"""
+
+    if workers > 1:
+        from multiprocessing import Pool
+
+        with Pool(workers, _init_worker, (options,)) as pool:
+            yield from pool.imap_unordered(_analyze_task, _tasks(paths), chunksize=chunk_size)
+    else:
+        _init_worker(options)
+        for task in _tasks(paths):
+            yield _analyze_task(task)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analisa partidas gravadas com o engine e aponta os erros graves.")
+    parser.add_argument("paths", nargs="+", help="arquivos de game_record.py ou JSON por linha do self_play.py")
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument("--depth", type=int, help=f"profundidade fixa por posição (padrão: {DEFAULT_DEPTH})")
+    limit.add_argument("--time-ms", type=int, help="tempo fixo por posição, em ms")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="perda mínima de um erro grave")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=4, help="partidas por unidade de trabalho")
+    parser.add_argument("--tt-mb", type=float, default=DEFAULT_TT_MB, help="tabela de transposição por processo, em MB")
+    parser.add_argument("--output", help="diretório dos relatórios por partida")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    if args.time_ms is not None:
+        time_ms, depth = args.time_ms, 64
+    else:
+        time_ms, depth = NO_TIME_LIMIT_MS, args.depth or DEFAULT_DEPTH
+    options = {"time_ms": time_ms, "depth": depth, "threshold": args.threshold, "tt_mb": args.tt_mb,
+               "output": args.output}
+    total = sum(1 for _ in _tasks(args.paths)) # Só lê os arquivos, para o progresso ter um total
+
+    games = plies = blunders = errors = 0
+    start = last_report = time.perf_counter()
+    for report in analyze_files(args.paths, options, args.workers, max(1, args.chunk_size)):
+        games += 1
+        plies += len(report["moves"])
+        blunders += len(report["blunders"])
+        errors += "error" in report
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_INTERVAL or games == total:
+            print(f"\r{games}/{total} games, {plies} positions, {blunders} blunders, "
+                  f"{games / (now - start):.1f} games/s", end="", file=sys.stderr, flush=True)
+            last_report = now
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"{games} games ({errors} skipped), {plies} positions, {blunders} blunders in {elapsed:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Representação em lote de muitos tabuleiros com NumPy.
+
+Cada posição ocupa uma linha de um array (N, 3) de uint64 com os bitboards do player1,
+do player2 e das damas, mais um array booleano com o lado que deve jogar. Material,
+damas, mobilidade, capturas disponíveis e avaliação são calculados para as N posições
+de uma vez, com operações vetorizadas sobre os bitboards.
+"""
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from bitboard import BOARD_SIZE, DOWN, KING_DIRECTIONS, LEFT, RIGHT, UP, man_directions
+from engine.evaluation import KING_VALUE, MAN_VALUE, PLAYER1_ADVANCE, PLAYER2_ADVANCE
+from owner import Owner
+
+PLAYER1 = 0 # Colunas do array de bitboards
+PLAYER2 = 1
+KINGS = 2
+
+# Códigos da grade (N, 8, 8): positivos para o player1, negativos para o player2
+EMPTY = 0
+MAN = 1
+KING = 2
+
+_SQUARE_BITS = np.array([1 << square for square in range(BOARD_SIZE * BOARD_SIZE)], dtype=np.uint64)
+_BYTE_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def _direction(direction: Tuple[int, int]) -> Tuple[int, np.uint64, np.uint64]:
+    delta, mask = direction
+    return delta, np.uint64(abs(delta)), np.uint64(mask)
+
+
+_UP, _DOWN, _LEFT, _RIGHT = (_direction(direction) for direction in (UP, DOWN, LEFT, RIGHT))
+_KING_DIRECTIONS = tuple(_direction(direction) for direction in KING_DIRECTIONS)
+_MAN_DIRECTIONS_UP = tuple(_direction(direction) for direction in man_directions(UP))
+_MAN_DIRECTIONS_DOWN = tuple(_direction(direction) for direction in man_directions(DOWN))
+_OPPOSITES = {_UP[0]: _DOWN, _DOWN[0]: _UP, _LEFT[0]: _RIGHT, _RIGHT[0]: _LEFT}
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """Número de casas marcadas em cada bitboard do array"""
+
+    if hasattr(np, "bitwise_count"): # NumPy >= 2.0
+        return np.bitwise_count(bits).astype(np.int32)
+    as_bytes = np.ascontiguousarray(bits, dtype=np.uint64).view(np.uint8).reshape(bits.shape + (8,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int32)
+
+
+def shift(bits: np.ndarray, direction: Tuple[int, np.uint64, np.uint64]) -> np.ndarray:
+    """Versão vetorizada de bitboard.shift"""
+
+    delta, amount, mask = direction
+    bits = bits & mask
+    return bits << amount if delta > 0 else bits >> amount
+
+
+class BoardBatch:
+    """N posições empacotadas em bitplanes uint64"""
+
+    def __init__(self, bitboards: np.ndarray, player1_to_move: np.ndarray) -> None:
+        bitboards = np.asarray(bitboards, dtype=np.uint64)
+        player1_to_move = np.asarray(player1_to_move, dtype=bool)
+        if bitboards.ndim != 2 or bitboards.shape[1] != 3:
+            raise ValueError(f"Bitboards must have shape (N, 3). Instead, shape is {bitboards.shape}")
+        if player1_to_move.shape != (bitboards.shape[0],):
+            raise ValueError(f"Side to move must have shape ({bitboards.shape[0]},). "
+                             f"Instead, shape is {player1_to_move.shape}")
+        self._bitboards = bitboards
+        self._player1_to_move = player1_to_move
+
+    @classmethod
+    def from_boards(cls, boards: Iterable) -> "BoardBatch":
+        """Empacota Boards (ou qualquer objeto com bitboard e side_to_move)"""
+
+        rows = []
+        sides = []
+        for board in boards:
+            bb = board.bitboard
+            rows.append((bb.player1, bb.player2, bb.kings))
+            sides.append(board.side_to_move == Owner.PLAYER1.value)
+        return cls(np.array(rows, dtype=np.uint64).reshape(-1, 3), np.array(sides, dtype=bool))
+
+    @classmethod
+    def from_bitboards(cls, states: Iterable[Tuple[int, int, int, bool]]) -> "BoardBatch":
+        """Empacota tuplas (player1, player2, kings, player1_to_move)"""
+
+        rows = []
+        sides = []
+        for player1, player2, kings, player1_to_move in states:
+            rows.append((player1, player2, kings))
+            sides.append(player1_to_move)
+        return cls(np.array(rows, dtype=np.uint64).reshape(-1, 3), np.array(sides, dtype=bool))
+
+    @classmethod
+    def from_grid(cls, grid: np.ndarray, player1_to_move: np.ndarray) -> "BoardBatch":
+        """Empacota uma grade (N, 8, 8) com os códigos EMPTY, ±MAN e ±KING"""
+
+        grid = np.asarray(grid).reshape(-1, BOARD_SIZE * BOARD_SIZE)
+        bitboards = np.empty((grid.shape[0], 3), dtype=np.uint64)
+        bitboards[:, PLAYER1] = np.bitwise_or.reduce(np.where(grid > 0, _SQUARE_BITS, 0), axis=1)
+        bitboards[:, PLAYER2] = np.bitwise_or.reduce(np.where(grid < 0, _SQUARE_BITS, 0), axis=1)
+        bitboards[:, KINGS] = np.bitwise_or.reduce(np.where(np.abs(grid) == KING, _SQUARE_BITS, 0), axis=1)
+        return cls(bitboards, player1_to_move)
+
+    def __len__(self) -> int:
+        return self._bitboards.shape[0]
+
+    @property
+    def bitboards(self) -> np.ndarray:
+        """Array (N, 3) de uint64: player1, player2 e damas"""
+
+        return self._bitboards
+
+    @property
+    def player1_to_move(self) -> np.ndarray:
+        return self._player1_to_move
+
+    @property
+    def player1(self) -> np.ndarray:
+        return self._bitboards[:, PLAYER1]
+
+    @property
+    def player2(self) -> np.ndarray:
+        return self._bitboards[:, PLAYER2]
+
+    @property
+    def kings(self) -> np.ndarray:
+        return self._bitboards[:, KINGS]
+
+    def to_grid(self) -> np.ndarray:
+        """Grade (N, 8, 8) de int8 com os códigos EMPTY, ±MAN e ±KING"""
+
+        occupied1 = (self.player1[:, None] & _SQUARE_BITS) != 0
+        occupied2 = (self.player2[:, None] & _SQUARE_BITS) != 0
+        is_king = (self.kings[:, None] & _SQUARE_BITS) != 0
+        value = np.where(is_king, KING, MAN).astype(np.int8)
+        grid = np.where(occupied1, value, np.where(occupied2, -value, EMPTY)).astype(np.int8)
+        return grid.reshape(-1, BOARD_SIZE, BOARD_SIZE)
+
+    def piece_counts(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(peões do player1, damas do player1, peões do player2, damas do player2)"""
+
+        kings = self.kings
+        return (popcount(self.player1 & ~kings), popcount(self.player1 & kings),
+                popcount(self.player2 & ~kings), popcount(self.player2 & kings))
+
+    def material(self) -> np.ndarray:
+        """Material do player1 menos o do player2, com os valores do engine"""
+
+        men1, kings1, men2, kings2 = self.piece_counts()
+        return (men1 - men2) * MAN_VALUE + (kings1 - kings2) * KING_VALUE
+
+    def evaluate(self) -> np.ndarray:
+        """Mesmo resultado de engine.evaluation.evaluate_bitboards, do ponto de vista de quem joga"""
+
+        kings = self.kings
+        men1 = self.player1 & ~kings
+        men2 = self.player2 & ~kings
+        score = self.material()
+        for row_mask, bonus in PLAYER1_ADVANCE:
+            score += popcount(men1 & np.uint64(row_mask)) * bonus
+        for row_mask, bonus in PLAYER2_ADVANCE:
+            score -= popcount(men2 & np.uint64(row_mask)) * bonus
+        return np.where(self._player1_to_move, score, -score)
+
+    def _sides(self, owner: int) -> Tuple[np.ndarray, np.ndarray, Tuple]:
+        if owner == Owner.PLAYER1.value:
+            return self.player1, self.player2, _MAN_DIRECTIONS_UP
+        return self.player2, self.player1, _MAN_DIRECTIONS_DOWN
+
+    def _capture_sources(self, owner: int) -> np.ndarray:
+        """Bitboard das peças do lado que podem iniciar uma captura"""
+
+        own, enemy, directions = self._sides(owner)
+        empty = ~(own | enemy)
+        men = own & ~self.kings
+        own_kings = own & self.kings
+        sources = np.zeros_like(own)
+        for direction in directions:
+            # Peão: inimigo ao lado e casa vazia logo depois; volta até a origem
+            landing = shift(shift(men, direction) & enemy, direction) & empty
+            sources |= shift(shift(landing, _opposite(direction)), _opposite(direction))
+        for direction in _KING_DIRECTIONS:
+            # Dama: desliza por casas vazias, encontra um inimigo e precisa da casa seguinte vazia
+            opposite = _opposite(direction)
+            landing = shift(shift(own_kings, direction) & enemy, direction) & empty
+            sources |= _slide_back(landing, opposite, own_kings, empty)
+            ray = shift(own_kings, direction) & empty
+            while ray.any():
+                landing = shift(shift(ray, direction) & enemy, direction) & empty
+                sources |= _slide_back(landing, opposite, own_kings, empty)
+                ray = shift(ray, direction) & empty
+        return sources
+
+    def _step_targets(self, owner: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(número de passos simples, bitboard das peças que podem dar um passo)"""
+
+        own, enemy, directions = self._sides(owner)
+        empty = ~(own | enemy)
+        men = own & ~self.kings
+        own_kings = own & self.kings
+        count = np.zeros(len(self), dtype=np.int32)
+        sources = np.zeros_like(own)
+        for direction in directions:
+            targets = shift(men, direction) & empty
+            count += popcount(targets)
+            sources |= shift(targets, _opposite(direction))
+        for direction in _KING_DIRECTIONS:
+            ray = shift(own_kings, direction) & empty
+            sources |= shift(ray, _opposite(direction)) & own_kings
+            while ray.any():
+                count += popcount(ray)
+                ray = shift(ray, direction) & empty
+        return count, sources
+
+    def can_capture(self, owner: int) -> np.ndarray:
+        """Se o lado tem alguma captura disponível (e, portanto, obrigatória)"""
+
+        return self._capture_sources(owner) != 0
+
+    def mobility(self, owner: int) -> np.ndarray:
+        """Número de passos simples do lado (peões e deslizes das damas), sem considerar capturas"""
+
+        return self._step_targets(owner)[0]
+
+    def moveable_pieces(self, owner: int) -> np.ndarray:
+        """Número de peças que podem jogar, como get_moveable_pieces: se houver captura,
+        só as peças que capturam"""
+
+        captures = self._capture_sources(owner)
+        steps = self._step_targets(owner)[1]
+        return popcount(np.where(captures != 0, captures, steps))
+
+
+def _opposite(direction: Tuple[int, np.uint64, np.uint64]) -> Tuple[int, np.uint64, np.uint64]:
+    return _OPPOSITES[direction[0]]
+
+
+def _slide_back(landing: np.ndarray, opposite: Tuple[int, np.uint64, np.uint64],
+                kings: np.ndarray, empty: np.ndarray) -> np.ndarray:
+    """Dadas as casas de pouso de uma captura de dama, volta pelo raio (pulando a peça
+    capturada e as casas vazias) até encontrar as damas que a iniciaram"""
+
+    ray = shift(shift(landing, opposite), opposite)
+    found = ray & kings
+    ray &= empty
+    while ray.any():
+        ray = shift(ray, opposite)
+        found |= ray & kings
+        ray &= empty
+    return found
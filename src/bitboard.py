@@ -0,0 +1,375 @@
+from typing import Iterator, List, Optional, Tuple
+from move import Move
+
+BOARD_SIZE = 8
+NUM_SQUARES = BOARD_SIZE * BOARD_SIZE
+FULL = (1 << NUM_SQUARES) - 1
+
+# Casa = row * 8 + col, com a origem no canto superior esquerdo (mesma convenção de Position)
+ROW_0 = 0xFF
+ROW_7 = ROW_0 << (8 * 7)
+COL_0 = 0x0101010101010101
+COL_7 = COL_0 << 7
+
+# Direções: (deslocamento da casa, máscara das casas que podem andar nessa direção)
+UP = (-8, FULL & ~ROW_0)
+DOWN = (8, FULL & ~ROW_7)
+LEFT = (-1, FULL & ~COL_0)
+RIGHT = (1, FULL & ~COL_7)
+
+KING_DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+
+def square_of(row: int, col: int) -> int:
+    """Retorna o índice da casa (0 a 63) de uma coordenada"""
+
+    return row * BOARD_SIZE + col
+
+
+def row_col(square: int) -> Tuple[int, int]:
+    """Retorna (row, col) de um índice de casa"""
+
+    return divmod(square, BOARD_SIZE)
+
+
+def iter_squares(bits: int) -> Iterator[int]:
+    """Percorre os índices das casas marcadas em um bitboard, do menor para o maior"""
+
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def shift(bits: int, direction: Tuple[int, int]) -> int:
+    """Desloca todas as casas marcadas uma casa na direção dada, descartando as que saem do tabuleiro"""
+
+    delta, mask = direction
+    bits &= mask
+    return bits << delta if delta > 0 else bits >> -delta
+
+
+def man_directions(forward: Tuple[int, int]) -> Tuple[Tuple[int, int], ...]:
+    """Direções de um peão: frente, esquerda e direita"""
+
+    return (forward, LEFT, RIGHT)
+
+
+def man_step_targets(men: int, empty: int, forward: Tuple[int, int]) -> int:
+    """Casas vazias alcançáveis por um passo simples de algum dos peões"""
+
+    return (shift(men, forward) | shift(men, LEFT) | shift(men, RIGHT)) & empty
+
+
+def man_jump_targets(men: int, enemy: int, empty: int, forward: Tuple[int, int]) -> int:
+    """Casas de pouso de capturas possíveis para algum dos peões"""
+
+    targets = 0
+    for delta, mask in (forward, LEFT, RIGHT):
+        if delta > 0:
+            targets |= ((((men & mask) << delta) & enemy & mask) << delta) & empty
+        else:
+            targets |= ((((men & mask) >> -delta) & enemy & mask) >> -delta) & empty
+    return targets
+
+
+def man_jump_sources(men: int, enemy: int, empty: int, forward: Tuple[int, int]) -> int:
+    """Peões que têm ao menos uma captura disponível"""
+
+    sources = 0
+    for delta, mask in (forward, LEFT, RIGHT):
+        if delta > 0:
+            landing = ((((men & mask) << delta) & enemy & mask) << delta) & empty
+            sources |= landing >> (2 * delta)
+        else:
+            landing = ((((men & mask) >> -delta) & enemy & mask) >> -delta) & empty
+            sources |= landing << (-2 * delta)
+    return sources
+
+
+def _build_man_jumps(forward: Tuple[int, int]) -> List[Tuple[Tuple[int, int], ...]]:
+    jumps = []
+    for square in range(NUM_SQUARES):
+        bit = 1 << square
+        square_jumps = []
+        for direction in man_directions(forward):
+            mid = shift(bit, direction)
+            landing = shift(mid, direction)
+            if landing:
+                square_jumps.append((mid, landing))
+        jumps.append(tuple(square_jumps))
+    return jumps
+
+
+# Pares (casa capturada, pouso) das capturas de um peão em cada casa
+MAN_JUMPS_UP = _build_man_jumps(UP)
+MAN_JUMPS_DOWN = _build_man_jumps(DOWN)
+
+
+def _build_rays() -> List[Tuple[Tuple[int, ...], ...]]:
+    rays = []
+    for square in range(NUM_SQUARES):
+        square_rays = []
+        for direction in KING_DIRECTIONS:
+            ray = []
+            bits = 1 << square
+            while True:
+                bits = shift(bits, direction)
+                if not bits:
+                    break
+                ray.append(bits.bit_length() - 1)
+            square_rays.append(tuple(ray))
+        rays.append(tuple(square_rays))
+    return rays
+
+
+# RAYS[casa][direção] = casas percorridas por uma dama nessa direção, em ordem
+RAYS = _build_rays()
+
+
+def king_targets(square: int, own: int, enemy: int) -> Tuple[int, int]:
+    """Retorna (passos simples, pousos de captura) de uma dama, como bitboards.
+
+    Assim como no Board, a dama só pousa na casa imediatamente após a peça capturada."""
+
+    occupied = own | enemy
+    steps = 0
+    captures = 0
+    for ray in RAYS[square]:
+        for index, target in enumerate(ray):
+            bit = 1 << target
+            if not occupied & bit:
+                steps |= bit
+                continue
+            if enemy & bit and index + 1 < len(ray):
+                landing = 1 << ray[index + 1]
+                if not occupied & landing:
+                    captures |= landing
+            break
+    return steps, captures
+
+
+class Bitboard:
+    """Representação do tabuleiro em três inteiros de 64 bits: peças do player1,
+    peças do player2 e damas (de ambos)."""
+
+    __slots__ = ("player1", "player2", "kings")
+
+    def __init__(self) -> None:
+        self.player1: int = 0
+        self.player2: int = 0
+        self.kings: int = 0
+
+    @property
+    def occupied(self) -> int:
+        return self.player1 | self.player2
+
+    @property
+    def empty(self) -> int:
+        return ~(self.player1 | self.player2) & FULL
+
+    def clear(self) -> None:
+        self.player1 = 0
+        self.player2 = 0
+        self.kings = 0
+
+    def place(self, square: int, is_player1: bool, is_king: bool = False) -> None:
+        """Coloca uma peça em uma casa vazia"""
+
+        bit = 1 << square
+        if is_player1:
+            self.player1 |= bit
+        else:
+            self.player2 |= bit
+        if is_king:
+            self.kings |= bit
+
+    def remove(self, square: int) -> None:
+        """Retira a peça de uma casa"""
+
+        mask = ~(1 << square)
+        self.player1 &= mask
+        self.player2 &= mask
+        self.kings &= mask
+
+    def move(self, origin: int, destination: int) -> None:
+        """Move a peça da origem para o destino, mantendo dono e tipo"""
+
+        if origin == destination: # Dama que volta à casa de origem numa sequência de capturas
+            return
+        origin_bit = 1 << origin
+        move_bits = origin_bit | (1 << destination)
+        if self.player1 & origin_bit:
+            self.player1 ^= move_bits
+        else:
+            self.player2 ^= move_bits
+        if self.kings & origin_bit:
+            self.kings ^= move_bits
+
+    def promote(self, square: int) -> None:
+        self.kings |= 1 << square
+
+
+def _man_capture_paths(origin: int, square: int, enemy: int, empty: int, jumps: List[Tuple[Tuple[int, int], ...]],
+                       last_row: int, path: List[int], captured: List[int], out: List[Move]) -> None:
+    """Busca em profundidade das sequências de captura de um peão a partir da casa dada.
+
+    `empty` não inclui a peça que está capturando; peças capturadas saem do tabuleiro na hora."""
+
+    extended = False
+    for mid, landing in jumps[square]:
+        if enemy & mid and empty & landing:
+            extended = True
+            path.append(landing.bit_length() - 1)
+            captured.append(mid.bit_length() - 1)
+            _man_capture_paths(origin, path[-1], enemy ^ mid, empty | mid, jumps, last_row, path, captured, out)
+            path.pop()
+            captured.pop()
+    if not extended and captured:
+        out.append(Move(origin, tuple(path), tuple(captured), bool(last_row >> square & 1)))
+
+
+def _king_capture_paths(origin: int, square: int, enemy: int, empty: int,
+                        path: List[int], captured: List[int], out: List[Move]) -> None:
+    """Busca em profundidade das sequências de captura de uma dama a partir da casa dada"""
+
+    extended = False
+    for ray in RAYS[square]:
+        for index, target in enumerate(ray):
+            bit = 1 << target
+            if empty & bit:
+                continue
+            if enemy & bit and index + 1 < len(ray) and empty >> ray[index + 1] & 1:
+                extended = True
+                path.append(ray[index + 1])
+                captured.append(target)
+                _king_capture_paths(origin, path[-1], enemy ^ bit, empty | bit, path, captured, out)
+                path.pop()
+                captured.pop()
+            break
+    if not extended and captured:
+        out.append(Move(origin, tuple(path), tuple(captured), False))
+
+
+def can_capture(own: int, enemy: int, kings: int, forward: Tuple[int, int]) -> bool:
+    """Verifica se o lado tem alguma captura, sem gerar as jogadas"""
+
+    empty = ~(own | enemy) & FULL
+    if man_jump_targets(own & ~kings, enemy, empty, forward):
+        return True
+    remaining = own & kings
+    while remaining:
+        low = remaining & -remaining
+        remaining ^= low
+        if king_targets(low.bit_length() - 1, own, enemy)[1]:
+            return True
+    return False
+
+
+def can_step(own: int, enemy: int, kings: int, forward: Tuple[int, int]) -> bool:
+    """Verifica se o lado tem algum passo simples, sem gerar as jogadas"""
+
+    empty = ~(own | enemy) & FULL
+    if man_step_targets(own & ~kings, empty, forward):
+        return True
+    own_kings = own & kings
+    return bool((shift(own_kings, UP) | shift(own_kings, DOWN)
+                 | shift(own_kings, LEFT) | shift(own_kings, RIGHT)) & empty)
+
+
+def _build_step_moves(last_row: int) -> List[Optional[Move]]:
+    """Jogadas simples pré-instanciadas, indexadas por origem * 64 + destino.
+
+    Só existem passos na mesma linha ou coluna; as outras casas ficam None."""
+
+    moves: List[Optional[Move]] = [None] * (NUM_SQUARES * NUM_SQUARES)
+    for origin in range(NUM_SQUARES):
+        row, col = divmod(origin, BOARD_SIZE)
+        line = [row * BOARD_SIZE + index for index in range(BOARD_SIZE) if index != col]
+        column = [index * BOARD_SIZE + col for index in range(BOARD_SIZE) if index != row]
+        for destination in line + column:
+            moves[origin * NUM_SQUARES + destination] = Move(origin, (destination,), (),
+                                                             bool(last_row >> destination & 1))
+    return moves
+
+
+# Move é imutável, então os passos simples podem ser reaproveitados entre chamadas
+MAN_STEP_MOVES_UP = _build_step_moves(ROW_0)
+MAN_STEP_MOVES_DOWN = _build_step_moves(ROW_7)
+KING_STEP_MOVES = _build_step_moves(0)
+
+
+def generate_legal_moves(own: int, enemy: int, kings: int, forward: Tuple[int, int]) -> List[Move]:
+    """Gera todas as jogadas legais de um lado, com sequências de captura completas.
+
+    A captura é obrigatória e vale a regra da maioria: só as sequências que capturam
+    o maior número de peças são legais."""
+
+    empty = ~(own | enemy) & FULL
+    men = own & ~kings
+    own_kings = own & kings
+    if forward == UP:
+        jumps, last_row, step_moves = MAN_JUMPS_UP, ROW_0, MAN_STEP_MOVES_UP
+    else:
+        jumps, last_row, step_moves = MAN_JUMPS_DOWN, ROW_7, MAN_STEP_MOVES_DOWN
+
+    captures: List[Move] = []
+    sources = man_jump_sources(men, enemy, empty, forward)
+    while sources:
+        low = sources & -sources
+        sources ^= low
+        square = low.bit_length() - 1
+        _man_capture_paths(square, square, enemy, empty | low, jumps, last_row, [], [], captures)
+
+    king_moves = []
+    remaining = own_kings
+    while remaining:
+        low = remaining & -remaining
+        remaining ^= low
+        square = low.bit_length() - 1
+        base = square * NUM_SQUARES
+        can_capture = False
+        for ray in RAYS[square]:
+            for index, target in enumerate(ray):
+                if empty >> target & 1:
+                    king_moves.append(KING_STEP_MOVES[base + target])
+                    continue
+                if enemy >> target & 1 and index + 1 < len(ray) and empty >> ray[index + 1] & 1:
+                    can_capture = True
+                break
+        if can_capture:
+            _king_capture_paths(square, square, enemy, empty | low, [], [], captures)
+
+    if captures:
+        most = max(len(move.captured) for move in captures)
+        if most == 1:
+            return captures
+        return [move for move in captures if len(move.captured) == most]
+
+    moves = king_moves
+    for delta, mask in (forward, LEFT, RIGHT):
+        targets = men & mask
+        targets = (targets << delta if delta > 0 else targets >> -delta) & empty
+        while targets:
+            low = targets & -targets
+            targets ^= low
+            destination = low.bit_length() - 1
+            moves.append(step_moves[(destination - delta) * NUM_SQUARES + destination])
+    return moves
+
+
+def apply_move(own: int, enemy: int, kings: int, move: Move) -> Tuple[int, int, int]:
+    """Aplica uma jogada sobre os bitboards e retorna os novos (aliadas, inimigas, damas)"""
+
+    origin_bit = 1 << move.origin
+    destination_bit = 1 << move.path[-1]
+    own ^= origin_bit ^ destination_bit
+    if kings & origin_bit:
+        kings ^= origin_bit ^ destination_bit
+    elif move.promotes:
+        kings |= destination_bit
+    for square in move.captured:
+        bit = 1 << square
+        enemy &= ~bit
+        kings &= ~bit
+    return own, enemy, kings
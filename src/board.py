@@ -1,31 +1,63 @@
-from typing import Optional, List, Dict
+import os
+from typing import Optional, List, Dict, Iterable, Tuple
 from player import Player
-from game_status import GameStatus
+from game_status import GameStatus, GAME_STATUS_VALUES
+from owner import Owner
 from position import Position
 from piece import Piece
+from bitboard import Bitboard, generate_legal_moves, iter_squares, UP, DOWN
+from move import Move
+from zobrist import PIECE_KEYS, SIDE_KEY, compute_hash, piece_key
+from piece_values import PIECE_SQUARE_VALUES
 
 BOARD_SIZE = 8
+EMPTY_SYMBOL = "."
+PIECE_SYMBOLS = {
+    "x": (Owner.PLAYER1.value, False),
+    "X": (Owner.PLAYER1.value, True),
+    "o": (Owner.PLAYER2.value, False),
+    "O": (Owner.PLAYER2.value, True),
+}
 
 class Board:
     def __init__(self):
         """Inicializa o board. Instancia os players. Que por sua vez instancia as peças.
         Depois instancia as posições e associa as peças dos players as posições."""
-        self._player1 = Player()
-        self._player2 = Player()
+        self._player1 = Player(Owner.PLAYER1.value)
+        self._player2 = Player(Owner.PLAYER2.value)
         self._positions: List[List[Position]] = [
             [Position(row, col) for col in range(BOARD_SIZE)]
             for row in range(BOARD_SIZE)
         ]
+        self._squares: List[Position] = [pos for row in self._positions for pos in row] # Índice = row * 8 + col
+        self._bitboard = Bitboard() # Espelho do tabuleiro em bitboards, usado na geração de movimentos
+        self._hash: int = 0 # Hash de Zobrist da posição, atualizado a cada alteração do tabuleiro
+        # Contagem de peões e damas por Owner (índice 0 sem uso) e soma das tabelas de PIECE_SQUARE_VALUES,
+        # atualizadas junto com o hash para a avaliação e o fim de jogo não percorrerem as peças
+        self._men: List[int] = [0, 0, 0]
+        self._kings: List[int] = [0, 0, 0]
+        self._piece_square_sum: int = 0
 
         self._game_status: int = GameStatus.NO_MATCH.value
         self._winner: Optional[str] = None
         self._first_selected_origin: Optional[Position] = None # Local onde a peça escolhida estava no início da jogada
         self._current_selected_origin: Optional[Position] = None # Usado para múltiplas capturas, acompanha a peça
         self._captured_pieces_on_this_turn: List[Dict[str, int]] = [] # Peças capturadas nesse turno
+        self._path_on_this_turn: List[int] = [] # Casas de pouso da peça nesse turno
         self._move_to_send: Optional[Dict] = None
         self._received_move: Optional[dict] = None
+        self._undo_stack: List[Tuple[Move, Tuple[Piece, ...], bool, bool, bool, int]] = [] # Jogadas feitas com make_move
+        # Jogadas do turno, calculadas sob demanda e descartadas a cada alteração do tabuleiro ou troca de vez
+        self._mandatory_cache: Optional[List[Piece]] = None
+        self._moveable_cache: Optional[List[Piece]] = None
+        self._legal_moves_cache: Dict[int, List[Move]] = {} # Owner -> jogadas completas
+        # Jogadas legais do turno guardadas no primeiro passo de move_piece: no meio de uma sequência de
+        # capturas o tabuleiro já mudou, e os próximos passos válidos são os que seguem o caminho já feito
+        self._turn_moves: Optional[List[Move]] = None
         self.place_pieces_on_board()
         self.is_local_player: bool = False
+        # Registro das partidas jogadas por move_piece/receive_move (ex.: game_record.GameRecordWriter)
+        self.recorder = None
 
     @property
     def player1(self) -> Player:
@@ -39,13 +71,21 @@ class Board:
     def positions(self) -> List[List[Position]]:
         return self._positions
 
+    @property
+    def bitboard(self) -> Bitboard:
+        return self._bitboard
+
+    @property
+    def hash(self) -> int:
+        return self._hash
+
     @property
     def game_status(self) -> int:
         return self._game_status
 
     @game_status.setter
     def game_status(self, status: int) -> None:
-        if status in [s.value for s in GameStatus]:
+        if status in GAME_STATUS_VALUES:
             self._game_status = status
         else:
             raise ValueError(f"Invalid game status: {status}")
@@ -89,6 +129,7 @@ class Board:
     
     def clear_captured_pieces_on_this_turn(self) -> None:
         self._captured_pieces_on_this_turn = []
+        self._turn_moves = None
 
     @property
     def move_to_send(self) -> Optional[Dict]:
@@ -154,11 +195,247 @@ class Board:
                 self._player2.associate_piece_position(position, num_piece)
                 num_piece += 1
 
+        self._sync_bitboard()
+
+    def _sync_bitboard(self) -> None:
+        """Reconstrói o bitboard e o hash a partir das posições"""
+
+        self._bitboard.clear()
+        for player in (self._player1, self._player2):
+            for piece in player.pieces:
+                pos = piece.position
+                if pos is not None and not piece.is_captured:
+                    self._bitboard.place(pos.row * BOARD_SIZE + pos.col, piece.owner == Owner.PLAYER1.value, piece.is_king)
+        self._hash = compute_hash(self._bitboard, self.side_to_move)
+        self._men = [0, 0, 0]
+        self._kings = [0, 0, 0]
+        self._piece_square_sum = 0
+        bb = self._bitboard
+        for owner, pieces in ((Owner.PLAYER1.value, bb.player1), (Owner.PLAYER2.value, bb.player2)):
+            for square in iter_squares(pieces):
+                self._add_piece_terms(square, owner, bool(bb.kings >> square & 1), 1)
+        self._invalidate_moves()
+
+    def _add_piece_terms(self, square: int, owner: int, is_king: bool, count: int) -> None:
+        """Soma (count=1) ou tira (count=-1) uma peça dos contadores de material e da soma das tabelas"""
+
+        if is_king:
+            self._kings[owner] += count
+        else:
+            self._men[owner] += count
+        self._piece_square_sum += count * PIECE_SQUARE_VALUES[owner][is_king][square]
+
+    def evaluate(self) -> int:
+        """Avaliação de engine.evaluation (material mais avanço dos peões) do ponto de vista do lado
+        que deve jogar, lida dos contadores"""
+
+        return self._piece_square_sum if self.side_to_move == Owner.PLAYER1.value else -self._piece_square_sum
+
+    def piece_count(self, owner: int) -> int:
+        return self._men[owner] + self._kings[owner]
+
+    def _invalidate_moves(self) -> None:
+        """Descarta as jogadas do turno guardadas em cache"""
+
+        self._mandatory_cache = None
+        self._moveable_cache = None
+        self._legal_moves_cache.clear()
+
+    def _moves_from(self, square: int) -> List[Move]:
+        """Jogadas legais que continuam da casa. No meio de uma sequência de capturas, só as jogadas do
+        turno que seguem o caminho já feito pela peça em current_selected_origin"""
+
+        if self._turn_moves is None:
+            piece = self._squares[square].piece
+            if piece is None:
+                return []
+            return [move for move in self.generate_legal_moves(piece.owner) if move.origin == square]
+        current, first = self._current_selected_origin, self._first_selected_origin
+        if current is None or first is None or current.row * BOARD_SIZE + current.col != square:
+            return []
+        first_square = first.row * BOARD_SIZE + first.col
+        done = tuple(self._path_on_this_turn)
+        return [move for move in self._turn_moves
+                if move.origin == first_square and len(move.path) > len(done) and move.path[:len(done)] == done]
+
+    def _next_hops(self, square: int, captures_only: bool = False) -> List[Position]:
+        """Próximas casas de pouso válidas para a peça na casa"""
+
+        hop = len(self._path_on_this_turn) if self._turn_moves is not None else 0
+        bits = 0
+        for move in self._moves_from(square):
+            if move.captured or not captures_only:
+                bits |= 1 << move.path[hop]
+        return self._positions_from_bits(bits)
+
+    def _positions_from_bits(self, bits: int) -> List[Position]:
+        """Converte um bitboard em lista de posições"""
+
+        squares = self._squares
+        return [squares[square] for square in iter_squares(bits)]
+
     def reset_game(self):
-        """Reseta tudo do jogo"""
-        ...
+        """Reseta tudo do jogo, reaproveitando as posições e peças já instanciadas"""
+
+        for pos in self._squares:
+            pos.detach_piece()
+        for player in (self._player1, self._player2):
+            player.reset()
+            player.is_its_turn = False
+            for piece in player.pieces:
+                piece.reset()
+
+        self._game_status = GameStatus.NO_MATCH.value
+        self._winner = None
+        self._first_selected_origin = None
+        self._current_selected_origin = None
+        self._captured_pieces_on_this_turn = []
+        self._path_on_this_turn = []
+        self._move_to_send = None
+        self._received_move = None
+        self._undo_stack.clear()
+        self._turn_moves = None
+        if self.recorder is not None:
+            self.recorder.abandon_game() # Partida que não chegou ao fim
+        self._invalidate_moves()
+        self.is_local_player = False
+        self.place_pieces_on_board()
+
+    def make_move(self, move: Move) -> None:
+        """Aplica uma jogada completa (de generate_legal_moves) e a guarda na pilha de desfazer.
+
+        Passa a vez para o adversário de quem jogou."""
+
+        squares = self._squares
+        bb = self._bitboard
+        origin = squares[move.origin]
+        piece = origin.piece
+        if piece is None:
+            raise ValueError("Sem peça na origem.")
+        previous_hash = self._hash
+        h = previous_hash
+
+        captured_pieces = []
+        for square in move.captured:
+            captured_piece = squares[square].piece
+            captured_piece.toggle_is_captured()
+            captured_piece.detach_position()
+            bb.remove(square)
+            h ^= PIECE_KEYS[captured_piece.owner][captured_piece.is_king][square]
+            self._add_piece_terms(square, captured_piece.owner, captured_piece.is_king, -1)
+            captured_pieces.append(captured_piece)
+
+        destination = squares[move.destination]
+        origin.detach_piece()
+        destination.associate_piece(piece)
+        piece.position = destination
+        bb.move(move.origin, move.destination)
+        h ^= PIECE_KEYS[piece.owner][piece.is_king][move.origin]
+        self._add_piece_terms(move.origin, piece.owner, piece.is_king, -1)
 
-        return
+        promoted = move.promotes and not piece.is_king
+        if promoted:
+            piece.promote_piece()
+            bb.promote(move.destination)
+        h ^= PIECE_KEYS[piece.owner][piece.is_king][move.destination]
+        self._add_piece_terms(move.destination, piece.owner, piece.is_king, 1)
+
+        self._undo_stack.append((move, tuple(captured_pieces), promoted,
+                                 self._player1.is_its_turn, self._player2.is_its_turn, previous_hash))
+        is_player1 = piece.owner == Owner.PLAYER1.value
+        if self.side_to_move == piece.owner:
+            h ^= SIDE_KEY
+        self._player1.is_its_turn = not is_player1
+        self._player2.is_its_turn = is_player1
+        self._hash = h
+        self._invalidate_moves()
+
+    def unmake_move(self) -> Move:
+        """Desfaz a última jogada feita com make_move e a retorna"""
+
+        if not self._undo_stack:
+            raise IndexError("Nenhuma jogada para desfazer.")
+        move, captured_pieces, promoted, player1_turn, player2_turn, previous_hash = self._undo_stack.pop()
+
+        squares = self._squares
+        bb = self._bitboard
+        destination = squares[move.destination]
+        piece = destination.piece
+        self._add_piece_terms(move.destination, piece.owner, piece.is_king, -1)
+        if promoted:
+            piece.demote_piece()
+        destination.detach_piece()
+        piece.associate_position(squares[move.origin])
+        bb.remove(move.destination)
+        bb.place(move.origin, piece.owner == Owner.PLAYER1.value, piece.is_king)
+        self._add_piece_terms(move.origin, piece.owner, piece.is_king, 1)
+
+        for square, captured_piece in zip(move.captured, captured_pieces):
+            captured_piece.uncapture()
+            captured_piece.associate_position(squares[square])
+            bb.place(square, captured_piece.owner == Owner.PLAYER1.value, captured_piece.is_king)
+            self._add_piece_terms(square, captured_piece.owner, captured_piece.is_king, 1)
+
+        self._player1.is_its_turn = player1_turn
+        self._player2.is_its_turn = player2_turn
+        self._hash = previous_hash
+        self._invalidate_moves()
+        return move
+
+    def load_position(self, position: str) -> None:
+        """Monta o tabuleiro a partir de uma posição em texto (ver position_string) e zera a partida.
+
+        Ex.: "......../oooooooo/oooooooo/......../......../xxxxxxxx/xxxxxxxx/........ 1" é a posição inicial."""
+
+        try:
+            rows_text, side = position.split()
+        except ValueError:
+            raise ValueError(f"Invalid position: {position!r}")
+        rows = rows_text.split("/")
+        if len(rows) != BOARD_SIZE or any(len(row) != BOARD_SIZE for row in rows):
+            raise ValueError(f"Position must have {BOARD_SIZE} rows of {BOARD_SIZE} squares: {position!r}")
+        if side not in (str(Owner.PLAYER1.value), str(Owner.PLAYER2.value)):
+            raise ValueError(f"Side to move must be 1 or 2. Instead, side is {side!r}")
+
+        self.reset_game()
+        for pos in self._squares:
+            pos.detach_piece()
+        free_pieces = {self._player1: list(reversed(self._player1.pieces)),
+                       self._player2: list(reversed(self._player2.pieces))}
+        for row, row_text in enumerate(rows):
+            for col, symbol in enumerate(row_text):
+                if symbol == EMPTY_SYMBOL:
+                    continue
+                if symbol not in PIECE_SYMBOLS:
+                    raise ValueError(f"Invalid square symbol {symbol!r} in position {position!r}")
+                owner, is_king = PIECE_SYMBOLS[symbol]
+                player = self._player1 if owner == Owner.PLAYER1.value else self._player2
+                if not free_pieces[player]:
+                    raise ValueError(f"Player {owner} has more than {len(player.pieces)} pieces")
+                piece = free_pieces[player].pop()
+                if is_king:
+                    piece.promote_piece()
+                piece.associate_position(self._positions[row][col])
+        # Peças que sobraram ficam como capturadas
+        for pieces in free_pieces.values():
+            for piece in pieces:
+                piece.toggle_is_captured()
+
+        self._player1.is_its_turn = side == str(Owner.PLAYER1.value)
+        self._player2.is_its_turn = not self._player1.is_its_turn
+        self._sync_bitboard()
+
+    def position_string(self) -> str:
+        """Retorna a posição em texto: linhas de cima para baixo separadas por '/', e o lado a jogar.
+
+        'x'/'X' são peão/dama do player1, 'o'/'O' do player2 e '.' é casa vazia."""
+
+        symbols = {value: symbol for symbol, value in PIECE_SYMBOLS.items()}
+        rows = []
+        for row in self._positions:
+            rows.append("".join(EMPTY_SYMBOL if pos.piece is None else symbols[(pos.piece.owner, pos.piece.is_king)]
+                                for pos in row))
+        return f"{'/'.join(rows)} {self.side_to_move}"
 
     def detach_piece_at(self, pos: Position) -> None:
         """Desassocia a peça de uma dada posição"""
@@ -174,15 +451,27 @@ class Board:
         first_origin = self.first_selected_origin
         origin_to_send = {"row": first_origin.row, "col": first_origin.col}
         destination_to_send = {"row": destination.row, "col": destination.col}
+        if not self._captured_pieces_on_this_turn:
+            self._path_on_this_turn = [] # Primeiro passo do turno
+            self._turn_moves = self.generate_legal_moves(piece.owner)
+        self._path_on_this_turn.append(destination.row * BOARD_SIZE + destination.col)
 
         # Move a peça primeiro
         current_origin.detach_piece()
         destination.piece = piece
         piece.position = destination
+        origin_square = current_origin.row * BOARD_SIZE + current_origin.col
+        destination_square = destination.row * BOARD_SIZE + destination.col
+        self._bitboard.move(origin_square, destination_square)
+        keys = PIECE_KEYS[piece.owner][piece.is_king]
+        self._hash ^= keys[origin_square] ^ keys[destination_square]
+        self._add_piece_terms(origin_square, piece.owner, piece.is_king, -1)
+        self._add_piece_terms(destination_square, piece.owner, piece.is_king, 1)
 
         # Verifica captura
         captured_coords = self.maybe_capture(piece, current_origin, destination)
         has_capture = captured_coords is not None
+        self._invalidate_moves()
 
         # Se houve captura, verifica se pode capturar novamente
         if has_capture:
@@ -190,24 +479,42 @@ class Board:
             if self.verify_multiple_capture():
                 self.game_status = GameStatus.OCCURRING_LOCAL_MOVE.value
                 return  # Aguarda próxima captura
+        self._turn_moves = None # Fim da jogada
 
         # Promoção e verificação de fim de jogo
         was_promoted = self._maybe_promote(destination)
+        if was_promoted:
+            self._invalidate_moves()
         game_finished = self._evaluate_end_condition()
+
+        # Prepara dados para envio
+        captured_pieces_data = [{"row": c["row"], "col": c["col"]} 
+                            for c in self.captured_pieces_on_this_turn]
+        path_data = [{"row": square // BOARD_SIZE, "col": square % BOARD_SIZE} for square in self._path_on_this_turn]
+        if self.recorder is not None:
+            first_square = first_origin.row * BOARD_SIZE + first_origin.col
+            captured_squares = tuple(c["row"] * BOARD_SIZE + c["col"] for c in captured_pieces_data)
+            self.recorder.add_move(Move(first_square, tuple(self._path_on_this_turn), captured_squares, was_promoted))
+
         if game_finished:
+            if self.recorder is not None:
+                self.recorder.finish_game(self._winner.owner if self._winner else None)
+            # A jogada vai junto para o adversário poder registrá-la
             self.move_to_send = {
-                "winner": self.player1.name,
+                "origin": origin_to_send,
+                "destination": destination_to_send,
+                "path": path_data,
+                "captured_pieces": captured_pieces_data,
+                "promoted": was_promoted,
+                "winner": self._winner.name if self._winner else None,
                 "match_status": 'finished'
             }
             return
 
-        # Prepara dados para envio
-        captured_pieces_data = [{"row": c["row"], "col": c["col"]} 
-                            for c in self.captured_pieces_on_this_turn]
-
         self.move_to_send = {
             "origin": origin_to_send,
             "destination": destination_to_send,
+            "path": path_data,
             "captured_pieces": captured_pieces_data,
             "promoted": was_promoted,
             "winner": self._winner.name if self._winner else None,
@@ -225,7 +532,12 @@ class Board:
 
         piece = pos.piece
         if not piece.is_king and pos.row == 0:
+            square = pos.row * BOARD_SIZE + pos.col
             piece.promote_piece()
+            self._bitboard.promote(square)
+            self._hash ^= piece_key(square, piece.owner, False) ^ piece_key(square, piece.owner, True)
+            self._add_piece_terms(square, piece.owner, False, -1)
+            self._add_piece_terms(square, piece.owner, True, 1)
             return True
         return False
 
@@ -253,6 +565,9 @@ class Board:
                 self.add_captured_piece_on_this_turn(mid_row, mid_col)
                 captured_piece.toggle_is_captured()
                 mid_position.detach_piece()  # Usar detach_piece em vez de atribuir None
+                self._bitboard.remove(mid_row * BOARD_SIZE + mid_col)
+                self._hash ^= piece_key(mid_row * BOARD_SIZE + mid_col, captured_piece.owner, captured_piece.is_king)
+                self._add_piece_terms(mid_row * BOARD_SIZE + mid_col, captured_piece.owner, captured_piece.is_king, -1)
                 return captured_piece
         return None
 
@@ -271,6 +586,7 @@ class Board:
 
         r = origin.row + step_row
         c = origin.col + step_col
+        owner = destination.piece.owner
         captured_piece = None
 
         while (r != destination.row or c != destination.col):
@@ -279,7 +595,7 @@ class Board:
             if current_pos.is_occupied:
                 if captured_piece is not None:
                     return None  # já encontrou uma peça antes, não pode capturar duas
-                if current_pos.piece in self.player1.pieces:
+                if current_pos.piece.owner == owner:
                     return None  # não pode capturar suas próprias peças
                 captured_piece = current_pos.piece
                 captured_row = r
@@ -293,6 +609,9 @@ class Board:
             captured_piece.toggle_is_captured()
             self._positions[captured_row][captured_col].piece = None
             captured_piece.position = None
+            self._bitboard.remove(captured_row * BOARD_SIZE + captured_col)
+            self._hash ^= piece_key(captured_row * BOARD_SIZE + captured_col, captured_piece.owner, captured_piece.is_king)
+            self._add_piece_terms(captured_row * BOARD_SIZE + captured_col, captured_piece.owner, captured_piece.is_king, -1)
             return captured_piece
 
         return None
@@ -300,11 +619,12 @@ class Board:
     def _evaluate_end_condition(self) -> bool:
         """Checa condições de vitória do jogo"""
 
-        pieces1 = [p for p in self.player_pieces(self.player1) if not p.is_captured]
-        pieces2 = [p for p in self.player_pieces(self.player2) if not p.is_captured]
+        owner1, owner2 = self._player1.owner, self._player2.owner
+        count1 = self.piece_count(owner1)
+        count2 = self.piece_count(owner2)
 
-        alive1 = len(pieces1) > 0
-        alive2 = len(pieces2) > 0
+        alive1 = count1 > 0
+        alive2 = count2 > 0
 
         # Regra 1: player1 tem 1 dama, player2 tem 1 peão
         if not alive1:
@@ -317,13 +637,13 @@ class Board:
             return True
 
         # Regra 2: player1 tem 1 dama, player2 tem 1 peão
-        if len(pieces1) == 1 and pieces1[0].is_king and len(pieces2) == 1 and not pieces2[0].is_king:
+        if count1 == 1 and self._kings[owner1] == 1 and count2 == 1 and self._men[owner2] == 1:
             self._winner = self._player1
             self._game_status = GameStatus.FINISHED.value
             return True
 
         # Regra 3: empate se ambos só têm 1 peão
-        if len(pieces1) == 1 and len(pieces2) == 1 and not pieces1[0].is_king and not pieces2[0].is_king:
+        if count1 == 1 and count2 == 1 and self._men[owner1] == 1 and self._men[owner2] == 1:
             self._winner = None
             self._game_status = GameStatus.FINISHED.value
             return True
@@ -345,6 +665,7 @@ class Board:
         self.player1.name = player1_name
         self.player2.id = player2_id
         self.player2.name = player2_name
+        previous_side = self.side_to_move
         if player1_order == "1":
             self.is_local_player = True
             self.player1.toggle_turn()
@@ -352,20 +673,31 @@ class Board:
         else:
             self.player2.toggle_turn()
             self.game_status = GameStatus.WAITING_REMOTE_MOVE.value
+        if self.side_to_move != previous_side:
+            self._hash ^= SIDE_KEY
+        self._invalidate_moves()
+        if self.recorder is not None:
+            self.recorder.begin_game(self.player1.name, self.player2.name, self.position_string())
     
     def receive_move(self, a_move: dict) -> None:
         """Recebe a jogada do adversário e atualiza o tabuleiro."""
 
         # Armazena o movimento
         self._received_move = a_move
+        if self.recorder is not None and "origin" in a_move:
+            self.recorder.add_move(self._received_move_in_local_squares(a_move))
 
         if a_move["match_status"] == "finished":
             self.winner = a_move["winner"]
             self.game_status = GameStatus.FINISHED.value
+            if self.recorder is not None:
+                self.recorder.finish_game(self._owner_named(a_move["winner"]))
             return
 
         # Verifica vitória
         if a_move["winner"] is not None:
+            if self.recorder is not None:
+                self.recorder.finish_game(self._owner_named(a_move["winner"]))
             if a_move["winner"] == self.player1.name:
                 self._winner = self.player1
             elif a_move["winner"] == self.player2.name:
@@ -378,8 +710,11 @@ class Board:
             row, col = 7 - captured["row"], 7 - captured["col"]
             pos = self._positions[row][col]
             if pos.piece:
+                self._hash ^= piece_key(row * BOARD_SIZE + col, pos.piece.owner, pos.piece.is_king)
+                self._add_piece_terms(row * BOARD_SIZE + col, pos.piece.owner, pos.piece.is_king, -1)
                 pos.piece.toggle_is_captured()
                 pos.detach_piece()  # Limpa a posição
+                self._bitboard.remove(row * BOARD_SIZE + col)
 
         # Move a peça
         origin_data = a_move["origin"]
@@ -391,30 +726,58 @@ class Board:
         origin.detach_piece()
         destination.piece = piece
         piece.position = destination
-        if a_move.get("promoted"):
+        origin_square = origin.row * BOARD_SIZE + origin.col
+        destination_square = destination.row * BOARD_SIZE + destination.col
+        self._bitboard.move(origin_square, destination_square)
+        keys = PIECE_KEYS[piece.owner][piece.is_king]
+        self._hash ^= keys[origin_square] ^ keys[destination_square]
+        self._add_piece_terms(origin_square, piece.owner, piece.is_king, -1)
+        self._add_piece_terms(destination_square, piece.owner, piece.is_king, 1)
+        if a_move.get("promoted") and not piece.is_king:
             piece.promote_piece()
+            self._bitboard.promote(destination_square)
+            self._hash ^= piece_key(destination_square, piece.owner, False) ^ piece_key(destination_square, piece.owner, True)
+            self._add_piece_terms(destination_square, piece.owner, False, -1)
+            self._add_piece_terms(destination_square, piece.owner, True, 1)
 
-        # Atualiza status e muda o turno de ambos jogadores
+        # Atualiza status e muda o turno de ambos jogadores (switch_turn descarta as jogadas em cache)
         self._game_status = GameStatus.WAITING_LOCAL_MOVE.value
         self.switch_turn()
     
-    def check_mandatory_capture_pieces(self) -> List[Piece]:
-            """Retorna todas as peças do jogador local (player1) que podem capturar."""
-
-            mandatory_pieces = []
-
-            for piece in self.player1.pieces:
-                if piece.is_captured or piece.position is None:
-                    continue
+    def _received_move_in_local_squares(self, a_move: dict) -> Move:
+        """Jogada recebida como Move, com as casas já espelhadas para o referencial local"""
+
+        def square(position: Dict[str, int]) -> int:
+            return (BOARD_SIZE - 1 - position["row"]) * BOARD_SIZE + (BOARD_SIZE - 1 - position["col"])
+
+        origin = square(a_move["origin"])
+        destination = square(a_move["destination"])
+        captured = tuple(square(position) for position in a_move["captured_pieces"])
+        promoted = bool(a_move.get("promoted"))
+        if "path" in a_move:
+            return Move(origin, tuple(square(position) for position in a_move["path"]), captured, promoted)
+        # Versões antigas só mandam origem e destino: o caminho vem da jogada legal correspondente
+        for move in self.generate_legal_moves(self._player2.owner):
+            if move.origin == origin and move.destination == destination and set(move.captured) == set(captured):
+                return move
+        return Move(origin, (destination,), captured, promoted)
+
+    def _owner_named(self, name: Optional[str]) -> Optional[int]:
+        """Owner do jogador com esse nome (None se não for nenhum dos dois, como num empate)"""
+
+        if name is not None and name == self._player1.name:
+            return self._player1.owner
+        if name is not None and name == self._player2.name:
+            return self._player2.owner
+        return None
 
-                elif piece.is_king:
-                    if self.verify_capture_as_king(piece):
-                        mandatory_pieces.append(piece)
-                else:
-                    if self.verify_capture_as_man(piece):
-                        mandatory_pieces.append(piece)
+    def check_mandatory_capture_pieces(self) -> List[Piece]:
+        """Retorna todas as peças do jogador local (player1) que podem capturar."""
 
-            return mandatory_pieces
+        if self._mandatory_cache is None:
+            moves = self.generate_legal_moves(self._player1.owner)
+            self._mandatory_cache = self._pieces_at_origins(move for move in moves if move.captured)
+        return list(self._mandatory_cache)
 
     def message_game_status(self) -> str:
         """Retorna mensagem referente ao estado do jogo"""
@@ -441,151 +804,36 @@ class Board:
     def get_possible_moves(self, origin: Position) -> List[Position]:
         """Retorna as posições de destino possíveis para uma dada peça, priorizando capturas obrigatórias."""
 
-        piece = origin.piece
-        if not piece:
+        if not origin.piece:
             return []
 
-        if piece.is_king:
-            if self.verify_capture_as_king(piece):
-                return self.get_capture_moves_as_king(origin)
-            else:
-                return self.get_possible_moves_as_king(origin)
-        else:
-            if self.verify_capture_as_man(piece):
-                return self.get_capture_moves_as_man(origin)
-            else:
-                return self.get_possible_moves_as_man(origin)
+        return self._next_hops(origin.row * BOARD_SIZE + origin.col)
 
     def get_possible_moves_as_man(self, origin: Position) -> List[Position]:
         """Retorna as posições de destino possíveis para uma dado peão"""
 
-        piece = origin.piece
-        player = self._player1 if piece in self._player1.pieces else self._player2
-        enemy_pieces = self._player2.pieces if player == self._player1 else self._player1.pieces
-
-        moves = []
-        directions = [(-1, 0), (0, -1), (0, 1)]  # frente, esquerda, direita
-
-        for dr, dc in directions:
-            r1 = origin.row + dr
-            c1 = origin.col + dc
-
-            if 0 <= r1 < BOARD_SIZE and 0 <= c1 < BOARD_SIZE:
-                mid_pos = self._positions[r1][c1]
-
-                if not mid_pos.is_occupied:
-                    moves.append(mid_pos)
-                elif mid_pos.piece in enemy_pieces:
-                    r2 = r1 + dr
-                    c2 = c1 + dc
-                    if 0 <= r2 < BOARD_SIZE and 0 <= c2 < BOARD_SIZE:
-                        landing_pos = self._positions[r2][c2]
-                        if not landing_pos.is_occupied:
-                            moves.append(landing_pos)
-
-        return moves
+        return self._next_hops(origin.row * BOARD_SIZE + origin.col)
 
     def get_capture_moves_as_man(self, origin: Position) -> List[Position]:
         """Retorna apenas as posições de captura possíveis para um peão."""
 
-        piece = origin.piece
-        if not piece:
+        if not origin.piece:
             return []
 
-        player = self._player1 if piece in self._player1.pieces else self._player2
-        enemy_pieces = self._player2.pieces if player == self._player1 else self._player1.pieces
-
-        moves = []
-        directions = [(-1, 0), (0, -1), (0, 1)]  # frente, esquerda, direita
-
-        for dr, dc in directions:
-            r1, c1 = origin.row + dr, origin.col + dc
-            r2, c2 = origin.row + 2*dr, origin.col + 2*dc
-
-            if (
-                0 <= r1 < BOARD_SIZE and 0 <= c1 < BOARD_SIZE and
-                0 <= r2 < BOARD_SIZE and 0 <= c2 < BOARD_SIZE
-            ):
-                mid_pos = self._positions[r1][c1]
-                dest_pos = self._positions[r2][c2]
-
-                if (
-                    mid_pos.is_occupied and
-                    mid_pos.piece in enemy_pieces and
-                    not dest_pos.is_occupied
-                ):
-                    moves.append(dest_pos)
-
-        return moves
+        return self._next_hops(origin.row * BOARD_SIZE + origin.col, captures_only=True)
 
     def get_possible_moves_as_king(self, origin: Position) -> List[Position]:
         """Retorna as posições de destino possíveis para uma dada dama"""
 
-        piece = origin.piece
-        player = self._player1 if piece in self._player1.pieces else self._player2
-
-        moves = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # cima, baixo, esquerda, direita
-
-        for dr, dc in directions:
-            r, c = origin.row + dr, origin.col + dc
-            found_enemy = False
-
-            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
-                current_pos = self._positions[r][c]
-
-                if current_pos.is_occupied:
-                    if (current_pos.piece in player.pieces) or found_enemy:
-                        break
-                    else:
-                        found_enemy = True
-                else:
-                    if found_enemy:
-                        # Casa vazia após peça inimiga: captura
-                        moves.append(current_pos)
-                        break  # só pode capturar uma por vez
-                    else:
-                        # Movimento simples
-                        moves.append(current_pos)
-
-                r += dr
-                c += dc
-
-        return moves
+        return self._next_hops(origin.row * BOARD_SIZE + origin.col)
     
     def get_capture_moves_as_king(self, origin: Position) -> List[Position]:
         """Retorna apenas as posições de captura possíveis para uma dama."""
 
-        piece = origin.piece
-        if not piece:
+        if not origin.piece:
             return []
 
-        player = self._player1 if piece in self._player1.pieces else self._player2
-
-        moves = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # cima, baixo, esquerda, direita
-
-        for dr, dc in directions:
-            r, c = origin.row + dr, origin.col + dc
-            found_enemy = False
-
-            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
-                current_pos = self._positions[r][c]
-
-                if current_pos.is_occupied:
-                    if (current_pos.piece in player.pieces) or found_enemy:
-                        break
-                    else:
-                        found_enemy = True
-                else:
-                    if found_enemy:
-                        # Encontrou inimigo e casa vazia depois: pode capturar
-                        moves.append(current_pos)
-                        break
-                r += dr
-                c += dc
-
-        return moves
+        return self._next_hops(origin.row * BOARD_SIZE + origin.col, captures_only=True)
 
     def verify_multiple_capture(self) -> bool:
         """Verifica se a peça que acabou de capturar pode capturar novamente."""
@@ -601,81 +849,64 @@ class Board:
             return self.verify_capture_as_man(piece)
     
     def verify_capture_as_man(self, piece: Piece) -> bool:
-        pos = piece.position
-        row, col = pos.row, pos.col
-        directions = [(-1, 0), (0, -1), (0, 1)]  # Frente, esquerda, direita
-
-        player = self._player1 if piece in self._player1.pieces else self._player2
-        enemy_pieces = self._player2.pieces if player == self._player1 else self._player1.pieces
-
-        for d_row, d_col in directions:
-            mid_row = row + d_row
-            mid_col = col + d_col
-            dest_row = row + 2 * d_row
-            dest_col = col + 2 * d_col
-
-            if (
-                0 <= mid_row < BOARD_SIZE and 0 <= mid_col < BOARD_SIZE and
-                0 <= dest_row < BOARD_SIZE and 0 <= dest_col < BOARD_SIZE
-            ):
-                mid_pos = self._positions[mid_row][mid_col]
-                dest_pos = self._positions[dest_row][dest_col]
-
-                if (
-                    mid_pos.is_occupied and
-                    mid_pos.piece in enemy_pieces and
-                    not dest_pos.is_occupied
-                ):
-                    return True
-
-        return False
+        return any(move.captured for move in self._moves_from(self._square_of(piece)))
 
     def verify_capture_as_king(self, piece: Piece) -> bool:
-        pos = piece.position
-        row, col = pos.row, pos.col
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Cima, baixo, esquerda, direita
-
-        player = self._player1 if piece in self._player1.pieces else self._player2
+        return any(move.captured for move in self._moves_from(self._square_of(piece)))
 
-        for d_row, d_col in directions:
-            r, c = row + d_row, col + d_col
-            found_enemy = False
-
-            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
-                current_pos = self._positions[r][c]
-
-                if current_pos.is_occupied:
-                    if (current_pos.piece in player.pieces) or found_enemy:
-                        break  # Não pode capturar suas próprias peças
-                    else:
-                        found_enemy = True
-                else:
-                    if found_enemy:
-                        return True  # Encontrou inimigo e casa livre depois: pode capturar
-
-                r += d_row
-                c += d_col
+    @staticmethod
+    def _square_of(piece: Piece) -> int:
+        pos = piece.position
+        return pos.row * BOARD_SIZE + pos.col
 
-        return False
+    def _pieces_at_origins(self, moves: Iterable[Move]) -> List[Piece]:
+        bits = 0
+        for move in moves:
+            bits |= 1 << move.origin
+        return [pos.piece for pos in self._positions_from_bits(bits)]
 
     # Equivalente ao verificar peças que podem se mover, acho eu
     def get_moveable_pieces(self) -> List[Piece]:
         """Retorna todas as peças do jogador local (player1) que podem se mover."""
 
-        moveable_pieces = []
+        if self._moveable_cache is None:
+            self._moveable_cache = self._pieces_at_origins(self.generate_legal_moves(self._player1.owner))
+        return list(self._moveable_cache)
 
-        for piece in self.player1.pieces:
-            if piece.is_captured or piece.position is None:
-                continue
+    @property
+    def side_to_move(self) -> int:
+        """Retorna o valor de Owner do lado que deve jogar. Sem partida iniciada, o player1 começa"""
+
+        return Owner.PLAYER2.value if self._player2.is_its_turn else Owner.PLAYER1.value
 
-            origin = piece.position
-            possible_moves = self.get_possible_moves(origin)
+    def generate_legal_moves(self, owner: Optional[int] = None) -> List[Move]:
+        """Retorna todas as jogadas legais completas de um lado (por padrão, do lado que deve jogar).
 
-            if possible_moves:  # Se tiver qualquer destino possível
-                moveable_pieces.append(piece)
+        Sequências de múltiplas capturas vêm inteiras e só as de captura máxima são legais."""
 
-        return moveable_pieces
+        if owner is None:
+            owner = self.side_to_move
+        moves = self._legal_moves_cache.get(owner)
+        if moves is None:
+            bb = self._bitboard
+            if owner == Owner.PLAYER1.value:
+                moves = generate_legal_moves(bb.player1, bb.player2, bb.kings, UP)
+            else:
+                moves = generate_legal_moves(bb.player2, bb.player1, bb.kings, DOWN)
+            self._legal_moves_cache[owner] = moves
+        return list(moves)
 
     def switch_turn(self) -> None:
+        previous_side = self.side_to_move
         self._player1.toggle_turn()
         self._player2.toggle_turn()
+        if self.side_to_move != previous_side:
+            self._hash ^= SIDE_KEY
+        self._invalidate_moves()
+
+
+# Instrumentação opcional (ver profiling.py); desligada, o Board não é alterado
+if os.environ.get("DAMA_PROFILE"):
+    import profiling
+
+    profiling.enable_from_environment(Board)
@@ -1,3 +1,25 @@
-import player_interface
+import sys
 
-player_interface.PlayerInterface()
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "--headless":
+        # Sem interface gráfica: carrega só o núcleo do jogo (sem tkinter e sem rede)
+        import self_play
+
+        return self_play.main(argv[1:])
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dama turca. Com --headless, joga partidas sem interface (ver self_play.py).")
+    parser.add_argument("--record", help="arquivo onde as partidas jogadas são gravadas (ver game_record.py)")
+    args = parser.parse_args(argv)
+
+    import player_interface
+
+    player_interface.PlayerInterface(args.record)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
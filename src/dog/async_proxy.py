@@ -0,0 +1,80 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDogProxy:
+    """Executa as chamadas do DogProxy em um event loop asyncio próprio, numa thread separada,
+    para que a interface nunca espere pela rede.
+
+    Os resultados não voltam na thread do loop: ficam numa fila até que a thread da interface
+    chame dispatch(), que executa os callbacks lá.
+
+    Não é um cliente HTTP assíncrono: cada pedido ainda é a chamada bloqueante do DogProxy
+    (requests), executada num único worker, e os pedidos vão um de cada vez. Isso é de propósito,
+    para as jogadas chegarem ao servidor na ordem em que foram feitas; o ganho é só tirar a espera
+    da thread da interface, não fazer pedidos em paralelo."""
+
+    def __init__(self, a_proxy):
+        self.proxy = a_proxy
+        self.results = queue.SimpleQueue()
+        self.loop = asyncio.new_event_loop()
+        # Um único worker: os pedidos (e as jogadas) chegam ao servidor na ordem em que foram feitos
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=1, thread_name_prefix="dog-request"))
+        self.thread = threading.Thread(target=self.run_loop, name="dog-loop", daemon=True)
+        self.thread.start()
+
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def start_match(self, number_of_players):
+        return await self.loop.run_in_executor(None, self.proxy.start_match, number_of_players)
+
+    async def send_move(self, a_move):
+        return await self.loop.run_in_executor(None, self.proxy.send_move, a_move)
+
+    def submit(self, coroutine, callback=None, error_callback=None):
+        """Agenda a corrotina no loop e retorna um concurrent.futures.Future. No próximo dispatch(),
+        callback recebe o resultado ou, se o pedido falhou, error_callback recebe a exceção.
+        Sem error_callback, a exceção é relançada pelo dispatch()"""
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        if callback is not None or error_callback is not None:
+            future.add_done_callback(lambda done: self.results.put(lambda: self.deliver(done, callback, error_callback)))
+        return future
+
+    @staticmethod
+    def deliver(future, callback, error_callback):
+        error = future.exception()
+        if error is None:
+            if callback is not None:
+                callback(future.result())
+        elif error_callback is not None:
+            error_callback(error)
+        else:
+            raise error
+
+    def call_in_ui(self, callback, *args):
+        """Agenda uma chamada para o próximo dispatch() (usado pela PollingThread)"""
+
+        self.results.put(lambda: callback(*args))
+
+    def dispatch(self):
+        """Executa os callbacks pendentes na thread que chamou. Retorna quantos foram executados"""
+
+        handled = 0
+        while True:
+            try:
+                call = self.results.get_nowait()
+            except queue.Empty:
+                return handled
+            call()
+            handled += 1
+
+    def close(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+        self.loop.close()
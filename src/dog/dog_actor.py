@@ -1,3 +1,5 @@
+import os
+from dog.async_proxy import AsyncDogProxy
 from dog.dog_proxy import DogProxy
 from dog.polling_thread import PollingThread
 
@@ -6,8 +8,10 @@ class DogActor:
     def __init__(self):
         super().__init__()
         self.proxy = DogProxy()
+        self.network = AsyncDogProxy(self.proxy)
         self.player_actor = None
-        self.polling_thread = PollingThread(self.proxy, True)
+        # DOG_LONG_POLL=1 quando o servidor suporta segurar a consulta de jogadas
+        self.polling_thread = PollingThread(self.proxy, True, os.environ.get("DOG_LONG_POLL") == "1")
 
     def initialize(self, player_name, a_player_actor):
         self.player_actor = a_player_actor
@@ -15,17 +19,36 @@ class DogActor:
         self.polling_thread.start()
         return resp_dict
 
-    def start_match(self, number_of_players):
-        return self.proxy.start_match(number_of_players)
+    def start_match(self, number_of_players, callback, error_callback):
+        """Pede o início da partida sem bloquear; no dispatch(), callback recebe o StartStatus ou
+        error_callback recebe a exceção do pedido"""
+
+        self.network.submit(self.network.start_match(number_of_players), callback, error_callback)
 
     def send_move(self, move):
-        self.proxy.send_move(move)
+        """Envia a jogada sem bloquear; se ela não chegar ao servidor, o player_actor recebe
+        receive_send_error(move, erro) no dispatch()"""
+
+        future = self.network.submit(self.network.send_move(move), None,
+                                     lambda error: self.player_actor.receive_send_error(move, error))
+        future.add_done_callback(lambda done: self.polling_thread.poll_now())
+
+    def dispatch(self):
+        """Entrega ao player_actor, na thread que chamou (a da interface), o que chegou da rede"""
+
+        return self.network.dispatch()
+
+    def stop(self):
+        self.polling_thread.stop()
+        self.network.close()
+        self.proxy.close()
 
+    # Chamados pela PollingThread: o player_actor só é chamado no dispatch()
     def receive_start(self, start_status):
-        self.player_actor.receive_start(start_status)
+        self.network.call_in_ui(self.player_actor.receive_start, start_status)
 
     def receive_move(self, a_move):
-        self.player_actor.receive_move(a_move)
+        self.network.call_in_ui(self.player_actor.receive_move, a_move)
 
     def receive_withdrawal_notification(self):
-        self.player_actor.receive_withdrawal_notification()
+        self.network.call_in_ui(self.player_actor.receive_withdrawal_notification)
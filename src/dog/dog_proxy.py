@@ -1,7 +1,64 @@
 import json
+import os
+import threading
+import time
+from collections import deque
 from urllib.parse import urldefrag
-import requests
 from dog.start_status import StartStatus
+from move_codec import from_wire, parse_payload, to_wire
+
+CONNECT_TIMEOUT = 3.05  # segundos para abrir a conexão
+READ_TIMEOUT = 10  # segundos esperando a resposta
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # esperas de 0,5 s, 1 s e 2 s entre as tentativas
+RETRY_STATUS = (502, 503, 504)
+POOL_SIZE = 4  # conexões keep-alive mantidas (GUI e PollingThread usam a mesma sessão)
+# Repetir estes pedidos depois que chegaram ao servidor não muda nada; os outros (start/ e move/)
+# só são repetidos quando a conexão nem chegou a ser aberta, para não duplicar jogadas
+IDEMPOTENT_ENDPOINTS = ("player/", "started/", "match/")
+LATENCY_WINDOW = 200  # amostras guardadas por endpoint para os percentis
+DEFAULT_URL = "https://api-dog-server.herokuapp.com/"
+# Formato das jogadas enviadas: "legacy" (dicionário da interface) ou "compact" (move_codec). Os
+# dois formatos são aceitos na leitura, mas clientes antigos só entendem o legacy: o compact só
+# deve ser ligado quando todos os adversários tiverem esta versão
+WIRE_FORMAT = os.environ.get("DOG_WIRE_FORMAT", "legacy")
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0  # pedidos que falharam em todas as tentativas
+        self.retries = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, elapsed, retries, failed):
+        self.requests += 1
+        self.retries += retries
+        if failed:
+            self.failures += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.latencies.append(elapsed)
+
+    def summary(self):
+        """Latências em ms: média, p50 e p95 das últimas amostras e máxima"""
+
+        ordered = sorted(self.latencies)
+
+        def percentile(fraction):
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1) if ordered else 0.0
+
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "mean_ms": round(self.total_time / self.requests * 1000, 1) if self.requests else 0.0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(self.max_time * 1000, 1),
+        }
 
 
 class DogProxy:
@@ -14,31 +71,107 @@ class DogProxy:
         self.status = 0
         # 0 - file game.id not found; 1 - not connected to server; 2 - connected without match; 3 - waiting move (even if it's the local player's turn)
         self.move_order = 0
-        self.url = "https://api-dog-server.herokuapp.com/"
+        # DOG_SERVER_URL aponta para outro servidor (por exemplo, o dog_server.py local)
+        self.url = os.environ.get("DOG_SERVER_URL", DEFAULT_URL)
+        if not self.url.endswith("/"):
+            self.url += "/"
+        self.session = None
+        self.metrics = {}
+        self.lock = threading.Lock()  # GUI e PollingThread fazem pedidos ao mesmo tempo
 
     def get_status(self):
         return self.status
 
-    def initialize(self, a_name, an_actor):
-        self.player_id = self.generate_player_id()
+    def get_session(self):
+        """Sessão HTTP compartilhada, para reaproveitar as conexões (e o handshake TLS)"""
+
+        with self.lock:
+            if self.session is None:
+                import requests  # Carregado só na primeira comunicação com o servidor
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.session = session
+            return self.session
+
+    def post(self, endpoint, post_data, read_timeout=READ_TIMEOUT):
+        """POST em um endpoint do servidor. Erros transitórios são repetidos com backoff
+        exponencial; retorna None se não houver resposta depois de todas as tentativas"""
+
+        import requests
+
+        session = self.get_session()
+        retry_sent = endpoint in IDEMPOTENT_ENDPOINTS
+        resp = None
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                resp = session.post(self.url + endpoint, data=post_data, timeout=(CONNECT_TIMEOUT, read_timeout))
+                retry = retry_sent and resp.status_code in RETRY_STATUS
+            except requests.ConnectTimeout:
+                resp = None
+                retry = True
+            except (requests.ConnectionError, requests.Timeout):
+                resp = None
+                retry = retry_sent
+            if not retry or attempt == MAX_RETRIES:
+                break
+            time.sleep(BACKOFF_FACTOR * 2 ** attempt)
+            attempt += 1
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.metrics.setdefault(endpoint, EndpointMetrics()).record(elapsed, attempt, resp is None)
+        return resp
+
+    @staticmethod
+    def parse_response(resp):
+        """Dicionário da resposta do servidor, ou None se não houve resposta, se o status HTTP
+        é de erro ou se o corpo não é um objeto JSON (ex.: página de erro de um proxy)"""
+
+        if resp is None or not resp.ok:
+            return None
+        try:
+            resp_dict = json.loads(resp.text)
+        except ValueError:
+            return None
+        return resp_dict if isinstance(resp_dict, dict) else None
+
+    def get_metrics(self):
+        """Estatísticas de latência por endpoint"""
+
+        with self.lock:
+            return {endpoint: metrics.summary() for endpoint, metrics in self.metrics.items()}
+
+    def close(self):
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+    def initialize(self, a_name, an_actor, a_player_id=None, a_game_id=None):
+        # a_player_id permite vários clientes no mesmo processo e a_game_id isola cada execução (load_test.py)
+        self.player_id = a_player_id or self.generate_player_id()
         self.player_name = a_name
         self.dog_actor = an_actor
         if self.player_name == "":
             self.player_name = "player" + str(self.player_id)
-        try:
-            config_file = open("config/game.id", "r")
-            self.game_id = config_file.read()
-        except FileNotFoundError:
-            self.status = 0
-            return "Arquivo de configuração do jogo não encontrado"
-        config_file.close()
+        if a_game_id is not None:
+            self.game_id = a_game_id
+        else:
+            try:
+                config_file = open("config/game.id", "r")
+                self.game_id = config_file.read()
+            except FileNotFoundError:
+                self.status = 0
+                return "Arquivo de configuração do jogo não encontrado"
+            config_file.close()
         resp = self.register_player(self.player_name, self.player_id, self.game_id)
-        result = resp.status_code
-        if result == 200:
-            resp_json = resp.text
-            resp_dict = json.loads(resp_json)
-            resp1 = resp_dict["0"]
-            resp2 = resp_dict["1"]
+        resp_dict = self.parse_response(resp)
+        if resp_dict is not None:
             self.status = 2
             message = "Conectado a Dog Server"
         else:
@@ -53,19 +186,15 @@ class DogProxy:
         return an_id
 
     def register_player(self, a_player_name, a_player_id, a_game_id):
-        url = self.url + "player/"
         post_data = {"player_name": a_player_name, "player_id": a_player_id, "game_id": a_game_id}
-        resp = requests.post(url, data=post_data)
+        resp = self.post("player/", post_data)
         return resp
 
     def start_match(self, number_of_players):
-        url = self.url + "start/"
         post_data = {"player_id": self.player_id, "game_id": self.game_id, "number_of_players": number_of_players}
-        resp = requests.post(url, data=post_data)
-        result = resp.status_code
-        if result == 200:
-            resp_json = resp.text
-            resp_dict = json.loads(resp_json)
+        resp = self.post("start/", post_data)
+        resp_dict = self.parse_response(resp)
+        if resp_dict is not None and {"message", "code", "players"} <= resp_dict.keys():
             message = resp_dict["message"]
             code = resp_dict["code"]
             players = resp_dict["players"]
@@ -78,54 +207,73 @@ class DogProxy:
         return start_status
 
     def start_status(self):
-        url = self.url + "started/"
+        """Consulta se a partida começou. Retorna True se começou"""
+
         post_data = {"player_id": self.player_id, "game_id": self.game_id}
-        resp = requests.post(url, data=post_data)
-        result = resp.status_code
-        if result == 200 and self.status == 2:
-            resp_json = resp.text
-            resp_dict = json.loads(resp_json)
-            message = resp_dict["message"]
-            code = resp_dict["code"]
-            players = resp_dict["players"]
+        resp = self.post("started/", post_data)
+        resp_dict = self.parse_response(resp)
+        if resp_dict is not None and self.status == 2:
+            message = resp_dict.get("message")
+            code = resp_dict.get("code")
+            players = resp_dict.get("players")
             if code == "2":
                 start_status = StartStatus(code, message, players, self.player_id)
                 self.status = 3
                 self.move_order = 0
                 self.dog_actor.receive_start(start_status)
+                return True
+        return False
 
     def send_move(self, a_move):
-        url = self.url + "move/"
-        json_move = json.dumps(a_move)  # convert move to json
+        """Envia a jogada. Se o servidor não a recebeu, lança ConnectionError e o status não muda"""
+
+        wire_move = to_wire(a_move) if WIRE_FORMAT == "compact" else a_move
+        json_move = json.dumps(wire_move, separators=(",", ":"))  # convert move to json
         post_data = {"player_id": self.player_id, "game_id": self.game_id, "move": json_move}
-        resp = requests.post(url, data=post_data)
+        resp = self.post("move/", post_data)
+        if resp is None:
+            raise ConnectionError("Move not sent: no answer from the Dog server")
+        if not resp.ok:
+            raise ConnectionError(f"Move not sent: the Dog server answered HTTP {resp.status_code}")
         if a_move["match_status"] == "next":
             self.status = 3  #   pass the turn and start looking for a move
         elif a_move["match_status"] == "finished":
             self.status = 2  #   connected without match
         return resp.text
 
-    def match_status(self):
-        url = self.url + "match/"
+    def match_status(self, wait=0):
+        """Consulta se chegou jogada nova. Com wait > 0 (long poll), o servidor pode segurar o pedido
+        por até wait segundos esperando uma jogada. Retorna True se algo chegou"""
+
         post_data = {"player_id": self.player_id, "game_id": self.game_id}
-        resp = requests.post(url, data=post_data)
-        resp_json = resp.text
-        seek_result = json.loads(resp_json)
+        if wait > 0:
+            post_data["wait"] = wait
+            post_data["order"] = self.move_order  # o servidor responde quando houver jogada mais nova
+        resp = self.post("match/", post_data, READ_TIMEOUT + wait)
+        seek_result = self.parse_response(resp)
+        if seek_result is None:
+            return False  # Sem resposta válida: a PollingThread espera mais e tenta de novo
         if bool(seek_result):
-            move_dictionary = eval(
-                seek_result["1"]
-            )  #   move is contained in seek_result as a string (to be converted in dictionary)
+            #   move is contained in seek_result as a string (to be converted in dictionary)
+            try:
+                move_dictionary = from_wire(parse_payload(seek_result["1"]))
+                match_status = move_dictionary.get("match_status")
+                if match_status != "interrupted" and bool(move_dictionary):
+                    move_player_id = str(move_dictionary["player"])
+                    move_player_order = int(move_dictionary["order"])
+            except (KeyError, TypeError, ValueError):
+                return False  #   malformed move: ignored, like an empty answer
             if bool(move_dictionary):
-                match_status = move_dictionary["match_status"]
                 if match_status == "interrupted":  #  an opponent has abandoned the match
                     self.dog_actor.receive_withdrawal_notification()
                     self.status = 2
-                else:
-                    move_player_id = move_dictionary["player"]
-                    move_player_order = move_dictionary["order"]
+                    return True
+                elif match_status in ("next", "finished"):
                     if move_player_id != str(self.player_id):  #  not from the player himself
-                        if int(move_player_order) > self.move_order:  #  not an already handled move
-                            self.move_order = int(move_player_order)
+                        if move_player_order > self.move_order:  #  not an already handled move
+                            self.move_order = move_player_order
                             self.dog_actor.receive_move(move_dictionary)
-                            if move_dictionary["match_status"] == "finished":
+                            if match_status == "finished":
                                 self.status = 2
+                            return True
+        return False
@@ -1,17 +1,53 @@
-from threading import Thread
+from threading import Event, Thread
+import random
 import time
 
+MIN_INTERVAL = 0.25  # segundos entre consultas logo depois de alguma novidade
+MAX_INTERVAL = 2.0  # teto do backoff enquanto nada acontece
+BACKOFF_MULTIPLIER = 2
+JITTER = 0.2  # fração sorteada para mais ou para menos, para os clientes não consultarem juntos
+IDLE_INTERVAL = 5.0  # sem partida nem conexão, só verifica o status de vez em quando
+LONG_POLL_WAIT = 25  # segundos que o servidor pode segurar uma consulta de jogada
+
 
 class PollingThread(Thread):
-    def __init__(self, a_proxy, daemon_value):
+    def __init__(self, a_proxy, daemon_value, long_poll=False):
         Thread.__init__(self, daemon=daemon_value)
         self.proxy = a_proxy
+        self.long_poll = long_poll
+        self.interval = MIN_INTERVAL
+        self.stop_event = Event()
+        self.wake_event = Event()
 
     def run(self):
-        while True:
+        while not self.stop_event.is_set():
+            start = time.monotonic()
             status = self.proxy.get_status()
             if status == 2:  #   connected without match
-                self.proxy.start_status()
+                changed = self.proxy.start_status()
             elif status == 3:  #   waiting remote move
-                self.proxy.match_status()
-            time.sleep(1)  # Sleep for 1 second
+                changed = self.proxy.match_status(LONG_POLL_WAIT if self.long_poll else 0)
+            else:
+                self.wait(IDLE_INTERVAL)
+                continue
+            if changed:
+                self.interval = MIN_INTERVAL
+            # O intervalo conta desde o início da consulta: um long poll que o servidor segurou
+            # já esperou o bastante, e um servidor sem long poll cai no backoff normal
+            delay = self.interval * random.uniform(1 - JITTER, 1 + JITTER) - (time.monotonic() - start)
+            self.interval = min(self.interval * BACKOFF_MULTIPLIER, MAX_INTERVAL)
+            self.wait(delay)
+
+    def wait(self, delay):
+        if self.wake_event.wait(max(delay, 0)):
+            self.interval = MIN_INTERVAL
+            self.wake_event.clear()
+
+    def poll_now(self):
+        """Consulta o servidor imediatamente e volta ao intervalo mínimo (chamado depois de enviar uma jogada)"""
+
+        self.wake_event.set()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
@@ -0,0 +1,268 @@
+"""Servidor Dog local: substitui o servidor remoto para desenvolvimento sem rede e testes de carga.
+
+Implementa os endpoints que o DogProxy usa (player/, start/, started/, move/ e match/), com as
+mesmas respostas JSON, sobre HTTP/1.1 com keep-alive usando só asyncio. A consulta match/ aceita
+long poll: com o campo wait, o pedido fica parado até chegar uma jogada do adversário com ordem
+maior que o campo order (ou até acabar o tempo).
+
+    python dog_server.py --port 8080
+    DOG_SERVER_URL=http://127.0.0.1:8080/ DOG_LONG_POLL=1 python dama_turca.py
+"""
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+PLAYER_TIMEOUT = 30.0 # Segundos sem consultas até o jogador ser considerado desconectado
+MAX_WAIT = 30.0 # Maior espera aceita num long poll
+MAX_BODY = 64 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class Player:
+    def __init__(self, name: str, player_id: str, game_id: str) -> None:
+        self.name = name
+        self.id = player_id
+        self.game_id = game_id
+        self.last_seen = time.monotonic()
+        self.match: Optional["Match"] = None
+
+    def touch(self) -> None:
+        self.last_seen = time.monotonic()
+
+    def is_online(self, now: float, timeout: float) -> bool:
+        return now - self.last_seen <= timeout
+
+    def is_free(self) -> bool:
+        return self.match is None or self.match.status != "progress"
+
+
+class Match:
+    """Partida entre jogadores de um mesmo jogo. As jogadas ficam na ordem em que chegaram"""
+
+    def __init__(self, players: List[Player]) -> None:
+        self.players = players
+        self.moves: List[Dict] = []
+        self.status = "progress" # progress, finished ou interrupted
+        self.news = asyncio.Event() # Trocado a cada jogada, acorda os long polls
+
+    def players_for(self, player: Player) -> List[List[str]]:
+        """Lista [nome, id, ordem] no formato do Dog, com quem pediu em primeiro"""
+
+        listed = [[other.name, other.id, str(order)] for order, other in enumerate(self.players, 1)]
+        index = self.players.index(player)
+        return [listed[index]] + listed[:index] + listed[index + 1:]
+
+    def add_move(self, player: Player, move: Dict) -> None:
+        move = dict(move, player=player.id, order=str(len(self.moves) + 1))
+        self.moves.append(move)
+        if move.get("match_status") == "finished":
+            self.status = "finished"
+        self.notify()
+
+    def interrupt(self) -> None:
+        self.status = "interrupted"
+        self.moves.append({"match_status": "interrupted"})
+        self.notify()
+
+    def notify(self) -> None:
+        self.news.set()
+        self.news = asyncio.Event()
+
+    def has_news(self, player: Player, after: int) -> bool:
+        if not self.moves:
+            return False
+        last = self.moves[-1]
+        if last.get("match_status") == "interrupted":
+            return True
+        return last["player"] != player.id and int(last["order"]) > after
+
+
+class DogServer:
+    def __init__(self, player_timeout: float = PLAYER_TIMEOUT, max_wait: float = MAX_WAIT) -> None:
+        self.player_timeout = player_timeout
+        self.max_wait = max_wait
+        self.players: Dict[Tuple[str, str], Player] = {} # (game_id, player_id) -> Player
+        self.requests: Dict[str, int] = {}
+        self.routes = {
+            "/player/": self.register_player,
+            "/start/": self.start_match,
+            "/started/": self.start_status,
+            "/move/": self.send_move,
+            "/match/": self.match_status,
+        }
+
+    def player(self, form: Dict[str, str]) -> Player:
+        """Jogador que fez o pedido; jogadores desconhecidos são registrados sem nome"""
+
+        key = (form.get("game_id", ""), form.get("player_id", ""))
+        player = self.players.get(key)
+        if player is None:
+            player = self.players[key] = Player("player" + key[1], key[1], key[0])
+        player.touch()
+        return player
+
+    def check_opponents(self, player: Player) -> None:
+        """Interrompe a partida se algum adversário parou de consultar o servidor"""
+
+        match = player.match
+        if match is not None and match.status == "progress":
+            now = time.monotonic()
+            if any(not other.is_online(now, self.player_timeout) for other in match.players if other is not player):
+                match.interrupt()
+
+    async def register_player(self, form: Dict[str, str]) -> Dict:
+        player = self.player(form)
+        player.name = form.get("player_name") or player.name
+        return {"0": "Jogador registrado", "1": player.id}
+
+    async def start_match(self, form: Dict[str, str]) -> Dict:
+        player = self.player(form)
+        if not player.is_free():
+            # Já foi chamado para uma partida enquanto o pedido chegava
+            return {"code": "2", "message": "Partida iniciada", "players": player.match.players_for(player)}
+        try:
+            number_of_players = int(form.get("number_of_players", "2"))
+        except ValueError:
+            number_of_players = 2
+        now = time.monotonic()
+        opponents = [other for other in self.players.values()
+                     if other is not player and other.game_id == player.game_id and other.is_free()
+                     and other.is_online(now, self.player_timeout)]
+        if len(opponents) < number_of_players - 1:
+            return {"code": "1", "message": "Jogadores insuficientes", "players": []}
+        # Quem pediu a partida joga primeiro
+        match = Match([player] + opponents[:number_of_players - 1])
+        for member in match.players:
+            member.match = match
+        return {"code": "2", "message": "Partida iniciada", "players": match.players_for(player)}
+
+    async def start_status(self, form: Dict[str, str]) -> Dict:
+        player = self.player(form)
+        match = player.match
+        if match is None or match.status != "progress":
+            return {"code": "1", "message": "Aguardando partida", "players": []}
+        return {"code": "2", "message": "Partida iniciada", "players": match.players_for(player)}
+
+    async def send_move(self, form: Dict[str, str]) -> Dict:
+        player = self.player(form)
+        move = json.loads(form.get("move", "{}"))
+        if not isinstance(move, dict):
+            raise ValueError("move must be a JSON object")
+        match = player.match
+        if match is None or match.status != "progress":
+            return {"0": "Sem partida em andamento"}
+        match.add_move(player, move)
+        return {"0": "Jogada recebida", "1": match.moves[-1]["order"]}
+
+    async def match_status(self, form: Dict[str, str]) -> Dict:
+        player = self.player(form)
+        wait = min(float(form.get("wait", "0")), self.max_wait)
+        after = int(form.get("order", "0"))
+        deadline = time.monotonic() + wait
+        while player.match is not None:
+            match = player.match
+            self.check_opponents(player)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or match.has_news(player, after):
+                break
+            try:
+                await asyncio.wait_for(match.news.wait(), min(remaining, self.player_timeout / 2))
+            except asyncio.TimeoutError:
+                pass
+            player.touch() # Quem está esperando num long poll continua conectado
+        if player.match is None or not player.match.moves:
+            return {}
+        # A jogada vai como repr de um dicionário, como no servidor Dog
+        return {"0": "Jogada", "1": repr(player.match.moves[-1])}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0"))
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and (version == "HTTP/1.1" or headers.get("connection", "").lower() == "keep-alive"))
+                status, payload = await self.dispatch(method, path.split("?")[0], body)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        route = self.routes.get(path)
+        if route is None:
+            return 404, {"error": f"Unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"error": "Only POST is supported"}
+        self.requests[path] = self.requests.get(path, 0) + 1
+        form = {name: values[-1] for name, values in parse_qs(body.decode("utf-8")).items()}
+        try:
+            return 200, await route(form)
+        except ValueError as error:
+            return 400, {"error": str(error)}
+
+    async def respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                      "Content-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    started: Optional[asyncio.Future] = None) -> None:
+        """Atende até ser cancelado. Se started for dado, recebe a porta em uso (útil com port=0)"""
+
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if started is not None:
+            started.set_result(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor Dog local para jogar e testar sem rede.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--player-timeout", type=float, default=PLAYER_TIMEOUT,
+                        help="segundos sem consultas até o adversário ser dado como desconectado")
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT, help="maior espera de um long poll, em segundos")
+    args = parser.parse_args(argv)
+
+    server = DogServer(args.player_timeout, args.max_wait)
+    print(f"DOG_SERVER_URL=http://{args.host}:{args.port}/", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    print(f"requests: {server.requests}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+from .search import Engine, SearchResult
+from .evaluation import evaluate
@@ -0,0 +1,26 @@
+from bitboard import BOARD_SIZE, ROW_0
+from piece_values import ADVANCE_BONUS, KING_VALUE, MAN_VALUE
+
+ROWS = tuple(ROW_0 << (BOARD_SIZE * row) for row in range(BOARD_SIZE))
+PLAYER1_ADVANCE = tuple((ROWS[row], ADVANCE_BONUS[row]) for row in range(BOARD_SIZE) if ADVANCE_BONUS[row])
+PLAYER2_ADVANCE = tuple((ROWS[BOARD_SIZE - 1 - row], ADVANCE_BONUS[row]) for row in range(BOARD_SIZE) if ADVANCE_BONUS[row])
+
+
+def evaluate_bitboards(player1: int, player2: int, kings: int, player1_to_move: bool) -> int:
+    """Avalia os bitboards do ponto de vista do lado que deve jogar: material mais avanço dos peões"""
+
+    men1 = player1 & ~kings
+    men2 = player2 & ~kings
+    score = ((men1.bit_count() - men2.bit_count()) * MAN_VALUE
+             + ((player1 & kings).bit_count() - (player2 & kings).bit_count()) * KING_VALUE)
+    for row_mask, bonus in PLAYER1_ADVANCE:
+        score += (men1 & row_mask).bit_count() * bonus
+    for row_mask, bonus in PLAYER2_ADVANCE:
+        score -= (men2 & row_mask).bit_count() * bonus
+    return score if player1_to_move else -score
+
+
+def evaluate(board) -> int:
+    """Avalia a posição do Board do ponto de vista do lado que deve jogar"""
+
+    return board.evaluate()
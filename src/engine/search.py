@@ -0,0 +1,365 @@
+import time
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from bitboard import DOWN, UP, apply_move, can_capture, can_step, generate_legal_moves
+from engine.evaluation import evaluate_bitboards
+from move import Move
+from owner import Owner
+from piece_values import PIECE_SQUARE_VALUES
+from tablebase import Outcome, Tablebase
+from transposition_table import Bound, TranspositionTable
+from zobrist import PIECE_KEYS, SIDE_KEY
+if TYPE_CHECKING:
+    from opening_book import OpeningBook
+
+MATE_SCORE = 1_000_000
+MATE_THRESHOLD = MATE_SCORE - 1000 # Scores acima disso são vitórias forçadas (a distância vai no resto)
+INFINITY = MATE_SCORE + 1
+MAX_PLY = 128
+MAX_QUIESCENCE_PLY = 32
+TIME_CHECK_INTERVAL = 1024 # Nós entre verificações do relógio
+MOVE_CACHE_SIZE = 200_000 # Listas de lances guardadas entre iterações do aprofundamento
+LMR_MIN_DEPTH = 3 # Profundidade mínima para reduzir lances tardios
+LMR_MIN_MOVES = 3 # Lances buscados com profundidade cheia antes de reduzir
+LMR_DEEP_MOVES = 6 # A partir deste lance a redução é dobrada
+FUTILITY_MAX_DEPTH = 2
+ASPIRATION_MIN_DEPTH = 4
+ASPIRATION_WINDOW = 40
+FUTILITY_MARGIN = 60
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_PIECES = 4 # Com menos peças o zugzwang é comum e passar a vez deixa de ser um limite inferior
+BOOK_MIN_GAMES = 8 # Lances do livro com menos partidas que isso são decididos pela busca
+BOOK_MIN_SCORE = 0.4 # Pontuação mínima de quem jogou o lance do livro (vitória 1, empate 0,5)
+
+EXACT = Bound.EXACT.value
+LOWER = Bound.LOWER.value
+UPPER = Bound.UPPER.value
+PLAYER1_KEYS = PIECE_KEYS[Owner.PLAYER1.value]
+PLAYER2_KEYS = PIECE_KEYS[Owner.PLAYER2.value]
+PLAYER1_VALUES = PIECE_SQUARE_VALUES[Owner.PLAYER1.value]
+PLAYER2_VALUES = PIECE_SQUARE_VALUES[Owner.PLAYER2.value]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchResult(NamedTuple):
+    best_move: Optional[Move]
+    score: int
+    depth: int
+    nodes: int
+    elapsed_ms: float
+    pv: List[Move]
+
+    @property
+    def nps(self) -> int:
+        """Nós por segundo"""
+
+        return int(self.nodes * 1000 / self.elapsed_ms) if self.elapsed_ms > 0 else 0
+
+
+def _score_to_tt(score: int, ply: int) -> int:
+    """Vitórias forçadas são guardadas relativas ao nó, não à raiz"""
+
+    if score > MATE_THRESHOLD:
+        return score + ply
+    if score < -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score: int, ply: int) -> int:
+    if score > MATE_THRESHOLD:
+        return score - ply
+    if score < -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def _tablebase_score(outcome: Outcome, distance: int, ply: int) -> int:
+    """Converte um resultado da tablebase em score de vitória forçada, como uma busca completa daria"""
+
+    if outcome == Outcome.WIN:
+        return MATE_SCORE - ply - distance
+    if outcome == Outcome.LOSS:
+        return -MATE_SCORE + ply + distance
+    return 0
+
+
+def _child_hash(key: int, move: Move, kings: int, player1_to_move: bool) -> int:
+    """Atualiza o hash de Zobrist com uma jogada, como Board.make_move faria"""
+
+    own_keys, enemy_keys = (PLAYER1_KEYS, PLAYER2_KEYS) if player1_to_move else (PLAYER2_KEYS, PLAYER1_KEYS)
+    is_king = kings >> move.origin & 1
+    key ^= SIDE_KEY ^ own_keys[is_king][move.origin] ^ own_keys[is_king or move.promotes][move.path[-1]]
+    for square in move.captured:
+        key ^= enemy_keys[kings >> square & 1][square]
+    return key
+
+
+def _child_score(score: int, move: Move, kings: int, player1_to_move: bool) -> int:
+    """Atualiza a avaliação (do ponto de vista do player1) com uma jogada, como Board._add_piece_terms faria"""
+
+    own_values, enemy_values = (PLAYER1_VALUES, PLAYER2_VALUES) if player1_to_move else (PLAYER2_VALUES, PLAYER1_VALUES)
+    is_king = kings >> move.origin & 1
+    score += own_values[is_king or move.promotes][move.path[-1]] - own_values[is_king][move.origin]
+    for square in move.captured:
+        score -= enemy_values[kings >> square & 1][square]
+    return score
+
+
+class Engine:
+    """Busca negamax alfa-beta com aprofundamento iterativo sobre as jogadas legais do Board.
+
+    A busca copia o bitboard do Board e gera os lances com as mesmas regras de
+    Board.generate_legal_moves, sem mexer nas posições e peças; a avaliação é atualizada a
+    cada jogada, como os contadores do Board. Usa tabela de transposição, busca de variante
+    principal com redução de lances tardios, lance nulo, ordenação de lances (lance da
+    tabela, killers e histórico) e extensão de quiescência enquanto houver capturas
+    obrigatórias. Com uma tablebase, posições com poucas peças são resolvidas
+    por consulta em vez de busca; com um livro de aberturas, posições do livro são
+    respondidas sem busca quando algum lance tem partidas e pontuação suficientes
+    (BOOK_MIN_GAMES e BOOK_MIN_SCORE)."""
+
+    def __init__(self, tt_size_mb: float = 16, tablebase: Optional[Tablebase] = None,
+                 book: Optional["OpeningBook"] = None) -> None:
+        self._tt = TranspositionTable(tt_size_mb)
+        self._tablebase = tablebase
+        self._book = book
+        self._killers: List[List[Optional[Move]]] = [[None, None] for _ in range(MAX_PLY)]
+        self._history: Dict[Tuple[int, int], int] = {}
+        self._pv: List[List[Move]] = [[] for _ in range(MAX_PLY + 1)]
+        self._nodes: int = 0
+        self._deadline: float = 0.0
+        # Hashes das posições do caminho atual, para detectar repetições. Uma posição repetida
+        # retorna antes de entrar no conjunto, então cada hash aparece no máximo uma vez
+        self._path_hashes: Set[int] = set()
+        self._move_cache: Dict[int, List[Move]] = {}
+
+    @property
+    def transposition_table(self) -> TranspositionTable:
+        return self._tt
+
+    def search(self, board, time_ms: int = 1000, max_depth: int = 64) -> SearchResult:
+        """Retorna o melhor lance encontrado para o lado que deve jogar dentro do tempo dado (em ms)"""
+
+        start = time.perf_counter()
+        self._deadline = start + time_ms / 1000
+        self._nodes = 0
+        self._path_hashes.clear()
+        self._tt.new_search()
+        for killers in self._killers:
+            killers[0] = killers[1] = None
+        self._history.clear()
+        self._move_cache.clear()
+
+        moves = board.generate_legal_moves()
+        if not moves:
+            return SearchResult(None, -MATE_SCORE, 0, 0, 0.0, [])
+        if len(moves) == 1:
+            return SearchResult(moves[0], 0, 0, 0, (time.perf_counter() - start) * 1000, [moves[0]])
+        if self._book is not None:
+            move = self._book.choose_move(board, min_games=BOOK_MIN_GAMES, min_score=BOOK_MIN_SCORE)
+            if move is not None:
+                return SearchResult(move, 0, 0, 0, (time.perf_counter() - start) * 1000, [move])
+        if self._tablebase is not None:
+            result = self._tablebase.probe_board(board)
+            if result is not None:
+                move = self._tablebase.best_move(board)
+                return SearchResult(move, _tablebase_score(*result, 0), 0, 0,
+                                    (time.perf_counter() - start) * 1000, [move])
+
+        bb = board.bitboard
+        player1_to_move = board.side_to_move == Owner.PLAYER1.value
+        own, enemy = (bb.player1, bb.player2) if player1_to_move else (bb.player2, bb.player1)
+
+        static = evaluate_bitboards(bb.player1, bb.player2, bb.kings, True)
+        best = SearchResult(moves[0], 0, 0, 0, 0.0, [moves[0]])
+        for depth in range(1, min(max_depth, MAX_PLY - 1) + 1):
+            try:
+                score = self._search_root(own, enemy, bb.kings, player1_to_move, board.hash, static,
+                                          depth, best.score)
+            except SearchTimeout:
+                break
+            pv = list(self._pv[0])
+            elapsed = (time.perf_counter() - start) * 1000
+            best = SearchResult(pv[0] if pv else best.best_move, score, depth, self._nodes, elapsed, pv)
+            if abs(score) > MATE_THRESHOLD or time.perf_counter() >= self._deadline:
+                break
+
+        elapsed = (time.perf_counter() - start) * 1000
+        return best._replace(nodes=self._nodes, elapsed_ms=elapsed)
+
+    def _search_root(self, own: int, enemy: int, kings: int, player1_to_move: bool, key: int, static: int,
+                     depth: int, previous_score: int) -> int:
+        """Busca com janela de aspiração em torno do score da iteração anterior"""
+
+        if depth < ASPIRATION_MIN_DEPTH or abs(previous_score) > MATE_THRESHOLD:
+            return self._negamax(own, enemy, kings, player1_to_move, key, static, depth, 0, -INFINITY, INFINITY)
+        window = ASPIRATION_WINDOW
+        while True:
+            alpha = max(previous_score - window, -INFINITY)
+            beta = min(previous_score + window, INFINITY)
+            score = self._negamax(own, enemy, kings, player1_to_move, key, static, depth, 0, alpha, beta)
+            if alpha < score < beta:
+                return score
+            window *= 4
+
+    def _check_time(self) -> None:
+        if time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+
+    def _order_moves(self, moves: List[Move], tt_move: Optional[Tuple[int, int]], ply: int) -> List[Move]:
+        if moves[0].captured:
+            # Pela regra da maioria as capturas legais têm o mesmo tamanho: só o lance da tabela sobe
+            for index, move in enumerate(moves):
+                if (move.origin, move.path[-1]) == tt_move:
+                    return [move] + moves[:index] + moves[index + 1:]
+            return moves
+
+        killers = self._killers[ply]
+        history = self._history
+
+        def priority(move: Move) -> int:
+            if tt_move is not None and (move.origin, move.path[-1]) == tt_move:
+                return 1 << 30
+            if move == killers[0]:
+                return 1 << 27
+            if move == killers[1]:
+                return 1 << 26
+            return history.get((move.origin, move.path[-1]), 0) + (1 << 20 if move.promotes else 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def _negamax(self, own: int, enemy: int, kings: int, player1_to_move: bool, key: int, static: int,
+                 depth: int, ply: int, alpha: int, beta: int, allow_null: bool = True) -> int:
+        """`static` é a avaliação da posição do ponto de vista do player1, atualizada a cada jogada"""
+
+        self._nodes += 1
+        if self._nodes % TIME_CHECK_INTERVAL == 0:
+            self._check_time()
+        self._pv[ply] = []
+
+        if ply > 0 and key in self._path_hashes:
+            return 0 # Repetição de posição: empate
+        if (self._tablebase is not None and ply > 0
+                and (own | enemy).bit_count() <= self._tablebase.max_pieces):
+            result = self._tablebase.probe(own, enemy, kings, player1_to_move)
+            if result is not None:
+                return _tablebase_score(*result, ply)
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            return self._quiescence(own, enemy, kings, player1_to_move, static, ply, alpha, beta, 0)
+
+        original_alpha = alpha
+        entry = self._tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry.move
+            if ply > 0 and entry.depth >= depth:
+                score = _score_from_tt(entry.score, ply)
+                if entry.bound == EXACT:
+                    return score
+                if entry.bound == LOWER and score >= beta:
+                    return score
+                if entry.bound == UPPER and score <= alpha:
+                    return score
+
+        moves = self._move_cache.get(key)
+        if moves is None:
+            moves = generate_legal_moves(own, enemy, kings, UP if player1_to_move else DOWN)
+            if len(self._move_cache) >= MOVE_CACHE_SIZE:
+                self._move_cache.clear()
+            self._move_cache[key] = moves
+        if not moves:
+            return -MATE_SCORE + ply
+
+        if depth <= FUTILITY_MAX_DEPTH and ply > 0 and not moves[0].captured and abs(beta) < MATE_THRESHOLD:
+            # Poda de futilidade reversa: sem capturas no ar, uma vantagem estática larga já corta
+            own_static = static if player1_to_move else -static
+            if own_static - FUTILITY_MARGIN * depth >= beta:
+                return own_static
+
+        if (allow_null and depth >= NULL_MOVE_MIN_DEPTH and ply > 0 and not moves[0].captured
+                and abs(beta) < MATE_THRESHOLD and own.bit_count() >= NULL_MOVE_MIN_PIECES
+                and (static if player1_to_move else -static) >= beta):
+            # Lance nulo: se passar a vez ainda corta com profundidade reduzida, a posição corta
+            score = -self._negamax(enemy, own, kings, not player1_to_move, key ^ SIDE_KEY, static,
+                                   depth - 1 - NULL_MOVE_REDUCTION, ply + 1, -beta, -beta + 1, False)
+            if score >= beta:
+                return beta
+
+        best_score = -INFINITY
+        best_move = None
+        self._path_hashes.add(key)
+        for index, move in enumerate(self._order_moves(moves, tt_move, ply)):
+            child_own, child_enemy, child_kings = apply_move(own, enemy, kings, move)
+            child_key = _child_hash(key, move, kings, player1_to_move)
+            child_static = _child_score(static, move, kings, player1_to_move)
+            if index == 0:
+                score = -self._negamax(child_enemy, child_own, child_kings, not player1_to_move, child_key,
+                                       child_static, depth - 1, ply + 1, -beta, -alpha)
+            else:
+                reduction = 0
+                if depth >= LMR_MIN_DEPTH and index >= LMR_MIN_MOVES and not move.captured and not move.promotes:
+                    reduction = 1 if index < LMR_DEEP_MOVES else 2
+                # Janela nula: só confirma que o lance não supera alfa; refaz a busca se superar
+                score = -self._negamax(child_enemy, child_own, child_kings, not player1_to_move, child_key,
+                                       child_static, depth - 1 - reduction, ply + 1, -alpha - 1, -alpha)
+                if alpha < score < beta or (reduction and score > alpha):
+                    score = -self._negamax(child_enemy, child_own, child_kings, not player1_to_move, child_key,
+                                           child_static, depth - 1, ply + 1, -beta, -alpha)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if alpha >= beta:
+                        if not move.captured:
+                            killers = self._killers[ply]
+                            if killers[0] != move:
+                                killers[1] = killers[0]
+                                killers[0] = move
+                            history_key = (move.origin, move.path[-1])
+                            self._history[history_key] = self._history.get(history_key, 0) + depth * depth
+                        break
+        self._path_hashes.discard(key)
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self._tt.store(key, depth, _score_to_tt(best_score, ply), bound, best_move)
+        return best_score
+
+    def _quiescence(self, own: int, enemy: int, kings: int, player1_to_move: bool, static: int,
+                    ply: int, alpha: int, beta: int, qply: int) -> int:
+        """Continua a busca enquanto houver capturas obrigatórias, para não avaliar posições instáveis"""
+
+        forward = UP if player1_to_move else DOWN
+        if qply >= MAX_QUIESCENCE_PLY or not can_capture(own, enemy, kings, forward):
+            if not can_step(own, enemy, kings, forward):
+                return -MATE_SCORE + ply # Sem lances: derrota
+            return static if player1_to_move else -static
+
+        # A captura é obrigatória: não há opção de ficar parado, então todas as capturas são buscadas
+        best_score = -INFINITY
+        for move in generate_legal_moves(own, enemy, kings, forward):
+            self._nodes += 1
+            if self._nodes % TIME_CHECK_INTERVAL == 0:
+                self._check_time()
+            child_own, child_enemy, child_kings = apply_move(own, enemy, kings, move)
+            child_static = _child_score(static, move, kings, player1_to_move)
+            score = -self._quiescence(child_enemy, child_own, child_kings, not player1_to_move, child_static,
+                                      ply + 1, -beta, -alpha, qply + 1)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
@@ -0,0 +1,270 @@
+"""Registro de partidas em um formato de texto no estilo PDN.
+
+Cada partida tem etiquetas entre colchetes, as jogadas em notação de Move.notation numeradas a
+cada duas meias-jogadas e o resultado (1-0, 0-1, 1/2-1/2 ou * para partida interrompida):
+
+    [Event "Dama turca"]
+    [Date "2024.05.01"]
+    [Player1 "Ana"]
+    [Player2 "Bia"]
+    [Result "1-0"]
+
+    1. a3-a4 h6-h5 2. a4-a5 b6xb4 ... 1-0
+
+As casas estão no referencial do player1 (o jogador local). Uma etiqueta Position (no formato de
+Board.position_string) indica uma posição inicial diferente da padrão, ou o player2 começando.
+
+O escritor só acrescenta ao fim do arquivo e grava cada jogada assim que ela é feita, então uma
+partida em andamento já está no disco. O leitor é um gerador que lê uma partida por vez.
+
+    python game_record.py stats games.pdn
+"""
+import sys
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+from move import Move, parse_square
+from owner import Owner
+
+if TYPE_CHECKING:
+    from board import Board
+
+INITIAL_POSITION = "......../oooooooo/oooooooo/......../......../xxxxxxxx/xxxxxxxx/........ 1"
+EVENT = "Dama turca"
+RESULTS = {Owner.PLAYER1.value: "1-0", Owner.PLAYER2.value: "0-1", None: "1/2-1/2"}
+UNFINISHED = "*"
+WINNERS = {result: winner for winner, result in RESULTS.items()}
+LINE_WIDTH = 80
+
+
+class GameRecord(NamedTuple):
+    tags: Dict[str, str]
+    moves: List[str] # Notação de Move.notation, no referencial do player1
+    result: str
+
+    @property
+    def finished(self) -> bool:
+        return self.result != UNFINISHED
+
+    @property
+    def winner(self) -> Optional[int]:
+        """Owner vencedor (None para empate). Só faz sentido para partidas terminadas"""
+
+        return WINNERS.get(self.result)
+
+    @property
+    def position(self) -> str:
+        return self.tags.get("Position", INITIAL_POSITION)
+
+
+def game_tags(player1: str, player2: str, position: str = INITIAL_POSITION, **extra: str) -> Dict[str, str]:
+    tags = {"Event": EVENT, "Date": time.strftime("%Y.%m.%d"), "Player1": player1, "Player2": player2}
+    if position != INITIAL_POSITION:
+        tags["Position"] = position
+    tags.update(extra)
+    return tags
+
+
+def _quote(value: str) -> str:
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class GameRecordWriter:
+    """Acrescenta partidas a um arquivo. Serve de Board.recorder: begin_game, add_move e
+    finish_game/abandon_game registram uma partida jogada pela interface, jogada a jogada"""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "a", encoding="utf-8")
+        self._in_game = False
+        self._plies = 0
+        self._column = 0
+
+    @property
+    def in_game(self) -> bool:
+        return self._in_game
+
+    def write_game(self, record: GameRecord) -> None:
+        """Grava uma partida completa de uma vez"""
+
+        self._begin(record.tags, record.result)
+        for notation in record.moves:
+            self._token(notation)
+        self._end(record.result)
+
+    def begin_game(self, player1: str, player2: str, position: str = INITIAL_POSITION) -> None:
+        if self._in_game:
+            self.abandon_game()
+        self._begin(game_tags(player1, player2, position))
+
+    def add_move(self, move: Move) -> None:
+        if self._in_game:
+            self._token(move.notation)
+            self._file.flush()
+
+    def finish_game(self, winner: Optional[int]) -> None:
+        """Fecha a partida em andamento com o Owner vencedor (None para empate)"""
+
+        if self._in_game:
+            self._end(RESULTS[winner])
+
+    def abandon_game(self) -> None:
+        if self._in_game:
+            self._end(UNFINISHED)
+
+    def _begin(self, tags: Dict[str, str], result: str = UNFINISHED) -> None:
+        # Partidas gravadas jogada a jogada ficam com a etiqueta Result "*": vale o resultado do fim do texto
+        lines = [f"[{name} {_quote(value)}]" for name, value in tags.items() if name != "Result"]
+        lines.append(f"[Result {_quote(result)}]")
+        self._file.write("\n".join(lines) + "\n\n")
+        self._in_game = True
+        self._plies = 0
+        self._column = 0
+
+    def _token(self, notation: str) -> None:
+        text = f"{self._plies // 2 + 1}. {notation}" if self._plies % 2 == 0 else notation
+        if self._column and self._column + 1 + len(text) > LINE_WIDTH:
+            self._file.write("\n")
+            self._column = 0
+        elif self._column:
+            text = " " + text
+        self._file.write(text)
+        self._column += len(text)
+        self._plies += 1
+
+    def _end(self, result: str) -> None:
+        self._file.write((" " if self._column else "") + result + "\n\n")
+        self._file.flush()
+        self._in_game = False
+
+    def close(self) -> None:
+        self.abandon_game()
+        self._file.close()
+
+    def __enter__(self) -> "GameRecordWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _parse_tag(line: str, line_number: int) -> Tuple[str, str]:
+    name, _, rest = line[1:-1].partition(" ")
+    rest = rest.strip()
+    if not name or len(rest) < 2 or rest[0] != '"' or rest[-1] != '"':
+        raise ValueError(f"Line {line_number}: invalid tag {line!r}")
+    return name, rest[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+
+
+def _check_notation(token: str, line_number: int) -> str:
+    separator = "x" if "x" in token else "-"
+    squares = token.split(separator)
+    try:
+        if len(squares) < 2:
+            raise ValueError
+        for square in squares:
+            parse_square(square)
+    except ValueError:
+        raise ValueError(f"Line {line_number}: invalid move {token!r}") from None
+    return token
+
+
+def read_games(source: Union[str, TextIO, Iterable[str]]) -> Iterator[GameRecord]:
+    """Gera as partidas de um arquivo (caminho ou linhas), uma por vez. Uma partida sem resultado
+    no fim do arquivo (ainda em andamento ou interrompida) sai com resultado "*" """
+
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as lines:
+            yield from read_games(lines)
+        return
+
+    tags: Dict[str, str] = {}
+    moves: List[str] = []
+    in_moves = False
+    in_comment = False
+    for line_number, line in enumerate(source, 1):
+        line = line.strip()
+        if in_comment:
+            if "}" not in line:
+                continue
+            line = line[line.index("}") + 1:]
+            in_comment = False
+        if not line:
+            continue
+        if line.startswith("["):
+            if in_moves: # Nova partida sem o resultado da anterior
+                yield GameRecord(tags, moves, UNFINISHED)
+                tags, moves, in_moves = {}, [], False
+            if not line.endswith("]"):
+                raise ValueError(f"Line {line_number}: invalid tag {line!r}")
+            name, value = _parse_tag(line, line_number)
+            tags[name] = value
+            continue
+        in_moves = True
+        while "{" in line: # Comentários de uma linha saem; os de várias linhas, no laço de fora
+            start = line.index("{")
+            end = line.find("}", start)
+            if end < 0:
+                line, in_comment = line[:start], True
+                break
+            line = line[:start] + " " + line[end + 1:]
+        for token in line.split():
+            if token in WINNERS or token == UNFINISHED:
+                yield GameRecord(tags, moves, token)
+                tags, moves, in_moves = {}, [], False
+            elif token[0].isdigit():
+                number, dot, notation = token.partition(".")
+                if not dot or not number.isdigit():
+                    raise ValueError(f"Line {line_number}: invalid token {token!r}")
+                notation = notation.lstrip(".")
+                if notation: # "12.a3-a4", sem espaço
+                    moves.append(_check_notation(notation, line_number))
+            else:
+                moves.append(_check_notation(token, line_number))
+    if in_moves or tags:
+        yield GameRecord(tags, moves, UNFINISHED)
+
+
+def replay(record: GameRecord) -> Iterator[Tuple["Board", Move]]:
+    """Refaz a partida num Board, gerando (tabuleiro antes da jogada, jogada). O Board é o mesmo
+    objeto a cada passo e já recebe a jogada assim que o próximo item é pedido"""
+
+    from board import Board
+
+    board = Board()
+    board.load_position(record.position)
+    for ply, notation in enumerate(record.moves):
+        move = next((move for move in board.generate_legal_moves() if move.notation == notation), None)
+        if move is None:
+            raise ValueError(f"Illegal move {notation!r} at ply {ply}")
+        yield board, move
+        board.make_move(move)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lê arquivos de partidas.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats_parser = commands.add_parser("stats", help="conta partidas, resultados e jogadas")
+    stats_parser.add_argument("paths", nargs="+")
+    stats_parser.add_argument("--check", action="store_true", help="refaz as partidas e confere as jogadas")
+    args = parser.parse_args(argv)
+
+    results = {result: 0 for result in list(WINNERS) + [UNFINISHED]}
+    games = plies = 0
+    start = time.perf_counter()
+    for path in args.paths:
+        for record in read_games(path):
+            if args.check:
+                for _ in replay(record):
+                    pass
+            games += 1
+            plies += len(record.moves)
+            results[record.result] += 1
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {plies} plies in {elapsed:.1f} s: " + ", ".join(f"{result} {count}" for result, count in results.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,3 +7,5 @@ class GameStatus(Enum):
     OCCURRING_LOCAL_MOVE = 4
     WAITING_REMOTE_MOVE = 5
     ABANDONED = 6
+
+GAME_STATUS_VALUES = frozenset(status.value for status in GameStatus)
@@ -0,0 +1,236 @@
+"""Gerador de carga para o protocolo Dog: muitos clientes simulados jogando partidas de verdade.
+
+Cada cliente tem o próprio DogProxy e a própria PollingThread, como o jogo com interface; as
+jogadas são sorteadas entre as legais do Board e enviadas no mesmo formato que a interface envia.
+Metade dos clientes pede partidas e a outra metade espera ser chamada. No fim, mostra a vazão e
+os percentis da latência de ida e volta das jogadas (do send_move de um cliente até o
+match_status do adversário entregá-la).
+
+    python dog_server.py --port 8080 &
+    python load_test.py --clients 200 --games 2 --url http://127.0.0.1:8080/
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from board import Board
+from game_status import GameStatus
+
+DEFAULT_CLIENTS = 100
+DEFAULT_GAMES = 1 # Partidas por cliente
+DEFAULT_MAX_PLIES = 200 # Depois disso o cliente encerra a partida empatada
+DEFAULT_TIMEOUT = 300.0
+START_RETRY = 0.5 # Segundos entre pedidos de partida sem adversário livre
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class SimulatedPlayer:
+    """Faz o papel do DogActor e da PlayerInterface de um cliente, sem interface"""
+
+    def __init__(self, index: int, games: int, max_plies: int, seed: int, long_poll: bool,
+                 latencies: List[float]) -> None:
+        from dog.dog_proxy import DogProxy
+        from dog.polling_thread import PollingThread
+
+        self.index = index
+        self.games = games
+        self.max_plies = max_plies
+        self.rng = random.Random(seed)
+        self.latencies = latencies # Compartilhada por todos os clientes
+        self.proxy = DogProxy()
+        self.polling_thread = PollingThread(self.proxy, True, long_poll)
+        self.board = Board()
+        self.lock = threading.Lock() # A PollingThread e o laço de start_match chamam o jogador
+        self.in_match = False
+        self.plies = 0
+        self.games_played = 0
+        self.moves_sent = 0
+        self.errors = 0
+        self.send_failures = 0
+
+    @property
+    def done(self) -> bool:
+        return self.games_played >= self.games
+
+    def initialize(self, player_id: str, game_id: str) -> bool:
+        message = self.proxy.initialize(f"load{self.index}", self, player_id, game_id)
+        if self.proxy.get_status() != 2:
+            print(f"client {self.index}: {message}", file=sys.stderr)
+            return False
+        self.polling_thread.start()
+        return True
+
+    def try_start(self) -> None:
+        """Pede uma partida, se o cliente ainda não estiver em uma"""
+
+        with self.lock:
+            if self.in_match or self.done:
+                return
+        start_status = self.proxy.start_match(2)
+        if start_status.get_code() == "2":
+            self.receive_start(start_status)
+
+    def receive_start(self, start_status) -> None:
+        with self.lock:
+            if self.in_match:
+                return # Já começou por start_match e por start_status ao mesmo tempo
+            self.in_match = True
+            self.plies = 0
+            self.board.reset_game()
+            self.board.start_match(start_status.get_players(), start_status.get_local_id())
+            if self.board.game_status == GameStatus.WAITING_LOCAL_MOVE.value:
+                self.play()
+
+    def receive_move(self, a_move: Dict) -> None:
+        with self.lock:
+            if not self.in_match:
+                return
+            sent_at = a_move.get("sent_at")
+            if sent_at is not None:
+                self.latencies.append(time.perf_counter() - sent_at)
+            self.plies += 1
+            self.board.receive_move(a_move)
+            if a_move["match_status"] == "finished" or self.board.game_status == GameStatus.FINISHED.value:
+                self.finish_match()
+            else:
+                self.play()
+
+    def receive_withdrawal_notification(self) -> None:
+        with self.lock:
+            if self.in_match:
+                self.errors += 1
+                self.finish_match()
+
+    def finish_match(self) -> None:
+        self.in_match = False
+        self.games_played += 1
+
+    def play(self) -> None:
+        """Sorteia e envia uma jogada legal, como a interface faria clique a clique"""
+
+        board = self.board
+        moves = board.generate_legal_moves()
+        if not moves or self.plies >= self.max_plies:
+            # Sem jogadas perde; no limite de meias-jogadas a partida termina empatada
+            winner = board.player2.name if not moves else None
+            self.send({"winner": winner, "match_status": "finished"})
+            self.finish_match()
+            return
+        move = self.rng.choice(moves)
+        positions = board.positions
+        origin = positions[move.origin // 8][move.origin % 8]
+        board.first_selected_origin = origin
+        board.current_selected_origin = origin
+        for square in move.path:
+            board.move_piece(board.current_selected_origin, positions[square // 8][square % 8])
+            board.current_selected_origin = positions[square // 8][square % 8]
+        status = board.game_status
+        move_to_send = board.move_to_send
+        board.first_selected_origin = None
+        board.current_selected_origin = None
+        board.move_to_send = None
+        board.clear_captured_pieces_on_this_turn()
+        self.plies += 1
+        if not self.send(move_to_send):
+            self.finish_match() # Jogada perdida: o cliente desiste da partida
+            return
+        if status == GameStatus.FINISHED.value:
+            self.finish_match()
+        else:
+            board.switch_turn()
+
+    def send(self, a_move: Dict) -> bool:
+        try:
+            self.proxy.send_move(dict(a_move, sent_at=time.perf_counter()))
+        except ConnectionError as error:
+            print(f"client {self.index}: {error}", file=sys.stderr)
+            self.send_failures += 1
+            return False
+        self.moves_sent += 1
+        self.polling_thread.poll_now()
+        return True
+
+    def stop(self) -> None:
+        self.polling_thread.stop()
+        self.proxy.close()
+
+
+def run_load(clients: int, games: int, max_plies: int = DEFAULT_MAX_PLIES, seed: int = 0,
+             long_poll: bool = False, timeout: float = DEFAULT_TIMEOUT) -> Dict:
+    """Roda os clientes até todos jogarem `games` partidas (ou até o timeout) e retorna o relatório"""
+
+    latencies: List[float] = []
+    players = [SimulatedPlayer(index, games, max_plies, seed + index, long_poll, latencies)
+               for index in range(clients)]
+    # Um jogo por execução: clientes de execuções anteriores ainda parecem conectados ao servidor
+    base_id = str(int(time.time() * 1000))
+    players = [player for player in players if player.initialize(f"{base_id}{player.index:05d}", f"load{base_id}")]
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    starters = players[::2]
+    while time.perf_counter() < deadline and not all(player.done for player in players):
+        for player in starters:
+            player.try_start()
+        time.sleep(START_RETRY)
+    elapsed = time.perf_counter() - start
+    for player in players:
+        player.stop()
+
+    ordered = sorted(latencies)
+    endpoints: Dict[str, Dict] = {}
+    for player in players:
+        for endpoint, summary in player.proxy.get_metrics().items():
+            totals = endpoints.setdefault(endpoint, {"requests": 0, "failures": 0, "retries": 0})
+            for key in totals:
+                totals[key] += summary[key]
+    games_played = sum(player.games_played for player in players) // 2
+    return {
+        "clients": len(players),
+        "elapsed_s": round(elapsed, 2),
+        "games": games_played,
+        "moves": len(ordered),
+        "moves_per_s": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "games_per_s": round(games_played / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+        "withdrawals": sum(player.errors for player in players),
+        "send_failures": sum(player.send_failures for player in players),
+        "unfinished": sum(1 for player in players if not player.done),
+        "requests": endpoints,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mede a latência das jogadas com muitos clientes Dog simulados.")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS)
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="partidas por cliente")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="servidor Dog (padrão: DOG_SERVER_URL ou o servidor remoto)")
+    parser.add_argument("--long-poll", action="store_true", help="usa long poll na consulta de jogadas")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="tempo máximo do teste, em segundos")
+    args = parser.parse_args(argv)
+
+    if args.clients < 2:
+        parser.error("at least two clients are needed")
+    if args.url:
+        os.environ["DOG_SERVER_URL"] = args.url
+    report = run_load(args.clients, args.games, args.max_plies, args.seed, args.long_poll, args.timeout)
+    print(json.dumps(report, indent=2))
+    return 0 if report["unfinished"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
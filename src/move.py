@@ -0,0 +1,46 @@
+from typing import NamedTuple, Tuple
+
+BOARD_SIZE = 8
+COLUMN_NAMES = "abcdefgh"
+
+
+def square_name(square: int) -> str:
+    """Nome algébrico da casa: colunas a-h da esquerda para a direita, linhas 1-8 de baixo para cima"""
+
+    row, col = divmod(square, BOARD_SIZE)
+    return f"{COLUMN_NAMES[col]}{BOARD_SIZE - row}"
+
+
+def parse_square(name: str) -> int:
+    if len(name) != 2 or name[0] not in COLUMN_NAMES or not name[1].isdigit() or not 1 <= int(name[1]) <= BOARD_SIZE:
+        raise ValueError(f"Invalid square name: {name!r}")
+    return (BOARD_SIZE - int(name[1])) * BOARD_SIZE + COLUMN_NAMES.index(name[0])
+
+
+class Move(NamedTuple):
+    """Jogada completa de um turno, com casas no formato row * 8 + col.
+
+    - origin: casa de onde a peça sai
+    - path: casas de pouso, em ordem (uma só para passos simples)
+    - captured: casas das peças capturadas, na ordem da captura
+    - promotes: se a peça é promovida ao fim da jogada"""
+
+    origin: int
+    path: Tuple[int, ...]
+    captured: Tuple[int, ...] = ()
+    promotes: bool = False
+
+    @property
+    def destination(self) -> int:
+        return self.path[-1]
+
+    @property
+    def is_capture(self) -> bool:
+        return bool(self.captured)
+
+    @property
+    def notation(self) -> str:
+        """Notação textual: "a3-a4" para passos simples, "a3xa5xc5" para capturas"""
+
+        separator = "x" if self.captured else "-"
+        return separator.join(square_name(square) for square in (self.origin,) + self.path)
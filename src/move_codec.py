@@ -0,0 +1,139 @@
+"""Codificação compacta das jogadas trocadas pelo servidor Dog.
+
+Uma jogada vira uma string curta e versionada: a versão, a origem, as casas de pouso, as casas
+capturadas depois de "." e "*" se houver promoção. Cada casa (row * 8 + col, do ponto de vista
+de quem jogou) ocupa um caractere do alfabeto base64 de URLs:
+
+    "1" + origem + pousos [+ "." + capturadas] [+ "*"]      ex.: "1qa.i" (c3xc5, capturando c4)
+
+A jogada compacta vai no campo "m" do dicionário enviado ao servidor, junto de match_status e
+winner, que o servidor e a interface continuam lendo. Dicionários no formato antigo (origin,
+destination, captured_pieces, promoted) continuam sendo aceitos na leitura.
+"""
+import ast
+import json
+import re
+from typing import Dict
+
+from move import BOARD_SIZE, Move
+
+WIRE_VERSION = "1"
+WIRE_KEY = "m"
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+MAX_SQUARES = 32 # Mais casas do que qualquer jogada legal, para recusar mensagens absurdas
+LEGACY_KEYS = ("origin", "destination", "path", "captured_pieces", "promoted", "game_status")
+
+_INDEX = {char: index for index, char in enumerate(ALPHABET)}
+_CHARS = f"[{re.escape(ALPHABET)}]"
+_WIRE_MOVE = re.compile(rf"{WIRE_VERSION}({_CHARS})({_CHARS}{{1,{MAX_SQUARES}}})(?:\.({_CHARS}{{1,{MAX_SQUARES}}}))?(\*)?")
+# Dicionário plano como o repr do Python o escreve: chaves e valores sem aspas nem barras escapadas
+_FLAT_ITEM = r"'([^'\\]*)': (?:'([^'\\]*)'|(None|True|False)|(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?))"
+_FLAT_DICT = re.compile(rf"\{{(?:{_FLAT_ITEM}(?:, {_FLAT_ITEM})*)?\}}")
+_FLAT_ITEMS = re.compile(_FLAT_ITEM)
+_CONSTANTS = {"None": None, "True": True, "False": False}
+
+
+def encode_move(move: Move) -> str:
+    text = WIRE_VERSION + ALPHABET[move.origin] + "".join(ALPHABET[square] for square in move.path)
+    if move.captured:
+        text += "." + "".join(ALPHABET[square] for square in move.captured)
+    if move.promotes:
+        text += "*"
+    return text
+
+
+def decode_move(text: str) -> Move:
+    """Decodifica uma jogada de encode_move. Qualquer desvio do formato é um ValueError"""
+
+    match = _WIRE_MOVE.fullmatch(text) if isinstance(text, str) else None
+    if match is None:
+        raise ValueError(f"Invalid wire move: {text!r}")
+    origin, path, captured, promotes = match.groups()
+    path = tuple(_INDEX[char] for char in path)
+    captured = tuple(_INDEX[char] for char in captured) if captured else ()
+    if len(path) > 1 and len(captured) != len(path):
+        raise ValueError(f"Invalid wire move: {text!r} lands {len(path)} times with {len(captured)} captures")
+    if len(set(captured)) != len(captured):
+        raise ValueError(f"Invalid wire move: {text!r} captures a square twice")
+    return Move(_INDEX[origin], path, captured, promotes is not None)
+
+
+def move_from_dict(a_move: Dict) -> Move:
+    """Jogada de um dicionário no formato de Board.move_to_send. Sem o campo path (versões antigas),
+    o caminho fica só com o destino final"""
+
+    def square(position: Dict) -> int:
+        row, col = position["row"], position["col"]
+        if not (isinstance(row, int) and isinstance(col, int) and 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+            raise ValueError(f"Invalid position in move: {position!r}")
+        return row * BOARD_SIZE + col
+
+    captured = tuple(square(position) for position in a_move.get("captured_pieces", ()))
+    path = tuple(square(position) for position in a_move.get("path") or (a_move["destination"],))
+    return Move(square(a_move["origin"]), path, captured, bool(a_move.get("promoted")))
+
+
+def move_to_dict(move: Move) -> Dict:
+    """Campos de jogada no formato de Board.move_to_send (os que Board.receive_move lê)"""
+
+    def position(square: int) -> Dict[str, int]:
+        row, col = divmod(square, BOARD_SIZE)
+        return {"row": row, "col": col}
+
+    return {
+        "origin": position(move.origin),
+        "destination": position(move.destination),
+        "path": [position(square) for square in move.path],
+        "captured_pieces": [position(square) for square in move.captured],
+        "promoted": move.promotes,
+    }
+
+
+def to_wire(a_move: Dict) -> Dict:
+    """Troca os campos de jogada de um dicionário da interface pela jogada compacta. Dicionários
+    sem jogada (fim de partida) e campos extras passam como estão"""
+
+    if "origin" not in a_move:
+        return a_move
+    wire = {key: value for key, value in a_move.items() if key not in LEGACY_KEYS}
+    wire[WIRE_KEY] = encode_move(move_from_dict(a_move))
+    return wire
+
+
+def from_wire(wire: Dict) -> Dict:
+    """Inverso de to_wire; dicionários no formato antigo são devolvidos como estão"""
+
+    if WIRE_KEY not in wire:
+        return wire
+    a_move = {key: value for key, value in wire.items() if key != WIRE_KEY}
+    a_move.update(move_to_dict(decode_move(wire[WIRE_KEY])))
+    a_move.setdefault("winner", None)
+    return a_move
+
+
+def parse_payload(text: str) -> Dict:
+    """Lê a jogada devolvida pelo servidor, que vem como repr de um dicionário, sem eval.
+
+    Dicionários planos (o formato compacto) são lidos por expressão regular; os aninhados do
+    formato antigo, por ast.literal_eval, que só aceita literais. JSON também é aceito."""
+
+    if _FLAT_DICT.fullmatch(text):
+        result = {}
+        for key, string, constant, number in _FLAT_ITEMS.findall(text):
+            if constant:
+                result[key] = _CONSTANTS[constant]
+            elif number:
+                result[key] = float(number) if "." in number or "e" in number.lower() else int(number)
+            else:
+                result[key] = string
+        return result
+    try:
+        result = ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        try:
+            result = json.loads(text)
+        except ValueError:
+            raise ValueError(f"Invalid move payload: {text[:80]!r}") from None
+    if not isinstance(result, dict):
+        raise ValueError(f"Move payload must be a dictionary. Instead, it is {type(result).__name__}")
+    return result
@@ -0,0 +1,220 @@
+"""Livro de aberturas: estatísticas das primeiras jogadas de muitas partidas, indexadas pelo
+hash de Zobrist da posição.
+
+O arquivo tem um cabeçalho e registros de tamanho fixo (hash, jogada, partidas, vitórias,
+empates) ordenados por hash, consultados por busca binária sobre o arquivo mapeado em memória.
+
+    python self_play.py --games 5000 --player1 engine --player2 engine --engine-time 50 --output games.jsonl
+    python opening_book.py build games.jsonl --plies 16 --output book.bin
+    python opening_book.py probe book.bin
+"""
+import json
+import mmap
+import random
+import struct
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from board import Board
+from move import Move
+from owner import Owner
+from transposition_table import decode_move, encode_move
+
+MAGIC = b"TKOB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI") # Assinatura, versão, profundidade em meias-jogadas, número de registros
+RECORD = struct.Struct("<QHIII") # Hash, jogada (origem e destino), partidas, vitórias e empates de quem jogou
+DEFAULT_PLIES = 16
+WINNER_OWNERS = {"player1": Owner.PLAYER1.value, "player2": Owner.PLAYER2.value, None: None}
+
+
+class BookEntry(NamedTuple):
+    move: Tuple[int, int] # (origem, destino)
+    games: int
+    wins: int
+    draws: int
+
+    @property
+    def losses(self) -> int:
+        return self.games - self.wins - self.draws
+
+    @property
+    def score(self) -> float:
+        """Pontuação média de quem jogou o lance (vitória 1, empate 0,5)"""
+
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.0
+
+
+def find_move(board: Board, move: Tuple[int, int]) -> Optional[Move]:
+    """Jogada legal do Board com a origem e o destino dados"""
+
+    for legal_move in board.generate_legal_moves():
+        if (legal_move.origin, legal_move.path[-1]) == move:
+            return legal_move
+    return None
+
+
+class OpeningBookBuilder:
+    """Acumula as primeiras `plies` jogadas de partidas e grava o livro"""
+
+    def __init__(self, plies: int = DEFAULT_PLIES) -> None:
+        if plies <= 0:
+            raise ValueError(f"Book depth must be positive. Instead, plies is {plies}")
+        self._plies = plies
+        self._stats: Dict[Tuple[int, int], List[int]] = {} # (hash, jogada) -> [partidas, vitórias, empates]
+        self._board = Board()
+        self.games: int = 0
+
+    def add_game(self, moves: Iterable[str], winner: Optional[int]) -> None:
+        """Soma uma partida, dada pelas jogadas em notação (Move.notation) e pelo Owner vencedor
+        (None para empate)"""
+
+        board = self._board
+        board.reset_game()
+        for ply, notation in enumerate(moves):
+            if ply >= self._plies:
+                break
+            legal = {move.notation: move for move in board.generate_legal_moves()}
+            move = legal.get(notation)
+            if move is None:
+                raise ValueError(f"Illegal move {notation!r} at ply {ply}")
+            stats = self._stats.setdefault((board.hash, encode_move(move)), [0, 0, 0])
+            stats[0] += 1
+            if winner is None:
+                stats[2] += 1
+            elif winner == board.side_to_move:
+                stats[1] += 1
+            board.make_move(move)
+        self.games += 1
+
+    def add_self_play_file(self, path: str) -> None:
+        """Soma as partidas de um arquivo gerado por self_play.py"""
+
+        with open(path) as games:
+            for line in games:
+                if line.strip():
+                    game = json.loads(line)
+                    self.add_game(game["moves"], WINNER_OWNERS[game["winner"]])
+
+    def write(self, path: str, min_games: int = 1) -> int:
+        """Grava os lances jogados em pelo menos `min_games` partidas. Retorna o número de registros"""
+
+        records = sorted((key, move, *stats) for (key, move), stats in self._stats.items() if stats[0] >= min_games)
+        with open(path, "wb") as output:
+            output.write(HEADER.pack(MAGIC, VERSION, self._plies, len(records)))
+            for record in records:
+                output.write(RECORD.pack(*record))
+        return len(records)
+
+
+class OpeningBook:
+    """Consulta a um livro de aberturas mapeado em memória"""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._plies, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} opening book file")
+        if len(self._map) != HEADER.size + self._count * RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is truncated: expected {self._count} records")
+
+    @property
+    def plies(self) -> int:
+        return self._plies
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_at(self, index: int) -> int:
+        return struct.unpack_from("<Q", self._map, HEADER.size + index * RECORD.size)[0]
+
+    def probe(self, key: int) -> List[BookEntry]:
+        """Lances registrados para a posição com o hash dado"""
+
+        low, high = 0, self._count
+        while low < high: # Primeiro registro com hash >= key
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        for index in range(low, self._count):
+            record_key, move, games, wins, draws = RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+            if record_key != key:
+                break
+            entries.append(BookEntry(decode_move(move), games, wins, draws))
+        return entries
+
+    def choose_move(self, board: Board, rng: Optional[random.Random] = None, min_games: int = 1,
+                    min_score: float = 0.0) -> Optional[Move]:
+        """Escolhe um lance do livro para o Board: com rng, sorteia proporcionalmente às partidas;
+        sem, o mais jogado. Só considera lances com ao menos `min_games` partidas e pontuação
+        `min_score`. Retorna None se nenhum lance da posição passar nesses limites"""
+
+        entries = [entry for entry in self.probe(board.hash) if entry.games >= min_games and entry.score >= min_score]
+        if not entries:
+            return None
+        if rng is None:
+            entry = max(entries, key=lambda entry: (entry.games, entry.score))
+        else:
+            entry = rng.choices(entries, weights=[entry.games for entry in entries])[0]
+        return find_move(board, entry.move) # None se o hash colidiu com outra posição
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera e consulta o livro de aberturas.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="gera o livro a partir de arquivos do self_play.py")
+    build_parser.add_argument("games", nargs="+", help="arquivos JSON por linha gerados por self_play.py")
+    build_parser.add_argument("--plies", type=int, default=DEFAULT_PLIES, help="meias-jogadas de cada partida")
+    build_parser.add_argument("--min-games", type=int, default=1, help="descarta lances jogados menos vezes")
+    build_parser.add_argument("--output", default="book.bin")
+    probe_parser = commands.add_parser("probe", help="mostra os lances do livro para uma posição")
+    probe_parser.add_argument("path")
+    probe_parser.add_argument("--position", help="posição no formato de Board.position_string (padrão: inicial)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        builder = OpeningBookBuilder(args.plies)
+        for path in args.games:
+            builder.add_self_play_file(path)
+        records = builder.write(args.output, args.min_games)
+        print(f"{builder.games} games, {records} records -> {args.output}")
+        return 0
+
+    board = Board()
+    if args.position:
+        try:
+            board.load_position(args.position)
+        except ValueError as error:
+            parser.error(str(error))
+    with OpeningBook(args.path) as book:
+        entries = sorted(book.probe(board.hash), key=lambda entry: entry.games, reverse=True)
+        if not entries:
+            print("not in book")
+            return 1
+        for entry in entries:
+            move = find_move(board, entry.move)
+            name = move.notation if move is not None else "?"
+            print(f"{name}: {entry.games} games, +{entry.wins} ={entry.draws} -{entry.losses} ({entry.score:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
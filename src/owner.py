@@ -0,0 +1,5 @@
+from enum import Enum
+
+class Owner(Enum):
+    PLAYER1 = 1 # Jogador local, na parte de baixo do tabuleiro
+    PLAYER2 = 2 # Jogador remoto, na parte de cima do tabuleiro
@@ -0,0 +1,132 @@
+"""Perft: conta as folhas da árvore de jogadas legais até uma profundidade.
+
+Serve para validar o gerador de jogadas (contagens conhecidas da posição inicial em
+GOLDEN_NODES) e como medida de velocidade da geração de movimentos.
+
+    python perft.py 6
+    python perft.py 7 --divide --workers 4
+    python perft.py 5 --position "......../...o..../......../......../......../......../...X..../........ 1"
+"""
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from bitboard import DOWN, UP, apply_move, generate_legal_moves
+from board import Board
+from move import Move
+from owner import Owner
+
+# Número de folhas a partir de place_pieces_on_board, com o player1 jogando primeiro
+GOLDEN_NODES = {
+    1: 8,
+    2: 64,
+    3: 708,
+    4: 7538,
+    5: 85020,
+    6: 930326,
+    7: 10764134,
+}
+
+
+def perft(own: int, enemy: int, kings: int, player1_to_move: bool, depth: int) -> int:
+    """Conta as posições alcançáveis em exatamente `depth` jogadas"""
+
+    if depth == 0:
+        return 1
+    moves = generate_legal_moves(own, enemy, kings, UP if player1_to_move else DOWN)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        child_own, child_enemy, child_kings = apply_move(own, enemy, kings, move)
+        nodes += perft(child_enemy, child_own, child_kings, not player1_to_move, depth - 1)
+    return nodes
+
+
+def _board_state(board: Board) -> Tuple[int, int, int, bool]:
+    bb = board.bitboard
+    player1_to_move = board.side_to_move == Owner.PLAYER1.value
+    if player1_to_move:
+        return bb.player1, bb.player2, bb.kings, True
+    return bb.player2, bb.player1, bb.kings, False
+
+
+def _perft_root_move(args: Tuple[int, int, int, bool, Move, int]) -> Tuple[Move, int]:
+    own, enemy, kings, player1_to_move, move, depth = args
+    child_own, child_enemy, child_kings = apply_move(own, enemy, kings, move)
+    return move, perft(child_enemy, child_own, child_kings, not player1_to_move, depth - 1)
+
+
+def divide(board: Board, depth: int, workers: int = 1) -> List[Tuple[Move, int]]:
+    """Retorna a contagem de folhas de cada jogada da raiz. Com workers > 1, as jogadas
+    da raiz são divididas entre processos"""
+
+    own, enemy, kings, player1_to_move = _board_state(board)
+    moves = generate_legal_moves(own, enemy, kings, UP if player1_to_move else DOWN)
+    tasks = [(own, enemy, kings, player1_to_move, move, depth) for move in moves]
+    if workers > 1 and len(tasks) > 1:
+        from multiprocessing import Pool
+
+        with Pool(min(workers, len(tasks))) as pool:
+            return pool.map(_perft_root_move, tasks)
+    return [_perft_root_move(task) for task in tasks]
+
+
+def perft_board(board: Board, depth: int, workers: int = 1) -> int:
+    if depth == 0:
+        return 1
+    return sum(nodes for _, nodes in divide(board, depth, workers))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Conta as folhas da árvore de jogadas legais (perft).")
+    parser.add_argument("depth", type=int, help="profundidade em meias-jogadas")
+    parser.add_argument("--position", help="posição no formato de Board.position_string (padrão: posição inicial)")
+    parser.add_argument("--divide", action="store_true", help="mostra a contagem de cada jogada da raiz")
+    parser.add_argument("--workers", type=int, default=1, help="processos para dividir as jogadas da raiz")
+    parser.add_argument("--check", action="store_true",
+                        help="compara com GOLDEN_NODES de 1 até a profundidade dada (só na posição inicial)")
+    args = parser.parse_args(argv)
+
+    if args.depth < 0:
+        parser.error("depth must be non-negative")
+    board = Board()
+    if args.position:
+        try:
+            board.load_position(args.position)
+        except ValueError as error:
+            parser.error(str(error))
+
+    if args.check:
+        if args.position:
+            parser.error("--check only works from the initial position")
+        failed = False
+        for depth in range(1, args.depth + 1):
+            expected = GOLDEN_NODES.get(depth)
+            nodes = perft_board(board, depth, args.workers)
+            status = "ok" if expected == nodes else ("?" if expected is None else f"FAIL (expected {expected})")
+            failed = failed or (expected is not None and expected != nodes)
+            print(f"perft({depth}) = {nodes} {status}")
+        return 1 if failed else 0
+
+    start = time.perf_counter()
+    if args.divide and args.depth > 0:
+        results = divide(board, args.depth, args.workers)
+        for move, nodes in results:
+            print(f"{move.notation}: {nodes}")
+        nodes = sum(count for _, count in results)
+        print(f"\nMoves: {len(results)}")
+    else:
+        nodes = perft_board(board, args.depth, args.workers)
+    elapsed = time.perf_counter() - start
+
+    nps = int(nodes / elapsed) if elapsed > 0 else 0
+    print(f"Nodes: {nodes}")
+    print(f"Time: {elapsed:.3f} s ({nps} nodes/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
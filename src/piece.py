@@ -5,11 +5,19 @@ if TYPE_CHECKING:
 from exceptions import PromotionError, UnlinkedPieceError, CaptureError
 
 class Piece:
-    def __init__(self):
-        """Inicializa a classe piece a partir do player. Inicialmente não é associado a uma posição"""
+    __slots__ = ("_position", "_is_king", "_is_captured", "_owner")
+
+    def __init__(self, owner: int):
+        """Inicializa a classe piece a partir do player. Inicialmente não é associado a uma posição.
+        O dono é o valor de Owner do player que instanciou a peça"""
         self._position = None
         self._is_king: bool = False
         self._is_captured: bool = False
+        self._owner: int = owner
+
+    @property
+    def owner(self) -> int:
+        return self._owner
 
     @property
     def position(self):
@@ -37,6 +45,11 @@ class Piece:
         if not self._is_king :
             self._is_king = True
     
+    def demote_piece(self) -> None:
+        """Desfaz a promoção da peça"""
+
+        self._is_king = False
+
     @property
     def is_captured(self) -> bool:
         return self._is_captured
@@ -49,6 +62,18 @@ class Piece:
         else:
             self._is_captured = True
 
+    def uncapture(self) -> None:
+        """Desfaz a captura da peça"""
+
+        self._is_captured = False
+
+    def reset(self) -> None:
+        """Volta a peça ao estado inicial: sem posição, não promovida e não capturada"""
+
+        self.detach_position()
+        self._is_king = False
+        self._is_captured = False
+
     @property
     def coordinates(self) -> List[int]:
         """Retorna coordenadas da posição em formato de lista"""
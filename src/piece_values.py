@@ -0,0 +1,28 @@
+from typing import List, Tuple
+
+from bitboard import BOARD_SIZE, NUM_SQUARES
+from owner import Owner
+
+MAN_VALUE = 100
+KING_VALUE = 300
+
+# Bônus por linha para peões do player1 (a linha 0 é a de promoção); para o player2 a tabela é espelhada
+ADVANCE_BONUS = (0, 40, 24, 14, 8, 3, 0, 0)
+
+
+def _build_values() -> Tuple[Tuple[List[int], List[int]], ...]:
+    values = [None]
+    for owner in Owner:
+        sign = 1 if owner == Owner.PLAYER1 else -1
+        men = []
+        for square in range(NUM_SQUARES):
+            row = square // BOARD_SIZE
+            advance = ADVANCE_BONUS[row] if owner == Owner.PLAYER1 else ADVANCE_BONUS[BOARD_SIZE - 1 - row]
+            men.append(sign * (MAN_VALUE + advance))
+        values.append((men, [sign * KING_VALUE] * NUM_SQUARES))
+    return tuple(values)
+
+
+# PIECE_SQUARE_VALUES[dono][é dama][casa]: material mais avanço, do ponto de vista do player1.
+# A soma sobre as peças do tabuleiro é a avaliação de engine.evaluation com o player1 a jogar
+PIECE_SQUARE_VALUES = _build_values()
@@ -2,13 +2,16 @@ from typing import List
 from piece import Piece
 
 class Player:
-    def __init__(self):
+    __slots__ = ("_id", "_name", "_is_black", "_is_its_turn", "_is_winner", "_owner", "_pieces")
+
+    def __init__(self, owner: int):
         self._id: int = 0
         self._name:str = ""
         self._is_black:bool = False
         self._is_its_turn: bool = False
         self._is_winner: bool = False
-        self._pieces: List[Piece] = [Piece() for _ in range(16)] #Diagrama de sequência Initialize: Player instancia as suas peças sem posição
+        self._owner: int = owner
+        self._pieces: List[Piece] = [Piece(owner) for _ in range(16)] #Diagrama de sequência Initialize: Player instancia as suas peças sem posição
 
     def reset(self):
         self.id = 0
@@ -58,6 +61,10 @@ class Player:
     def is_winner(self, value: bool) -> None:
         self._is_winner = value
 
+    @property
+    def owner(self) -> int:
+        return self._owner
+
     @property
     def pieces(self) -> List[Piece]:
         return self._pieces
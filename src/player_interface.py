@@ -2,10 +2,9 @@ import tkinter as tk
 from tkinter import messagebox
 from tkinter import simpledialog
 from tkinter.messagebox import showinfo
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from dog.dog_interface import DogPlayerInterface
-from dog.dog_actor import DogActor
 from board import Board
 
 import time
@@ -17,22 +16,36 @@ ROOT_FONT_COLOR = "#F2F2F2"
 HIGHLIGHT_COLOR = "#EEDD82"
 LIGHT_TILE_COLOR = "#C8AD7F"
 DARK_TILE_COLOR = "#5C3A21"
+NETWORK_DISPATCH_MS = 50 # Intervalo para buscar as respostas da rede
 
 class PlayerInterface(DogPlayerInterface):
-    def __init__(self):
+    def __init__(self, record_path: Optional[str] = None):
         self.main_window = tk.Tk()  # Instancia a janela principal
         self.pieces_id_by_position = {} #ID das posições do canva
         self.all_positions = []
+        self.piece_items: Dict[Tuple[int, int], Tuple[int, Optional[int]]] = {} # Casa -> (oval, coroa da dama)
+        self.rendered_pieces: Dict[Tuple[int, int], Tuple[int, bool]] = {} # Casa -> (dono, é dama) já desenhados
+        self.highlighted_tiles: Set[Tuple[int, int]] = set()
+        self.next_piece_tag = 0
+        self.bound_items: List = [] # Itens do canvas com bind de <Button-1>
         self.fill_main_window()  # Organiza a janela e cria os widgets
         self.board = Board()
+        if record_path:
+            from game_record import GameRecordWriter
+
+            self.board.recorder = GameRecordWriter(record_path)
         #self.message_notification = None  # Variável para a mensagem de notificação
         self.all_pieces = []
         self.draw_board()  # Desenha o tabuleiro inicial
         self.associate_canva() # Coloca as peças no tabuleiro
         player_name = simpledialog.askstring(title="Player identification", prompt="Qual o seu nome?")
+        from dog.dog_actor import DogActor  # Só carrega a rede quando a janela já está pronta
+
         self.dog_server_interface = DogActor()
+        self.waiting_start = False
         message = self.dog_server_interface.initialize(player_name, self)
         messagebox.showinfo(message=message)
+        self.main_window.after(NETWORK_DISPATCH_MS, self.dispatch_network)
         self.main_window.mainloop()  # Mantém a janela
 
     def fill_main_window(self):
@@ -103,6 +116,12 @@ class PlayerInterface(DogPlayerInterface):
         """Desenha o tabuleiro sem peça nenhuma"""
 
         self.canvas.delete("all")
+        self.all_positions = []
+        self.pieces_id_by_position.clear()
+        self.piece_items.clear()
+        self.rendered_pieces.clear()
+        self.highlighted_tiles.clear()
+        self.bound_items.clear()
 
         colors = [LIGHT_TILE_COLOR, DARK_TILE_COLOR]
 
@@ -124,54 +143,95 @@ class PlayerInterface(DogPlayerInterface):
                 })
 
     def clear_pieces(self):
-        for canvas_id in self.pieces_id_by_position.values():
-            self.canvas.delete(canvas_id)
+        for piece_tag in self.pieces_id_by_position.values():
+            self.canvas.delete(piece_tag)
         self.pieces_id_by_position.clear()
+        self.piece_items.clear()
+        self.rendered_pieces.clear()
+
+    def piece_coords(self, row: int, col: int) -> Tuple[int, int, int, int]:
+        x1 = col * TILE_SIZE + 10
+        y1 = row * TILE_SIZE + 10
+        return x1, y1, x1 + TILE_SIZE - 20, y1 + TILE_SIZE - 20
+
+    def create_crown(self, row: int, col: int, piece_tag: str) -> int:
+        """Círculo interno das peças damas"""
+
+        x1, y1, x2, y2 = self.piece_coords(row, col)
+        margin = TILE_SIZE // 4
+        return self.canvas.create_oval(x1 + margin, y1 + margin, x2 - margin, y2 - margin,
+                                       fill="white", tags=("piece", piece_tag))
+
+    def create_piece(self, row: int, col: int, owner: int, is_king: bool) -> None:
+        # Cores fixas: na visão de cada jogador, suas próprias peças são sempre marrons
+        fill_color = "#8B5E3C" if owner == self.board.player1.owner else "#1C1C1C"
+        piece_tag = f"piece{self.next_piece_tag}" # A tag acompanha a peça quando ela se move
+        self.next_piece_tag += 1
+        oval_id = self.canvas.create_oval(*self.piece_coords(row, col), fill=fill_color, tags=("piece", piece_tag))
+        crown_id = self.create_crown(row, col, piece_tag) if is_king else None
+        self.piece_items[(row, col)] = (oval_id, crown_id)
+        self.pieces_id_by_position[(row, col)] = piece_tag
+
+    def move_piece_items(self, origin: Tuple[int, int], destination: Tuple[int, int], is_king: bool) -> None:
+        """Desloca os itens já desenhados de uma peça, criando ou removendo a coroa se preciso"""
+
+        oval_id, crown_id = self.piece_items.pop(origin)
+        piece_tag = self.pieces_id_by_position.pop(origin)
+        self.canvas.move(piece_tag, (destination[1] - origin[1]) * TILE_SIZE, (destination[0] - origin[0]) * TILE_SIZE)
+        if is_king and crown_id is None:
+            crown_id = self.create_crown(destination[0], destination[1], piece_tag)
+        elif not is_king and crown_id is not None:
+            self.canvas.delete(crown_id)
+            crown_id = None
+        self.piece_items[destination] = (oval_id, crown_id)
+        self.pieces_id_by_position[destination] = piece_tag
 
     def associate_canva(self):
-        """Recoloca as peças no tabuleiro. Lembrando que a origem
-        está no canto superior esquerdo"""
-
-        self.clear_pieces() #Retira todas peças antes de recolocá-las. Forma mais segura.
-
-        all_pieces_back = self.board.get_all_pieces()
-        all_pieces = []
-        for owner, pieces in all_pieces_back.items():
-            all_pieces.append([])
-            for piece in pieces:
-                if piece.position is not None:
-                    row = piece.position.row
-                    col = piece.position.col
-
-                    # Cores fixas: na visão de cada jogador, suas próprias peças são sempre marrons
-                    fill_color = "#8B5E3C" if owner == 'player1' else "#1C1C1C"
-
-                    x1 = col * TILE_SIZE + 10
-                    y1 = row * TILE_SIZE + 10
-                    x2 = x1 + TILE_SIZE - 20
-                    y2 = y1 + TILE_SIZE - 20
-
-                    piece_tag = f"piece_r{row}c{col}"
-
-                    # Círculo das peças damas
-                    # ####### novidade #######
-                    self.canvas.create_oval(x1, y1, x2, y2, fill=fill_color, tags=(piece_tag)) # Agora a tag é diferente
-
-                    if piece.is_king:
-                        margin = TILE_SIZE // 4
-                        inner_x1 = x1 + margin
-                        inner_y1 = y1 + margin
-                        inner_x2 = x2 - margin
-                        inner_y2 = y2 - margin
-                        self.canvas.create_oval(inner_x1, inner_y1, inner_x2, inner_y2, fill="white", tags=(piece_tag))
-                    
-                    ################################################
-
-                    self.pieces_id_by_position[(row, col)] = piece_tag
-
-                    # Notificação na tela de mensagem sobre o status do jogo
-                    if self.message_notification is not None:
-                        self.message_notification.config(text=self.board.message_game_status())
+        """Sincroniza as peças do canvas com o tabuleiro. Lembrando que a origem
+        está no canto superior esquerdo.
+
+        Só as casas que mudaram desde o último desenho são atualizadas: peças que saíram
+        de uma casa e chegaram a outra têm os itens deslocados, as capturadas são apagadas."""
+
+        current = {}
+        for row_positions in self.board.positions:
+            for pos in row_positions:
+                if pos.piece is not None:
+                    current[(pos.row, pos.col)] = (pos.piece.owner, pos.piece.is_king)
+
+        # Casa -> dono, para as casas cujo desenho não vale mais
+        left = {square: state[0] for square, state in self.rendered_pieces.items() if current.get(square) != state}
+        arrived = [square for square, state in current.items() if self.rendered_pieces.get(square) != state]
+        for square in left:
+            del self.rendered_pieces[square]
+
+        # Itens que saíram de uma casa são reaproveitados por peças do mesmo dono que chegaram
+        # em outra (ou na mesma, ao promover); o resto é criado
+        for square in arrived:
+            owner, is_king = current[square]
+            if left.get(square) == owner:
+                source = square
+            else:
+                if square in left:
+                    del left[square]
+                    self.delete_piece_items(square)
+                source = next((origin for origin, origin_owner in left.items() if origin_owner == owner), None)
+            if source is not None:
+                del left[source]
+                self.move_piece_items(source, square, is_king)
+            else:
+                self.create_piece(square[0], square[1], owner, is_king)
+            self.rendered_pieces[square] = current[square]
+        for square in left:
+            self.delete_piece_items(square)
+
+        # Notificação na tela de mensagem sobre o status do jogo
+        if self.message_notification is not None:
+            self.message_notification.config(text=self.board.message_game_status())
+
+    def delete_piece_items(self, square: Tuple[int, int]) -> None:
+        self.piece_items.pop(square, None)
+        self.canvas.delete(self.pieces_id_by_position.pop(square))
 
     def reset_board(self):
         """Retira todas peças do tabuleiro"""
@@ -181,40 +241,69 @@ class PlayerInterface(DogPlayerInterface):
 
     def restore_initial_state(self):
 
-        self.board = Board()
+        self.board.reset_game()
         self.all_pieces = []
         self.draw_board()  # Desenha o tabuleiro inicial
         self.associate_canva() # Coloca as peças no tabuleiro
         messagebox.showinfo("Reset", "O tabuleiro foi resetado.")
 
+    def dispatch_network(self) -> None:
+        """Processa, na thread do Tk, as respostas e jogadas que chegaram da rede"""
+
+        try:
+            self.dog_server_interface.dispatch()
+        finally:
+            self.main_window.after(NETWORK_DISPATCH_MS, self.dispatch_network)
+
     def start_match(self) -> None:
         """Inicia start match"""
 
         match_status = self.board.game_status
-        if match_status == 1:
+        if match_status == 1 and not self.waiting_start:
             answer = messagebox.askyesno("START", "Deseja iniciar uma nova partida?")
             if answer:
-                start_status = self.dog_server_interface.start_match(2)
-                code = start_status.get_code()
-                message = start_status.get_message()
-                if code == "0" or code == "1":
-                    messagebox.showinfo(message=message)
-                else:
-                    players = start_status.get_players()
-                    local_player_id = start_status.get_local_id()
+                # A resposta chega em handle_start_status, sem travar a janela
+                self.waiting_start = True
+                self.dog_server_interface.start_match(2, self.handle_start_status, self.handle_start_error)
+
+    def handle_start_status(self, start_status) -> None:
+        """Resposta do pedido de início de partida"""
+
+        self.waiting_start = False
+        if self.board.game_status != 1:
+            return # A partida já começou por receive_start enquanto o pedido estava em andamento
+        code = start_status.get_code()
+        message = start_status.get_message()
+        if code == "0" or code == "1":
+            messagebox.showinfo(message=message)
+        else:
+            players = start_status.get_players()
+            local_player_id = start_status.get_local_id()
+
+            self.board.start_match(players, local_player_id)
+            game_state = self.board.game_status
+            messagebox.showinfo(message=start_status.get_message())
 
-                    self.board.start_match(players, local_player_id)
-                    game_state = self.board.game_status
-                    messagebox.showinfo(message=start_status.get_message())
+            self.player1_label.config(text=f"Player 1: {self.board.player1.name}")
+            self.player2_label.config(text=f"Player 2: {self.board.player2.name}")
 
-                    self.player1_label.config(text=f"Player 1: {self.board.player1.name}")
-                    self.player2_label.config(text=f"Player 2: {self.board.player2.name}")
+            self.update_gui(game_state)
 
-                    self.update_gui(game_state)
+            #Permitir movimento inicial
+            clickable_positions = [(5, col) for col in range(8)] #3a Linha de baixo para cima 
+            self.enable_clickable_positions(clickable_positions)
 
-                    #Permitir movimento inicial
-                    clickable_positions = [(5, col) for col in range(8)] #3a Linha de baixo para cima 
-                    self.enable_clickable_positions(clickable_positions)
+    def handle_start_error(self, error: Exception) -> None:
+        """O pedido de início de partida falhou: libera um novo pedido"""
+
+        self.waiting_start = False
+        messagebox.showerror("Erro", f"Não foi possível iniciar a partida: {error}")
+
+    def receive_send_error(self, a_move, error: Exception) -> None:
+        """A jogada não chegou ao servidor; o adversário ainda não a viu, então ela pode ser reenviada"""
+
+        if messagebox.askretrycancel("Erro", f"A jogada não foi enviada: {error}\nTentar novamente?"):
+            self.dog_server_interface.send_move(a_move)
 
     def receive_start(self, start_status) -> None:
         """Recebe start match"""
@@ -263,8 +352,7 @@ class PlayerInterface(DogPlayerInterface):
             if piece_at_clicked is None:
                 return
 
-            local_pieces = self.board.player1.pieces
-            if piece_at_clicked not in local_pieces:
+            if piece_at_clicked.owner != self.board.player1.owner:
                 return
             
             mandatory_pieces = self.board.check_mandatory_capture_pieces()
@@ -362,17 +450,16 @@ class PlayerInterface(DogPlayerInterface):
     def hightlight_selected_tile(self, row, col):
         tile_id = self.all_positions[row][col]["rect_id"]
         self.canvas.itemconfig(tile_id, fill=HIGHLIGHT_COLOR)
+        self.highlighted_tiles.add((row, col))
 
     def clear_selection_highlight(self) -> None:
-        """Percorre todos os tiles e restaura qualquer tile com cor de destaque para sua cor original."""
+        """Restaura a cor original dos tiles destacados."""
 
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                tile_id = self.all_positions[row][col]["rect_id"]
-                current_color = self.canvas.itemcget(tile_id, "fill")
-                if current_color == HIGHLIGHT_COLOR:  # cor de destaque
-                    default_color = LIGHT_TILE_COLOR if (row + col) % 2 == 0 else DARK_TILE_COLOR
-                    self.canvas.itemconfig(tile_id, fill=default_color)
+        for row, col in self.highlighted_tiles:
+            tile_id = self.all_positions[row][col]["rect_id"]
+            default_color = LIGHT_TILE_COLOR if (row + col) % 2 == 0 else DARK_TILE_COLOR
+            self.canvas.itemconfig(tile_id, fill=default_color)
+        self.highlighted_tiles.clear()
 
     def enable_clickable_positions(self, clickable_positions: List[Tuple[int, int]]) -> None:
         """Habilita cliques nas peças e nos tiles dados."""
@@ -382,14 +469,19 @@ class PlayerInterface(DogPlayerInterface):
             # Tile (fundo)
             tile_id = self.all_positions[row][col]["rect_id"]
             self.canvas.tag_bind(tile_id, "<Button-1>", lambda event, r=row, c=col: self.make_move(r, c))
+            self.bound_items.append(tile_id)
 
             # Peça (se existir)
             piece_id = self.pieces_id_by_position.get((row, col))
             if piece_id is not None:
                 self.canvas.tag_bind(piece_id, "<Button-1>", lambda event, r=row, c=col: self.make_move(r, c))
+                self.bound_items.append(piece_id)
 
 
     def clear_all_tile_binds(self) -> None:
         """Remove todos os event bindings (<Button-1>) de todos os tiles do tabuleiro."""
 
-        self.canvas.tag_unbind("piece", "<Button-1>")
+        # As peças não são mais recriadas a cada jogada, então os binds precisam ser desfeitos
+        for item in self.bound_items:
+            self.canvas.tag_unbind(item, "<Button-1>")
+        self.bound_items.clear()
@@ -5,6 +5,8 @@ if TYPE_CHECKING:
 
 
 class Position:
+    __slots__ = ("_row", "_col", "_piece")
+
     def __init__(self, row: int, col: int) -> None:
         if not isinstance(row, int) or not isinstance(col, int):
                 raise TypeError(f"Row and column must be integer. Instead, row is {type(row)} and column is {type(col)}")
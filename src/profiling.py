@@ -0,0 +1,179 @@
+"""Instrumentação opcional dos métodos mais chamados do Board.
+
+Desligada, não custa nada: os métodos do Board só são trocados por versões que contam chamadas
+e medem o tempo depois de enable(). O tempo é inclusivo (move_piece inclui os verify_capture_*
+que chama). As trocas de vez (switch_turn) dão a média por turno.
+
+Liga com a variável de ambiente DAMA_PROFILE=1, que mostra o resumo em stderr na saída do
+programa; DAMA_PROFILE_OUTPUT=arquivo.prof grava também um perfil do cProfile da execução
+inteira (para pstats ou snakeviz). Pelo código:
+
+    import profiling
+    profiling.enable()
+    ...
+    profiling.dump()
+
+    with profiling.profile_session("sessao.prof"):
+        ...
+"""
+import atexit
+import functools
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+ENV_VAR = "DAMA_PROFILE"
+OUTPUT_ENV_VAR = "DAMA_PROFILE_OUTPUT"
+PROFILED_METHODS = (
+    "get_possible_moves",
+    "verify_capture_as_man",
+    "verify_capture_as_king",
+    "check_mandatory_capture_pieces",
+    "get_moveable_pieces",
+    "move_piece",
+    "receive_move",
+)
+TURN_METHOD = "switch_turn"
+STATS_LIMIT = 25 # Linhas do pstats mostradas por profile_session
+
+_originals: Dict[str, Callable] = {} # Nome -> método original, enquanto a instrumentação está ligada
+_stats: Dict[str, List[float]] = {} # Nome -> [chamadas, segundos]
+_profiled_class: Optional[type] = None
+_turns = 0
+
+
+def _timed(name: str, method: Callable) -> Callable:
+    stats = _stats.setdefault(name, [0, 0.0])
+    perf_counter = time.perf_counter
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats[1] += perf_counter() - start
+            stats[0] += 1
+
+    return wrapper
+
+
+def _counted_turn(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        global _turns
+        _turns += 1
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+def is_enabled() -> bool:
+    return _profiled_class is not None
+
+
+def enable(cls: Optional[type] = None) -> None:
+    """Troca os métodos de PROFILED_METHODS da classe (por padrão, Board) pelas versões medidas"""
+
+    global _profiled_class
+    if cls is None:
+        from board import Board
+
+        cls = Board
+    if _profiled_class is not None:
+        if _profiled_class is cls:
+            return
+        disable()
+    for name in PROFILED_METHODS:
+        _originals[name] = cls.__dict__[name]
+        setattr(cls, name, _timed(name, _originals[name]))
+    _originals[TURN_METHOD] = cls.__dict__[TURN_METHOD]
+    setattr(cls, TURN_METHOD, _counted_turn(_originals[TURN_METHOD]))
+    _profiled_class = cls
+
+
+def disable() -> None:
+    """Devolve os métodos originais. Os números acumulados continuam até reset()"""
+
+    global _profiled_class
+    if _profiled_class is None:
+        return
+    for name, method in _originals.items():
+        setattr(_profiled_class, name, method)
+    _originals.clear()
+    _profiled_class = None
+
+
+def reset() -> None:
+    global _turns
+    for stats in _stats.values():
+        stats[0] = 0
+        stats[1] = 0.0
+    _turns = 0
+
+
+def snapshot() -> Dict:
+    """Trocas de vez e, por método, chamadas e tempo total em ms"""
+
+    methods = {name: {"calls": int(calls), "total_ms": seconds * 1000} for name, (calls, seconds) in _stats.items()}
+    return {"turns": _turns, "methods": methods}
+
+
+def summary() -> str:
+    lines = [f"{'method':<32}{'calls':>10}{'total ms':>12}{'mean us':>10}{'calls/turn':>12}{'ms/turn':>10}"]
+    for name, (calls, seconds) in sorted(_stats.items(), key=lambda item: -item[1][1]):
+        mean_us = seconds / calls * 1e6 if calls else 0.0
+        per_turn = (f"{calls / _turns:>12.1f}{seconds * 1000 / _turns:>10.3f}" if _turns
+                    else f"{'-':>12}{'-':>10}")
+        lines.append(f"{name:<32}{int(calls):>10}{seconds * 1000:>12.2f}{mean_us:>10.1f}{per_turn}")
+    lines.append(f"{_turns} turns")
+    return "\n".join(lines)
+
+
+def dump(file: Optional[TextIO] = None) -> None:
+    print(summary(), file=file or sys.stderr)
+
+
+@contextmanager
+def profile_session(path: Optional[str] = None, sort: str = "cumulative", limit: int = STATS_LIMIT,
+                    file: Optional[TextIO] = None) -> Iterator["cProfile.Profile"]:
+    """Roda o bloco sob o cProfile. Mostra as `limit` funções mais caras e, com path, grava o
+    perfil para pstats"""
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        if limit:
+            pstats.Stats(profiler, stream=file or sys.stderr).sort_stats(sort).print_stats(limit)
+
+
+def enable_from_environment(cls: type) -> None:
+    """Liga a instrumentação se DAMA_PROFILE estiver definida; chamada na importação do board"""
+
+    if os.environ.get(ENV_VAR, "0") in ("", "0"):
+        return
+    enable(cls)
+    atexit.register(dump)
+    output = os.environ.get(OUTPUT_ENV_VAR)
+    if output:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def save() -> None:
+            profiler.disable()
+            profiler.dump_stats(output)
+            print(f"cProfile stats written to {output}", file=sys.stderr)
+
+        atexit.register(save)
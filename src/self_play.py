@@ -0,0 +1,214 @@
+"""Simulador de partidas sem interface: joga partidas completas entre duas políticas
+usando só o Board (sem tkinter e sem DogActor) e grava um resultado JSON por linha.
+
+    python self_play.py --games 1000 --player1 random --player2 greedy --workers 4 --output games.jsonl
+    python self_play.py --games 20 --player1 engine --player2 random --engine-depth 4
+"""
+import json
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Union
+
+from bitboard import apply_move
+from board import Board
+from engine import Engine
+from engine.evaluation import evaluate_bitboards
+from move import Move
+from owner import Owner
+
+POLICIES = ("random", "greedy", "engine")
+DEFAULT_MAX_PLIES = 300
+PLAYER_NAMES = {Owner.PLAYER1.value: "player1", Owner.PLAYER2.value: "player2"}
+
+_engine: Optional[Engine] = None # Um motor por processo, para reaproveitar a tabela de transposição
+
+
+def _get_engine(tt_size_mb: float, tablebase_path: Optional[str] = None, book_path: Optional[str] = None) -> Engine:
+    global _engine
+    if _engine is None:
+        from opening_book import OpeningBook
+        from tablebase import Tablebase
+
+        _engine = Engine(tt_size_mb, Tablebase(tablebase_path) if tablebase_path else None,
+                         OpeningBook(book_path) if book_path else None)
+    return _engine
+
+
+def choose_move(board: Board, moves: List[Move], policy: str, rng: random.Random, options: Dict) -> Move:
+    """Escolhe uma jogada entre as legais segundo a política dada"""
+
+    if policy == "random":
+        return rng.choice(moves)
+    if policy == "greedy":
+        # Melhor avaliação estática depois da jogada; empates são sorteados
+        bb = board.bitboard
+        player1_to_move = board.side_to_move == Owner.PLAYER1.value
+        own, enemy = (bb.player1, bb.player2) if player1_to_move else (bb.player2, bb.player1)
+        best_score = None
+        best_moves = []
+        for move in moves:
+            child_own, child_enemy, child_kings = apply_move(own, enemy, bb.kings, move)
+            if player1_to_move:
+                score = evaluate_bitboards(child_own, child_enemy, child_kings, True)
+            else:
+                score = evaluate_bitboards(child_enemy, child_own, child_kings, False)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_moves = [move]
+            elif score == best_score:
+                best_moves.append(move)
+        return rng.choice(best_moves)
+    if policy == "engine":
+        engine = _get_engine(options["engine_tt_mb"], options.get("tablebase"), options.get("book"))
+        return engine.search(board, options["engine_time_ms"], options["engine_depth"]).best_move
+    raise ValueError(f"Unknown policy: {policy}")
+
+
+def finished_winner(board: Board) -> Union[bool, Optional[int]]:
+    """Aplica as regras de fim de jogo do Board aos dois lados.
+
+    Retorna o Owner vencedor, None para empate, ou False se a partida continua."""
+
+    bb = board.bitboard
+    count1 = bb.player1.bit_count()
+    count2 = bb.player2.bit_count()
+    if count1 == 0:
+        return Owner.PLAYER2.value
+    if count2 == 0:
+        return Owner.PLAYER1.value
+    if count1 == 1 and count2 == 1:
+        king1 = bool(bb.player1 & bb.kings)
+        king2 = bool(bb.player2 & bb.kings)
+        if king1 and not king2:
+            return Owner.PLAYER1.value # Dama contra peão vence
+        if king2 and not king1:
+            return Owner.PLAYER2.value
+        if not king1 and not king2:
+            return None # Peão contra peão empata
+    return False
+
+
+def play_game(game_index: int, player1: str, player2: str, seed: int, max_plies: int, options: Dict) -> Dict:
+    """Joga uma partida completa e retorna o resultado. A semente define a partida por completo
+    para as políticas random e greedy (e para engine com profundidade fixa)"""
+
+    rng = random.Random(seed)
+    board = Board()
+    policies = {Owner.PLAYER1.value: player1, Owner.PLAYER2.value: player2}
+    moves_played = []
+    winner: Optional[int] = None
+    reason = "max_plies"
+
+    start = time.perf_counter()
+    for _ in range(max_plies):
+        moves = board.generate_legal_moves()
+        if not moves:
+            # Sem jogadas (ou sem peças): perde quem deveria jogar
+            winner = Owner.PLAYER2.value if board.side_to_move == Owner.PLAYER1.value else Owner.PLAYER1.value
+            reason = "no_moves"
+            break
+        move = choose_move(board, moves, policies[board.side_to_move], rng, options)
+        board.make_move(move)
+        moves_played.append(move.notation)
+        result = finished_winner(board)
+        if result is not False:
+            winner = result
+            reason = "end_condition"
+            break
+    elapsed = time.perf_counter() - start
+
+    return {
+        "game": game_index,
+        "seed": seed,
+        "player1": player1,
+        "player2": player2,
+        "winner": PLAYER_NAMES.get(winner),
+        "reason": reason,
+        "plies": len(moves_played),
+        "time_ms": round(elapsed * 1000, 2),
+        "moves": moves_played,
+    }
+
+
+def _play_game_task(args) -> Dict:
+    return play_game(*args)
+
+
+def run_games(games: int, player1: str, player2: str, seed: int = 0, workers: int = 1,
+              max_plies: int = DEFAULT_MAX_PLIES, swap_colors: bool = False,
+              options: Optional[Dict] = None) -> Iterator[Dict]:
+    """Gera os resultados das partidas conforme terminam. A partida i usa a semente seed + i;
+    com swap_colors, as políticas trocam de lado nas partidas ímpares"""
+
+    options = options or {"engine_time_ms": 100, "engine_depth": 64, "engine_tt_mb": 16}
+    tasks = []
+    for index in range(games):
+        first, second = (player2, player1) if swap_colors and index % 2 else (player1, player2)
+        tasks.append((index, first, second, seed + index, max_plies, options))
+
+    if workers > 1:
+        from multiprocessing import Pool
+
+        with Pool(workers) as pool:
+            yield from pool.imap_unordered(_play_game_task, tasks, chunksize=max(1, games // (workers * 8)))
+    else:
+        for task in tasks:
+            yield _play_game_task(task)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Joga partidas entre duas políticas, sem interface gráfica.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--player1", choices=POLICIES, default="random")
+    parser.add_argument("--player2", choices=POLICIES, default="random")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira partida (a partida i usa seed + i)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES, help="partidas mais longas são empate")
+    parser.add_argument("--swap-colors", action="store_true", help="troca as políticas de lado a cada partida")
+    parser.add_argument("--engine-time", type=int, default=100, help="tempo por jogada do engine, em ms")
+    parser.add_argument("--engine-depth", type=int, default=64, help="profundidade máxima do engine")
+    parser.add_argument("--engine-tt-mb", type=float, default=16, help="tabela de transposição do engine, em MB")
+    parser.add_argument("--tablebase", help="arquivo de tablebase de finais consultado pelo engine")
+    parser.add_argument("--book", help="livro de aberturas consultado pelo engine")
+    parser.add_argument("--output", help="arquivo de saída (JSON por linha); padrão: saída padrão")
+    parser.add_argument("--record", help="também grava as partidas no formato de game_record.py")
+    args = parser.parse_args(argv)
+
+    options = {"engine_time_ms": args.engine_time, "engine_depth": args.engine_depth,
+               "engine_tt_mb": args.engine_tt_mb, "tablebase": args.tablebase,
+               "book": args.book}
+    output = open(args.output, "a") if args.output else sys.stdout
+    recorder = None
+    if args.record:
+        from game_record import RESULTS, GameRecord, GameRecordWriter, game_tags
+
+        recorder = GameRecordWriter(args.record)
+        owners = {name: owner for owner, name in PLAYER_NAMES.items()}
+    totals = {"player1": 0, "player2": 0, None: 0}
+    start = time.perf_counter()
+    try:
+        for result in run_games(args.games, args.player1, args.player2, args.seed, args.workers,
+                                args.max_plies, args.swap_colors, options):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            totals[result["winner"]] += 1
+            if recorder is not None:
+                tags = game_tags(result["player1"], result["player2"], Round=str(result["game"]), Seed=str(result["seed"]))
+                recorder.write_game(GameRecord(tags, result["moves"], RESULTS[owners.get(result["winner"])]))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if recorder is not None:
+            recorder.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games in {elapsed:.1f} s: player1 {totals['player1']}, "
+          f"player2 {totals['player2']}, draws {totals[None]}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Mede o custo de importação dos módulos do núcleo em um interpretador novo e verifica
+que nenhum deles carrega a interface gráfica ou a rede.
+
+Cada processo de trabalho (self_play, perft, análise) paga esse custo ao iniciar.
+
+    python startup_budget.py
+    python startup_budget.py --runs 10 --scale 2
+"""
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Orçamento de importação, em ms, medido com -X importtime (mínimo entre as execuções)
+IMPORT_BUDGET_MS = {
+    "board": 50,
+    "engine": 60,
+    "self_play": 70,
+    "perft": 60,
+}
+# Módulos pesados que só podem ser carregados sob demanda
+FORBIDDEN_MODULES = ("tkinter", "requests", "dog", "multiprocessing", "argparse")
+
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    """Importa o módulo em um interpretador novo. Retorna o tempo acumulado de importação
+    (ms) e os módulos proibidos que acabaram carregados"""
+
+    code = (f"import sys; import {module}; "
+            f"print(','.join(name for name in {FORBIDDEN_MODULES!r} if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative_us = int(fields[1])
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative_us / 1000, loaded
+
+
+def interpreter_startup_ms(runs: int) -> float:
+    """Tempo de um `python -c pass`, a referência sobre a qual o orçamento se soma"""
+
+    import time
+
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def check_budget(runs: int = 5, scale: float = 1.0) -> Dict[str, Tuple[float, float, List[str]]]:
+    """Retorna, por módulo, (melhor tempo em ms, orçamento em ms, módulos proibidos carregados)"""
+
+    report = {}
+    for module, budget in IMPORT_BUDGET_MS.items():
+        best = float("inf")
+        loaded: List[str] = []
+        for _ in range(runs):
+            elapsed, loaded = measure_import(module)
+            best = min(best, elapsed)
+        report[module] = (best, budget * scale, loaded)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verifica o orçamento de importação do núcleo sem interface.")
+    parser.add_argument("--runs", type=int, default=5, help="execuções por módulo (vale a mais rápida)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplica os orçamentos (máquinas mais lentas)")
+    args = parser.parse_args(argv)
+
+    print(f"interpreter startup: {interpreter_startup_ms(args.runs):.1f} ms")
+    failed = False
+    for module, (elapsed, budget, loaded) in check_budget(args.runs, args.scale).items():
+        status = "ok"
+        if loaded:
+            status = f"FAIL (loads {', '.join(loaded)})"
+        elif elapsed > budget:
+            status = "FAIL (over budget)"
+        failed = failed or status != "ok"
+        print(f"import {module}: {elapsed:.1f} ms / {budget:.0f} ms {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
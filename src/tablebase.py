@@ -0,0 +1,504 @@
+"""Tablebase de finais: todas as posições com poucas peças resolvidas como vitória, derrota
+ou empate, com a distância (em meias-jogadas) até o fim da partida.
+
+A geração é uma análise retrógrada sobre as regras do bitboard (as mesmas de
+Board.generate_legal_moves): cada grupo de material é resolvido depois dos grupos que ele
+alcança por captura ou promoção, e os resultados se propagam das posições finais (sem
+jogadas) para trás. Os resultados vão para um arquivo binário indexado, lido por mmap.
+
+As posições são guardadas sempre do ponto de vista de quem joga, andando para cima
+(como o player1); uma posição com o player2 a jogar é espelhada antes da consulta.
+
+A geração é em Python puro e o custo cresce com o número de entradas: até 3 peças são
+1,4 milhão de entradas, geradas em cerca de 90 s em um núcleo; 4 peças são 91 milhões
+(91 MB, na ordem de uma hora e meia) e 5 peças, 4,3 bilhões, fora de alcance. --workers
+só divide os grupos independentes de cada estágio.
+
+    python tablebase.py build --pieces 3 --output endgame.tb
+    python tablebase.py probe endgame.tb --position "......../...o..../......../......../......../......../...X..../........ 1"
+"""
+import heapq
+import itertools
+import mmap
+import struct
+import sys
+import time
+from array import array
+from enum import Enum
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from bitboard import BOARD_SIZE, NUM_SQUARES, UP, apply_move, generate_legal_moves
+from move import Move
+from owner import Owner
+
+MAGIC = b"TKTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHH") # Assinatura, versão, número de tabelas
+TABLE_ENTRY = struct.Struct("<4BQQ") # Material (peões e damas de quem joga e do adversário), offset, tamanho
+MAX_DISTANCE = 127 # Distâncias maiores ficam saturadas no arquivo
+LOSS_FLAG = 0x80
+NEVER_LOSES = 0xFFFF # Marca, durante a geração, posições com algum filho empatado
+
+# Peões nunca ficam na linha de promoção (promovem) nem na linha de origem do próprio lado
+MEN_SQUARES = range(BOARD_SIZE, NUM_SQUARES - BOARD_SIZE)
+KING_SQUARES = range(NUM_SQUARES)
+MEN_DOMAIN = len(MEN_SQUARES)
+MEN_MASK = sum(1 << square for square in MEN_SQUARES)
+
+_BINOMIAL = [[0] * 8 for _ in range(NUM_SQUARES + 1)]
+for _n in range(NUM_SQUARES + 1):
+    _BINOMIAL[_n][0] = 1
+    for _k in range(1, min(_n, 7) + 1):
+        _BINOMIAL[_n][_k] = _BINOMIAL[_n - 1][_k - 1] + (_BINOMIAL[_n - 1][_k] if _k < _n else 0)
+
+
+class Outcome(Enum):
+    LOSS = 0
+    DRAW = 1
+    WIN = 2
+
+
+class Material(NamedTuple):
+    """Material de uma tabela, do ponto de vista de quem joga"""
+
+    own_men: int
+    own_kings: int
+    enemy_men: int
+    enemy_kings: int
+
+    @property
+    def pieces(self) -> int:
+        return self.own_men + self.own_kings + self.enemy_men + self.enemy_kings
+
+    @property
+    def size(self) -> int:
+        """Número de índices da tabela (inclui combinações com peças sobrepostas, nunca consultadas)"""
+
+        return (_BINOMIAL[MEN_DOMAIN][self.own_men] * _BINOMIAL[NUM_SQUARES][self.own_kings]
+                * _BINOMIAL[MEN_DOMAIN][self.enemy_men] * _BINOMIAL[NUM_SQUARES][self.enemy_kings])
+
+    def mirrored(self) -> "Material":
+        return Material(self.enemy_men, self.enemy_kings, self.own_men, self.own_kings)
+
+    def index(self, own: int, enemy: int, kings: int) -> int:
+        index = _rank(own & ~kings, BOARD_SIZE)
+        index = index * _BINOMIAL[NUM_SQUARES][self.own_kings] + _rank(own & kings, 0)
+        index = index * _BINOMIAL[MEN_DOMAIN][self.enemy_men] + _rank(enemy & ~kings, BOARD_SIZE)
+        return index * _BINOMIAL[NUM_SQUARES][self.enemy_kings] + _rank(enemy & kings, 0)
+
+    def positions(self) -> Iterator[Tuple[int, int, int, int]]:
+        """Percorre (índice, own, enemy, kings) de todas as posições válidas da tabela"""
+
+        own_men = _combinations(MEN_SQUARES, self.own_men)
+        own_kings = _combinations(KING_SQUARES, self.own_kings)
+        enemy_men = _combinations(MEN_SQUARES, self.enemy_men)
+        enemy_kings = _combinations(KING_SQUARES, self.enemy_kings)
+        index = 0
+        for men1 in own_men:
+            for kings1 in own_kings:
+                own = men1 | kings1
+                for men2 in enemy_men:
+                    for kings2 in enemy_kings:
+                        if not (men1 & kings1 or own & (men2 | kings2) or men2 & kings2):
+                            yield index, own, men2 | kings2, kings1 | kings2
+                        index += 1
+
+
+def material_of(own: int, enemy: int, kings: int) -> Material:
+    return Material((own & ~kings).bit_count(), (own & kings).bit_count(),
+                    (enemy & ~kings).bit_count(), (enemy & kings).bit_count())
+
+
+def _rank(bits: int, first_square: int) -> int:
+    """Posição da combinação de casas na ordem colexicográfica"""
+
+    if not bits & (bits - 1): # Nenhuma ou uma casa: o caso mais comum
+        return bits.bit_length() - 1 - first_square if bits else 0
+    rank = 0
+    count = 1
+    while bits:
+        low = bits & -bits
+        rank += _BINOMIAL[low.bit_length() - 1 - first_square][count]
+        bits ^= low
+        count += 1
+    return rank
+
+
+def _combinations(squares: range, count: int) -> List[int]:
+    """Todas as combinações de `count` casas, como bitboards, na ordem de _rank"""
+
+    result = [0] * _BINOMIAL[len(squares)][count]
+    for combination in itertools.combinations(squares, count):
+        bits = 0
+        for square in combination:
+            bits |= 1 << square
+        result[_rank(bits, squares.start)] = bits
+    return result
+
+
+def flip(bits: int) -> int:
+    """Espelha o bitboard verticalmente (linha r vai para a linha 7 - r)"""
+
+    return int.from_bytes(bits.to_bytes(8, "little"), "big")
+
+
+def canonical(own: int, enemy: int, kings: int, own_moves_up: bool) -> Tuple[int, int, int]:
+    """Posição do ponto de vista de quem joga, andando para cima"""
+
+    if own_moves_up:
+        return own, enemy, kings
+    return flip(own), flip(enemy), flip(kings)
+
+
+def encode(outcome: Outcome, distance: int) -> int:
+    if outcome == Outcome.DRAW:
+        return 0
+    distance = min(distance, MAX_DISTANCE)
+    return distance if outcome == Outcome.WIN else LOSS_FLAG | distance
+
+
+def decode(value: int) -> Tuple[Outcome, int]:
+    if value & LOSS_FLAG:
+        return Outcome.LOSS, value & MAX_DISTANCE
+    if value:
+        return Outcome.WIN, value
+    return Outcome.DRAW, 0
+
+
+def stages(max_pieces: int) -> List[List[List[Material]]]:
+    """Grupos de tabelas na ordem de resolução, separados em estágios independentes.
+
+    Uma jogada simples leva de uma tabela à espelhada (vez do adversário), então as duas
+    são resolvidas juntas. Capturas reduzem o número de peças e promoções o número de
+    peões, então esses grupos vêm em estágios anteriores; os grupos de um mesmo estágio
+    (mesmo número de peças e de peões) não dependem uns dos outros."""
+
+    result = []
+    for pieces in range(2, max_pieces + 1):
+        for men in range(pieces + 1):
+            groups = []
+            seen = set()
+            for own_men in range(men + 1):
+                for own_kings in range(pieces - men + 1):
+                    material = Material(own_men, own_kings, men - own_men, pieces - men - own_kings)
+                    if material in seen or not (own_men + own_kings) or not material.pieces - own_men - own_kings:
+                        continue
+                    group = [material] if material.mirrored() == material else [material, material.mirrored()]
+                    seen.update(group)
+                    groups.append(group)
+            if groups:
+                result.append(groups)
+    return result
+
+
+class TablebaseBuilder:
+    """Resolve as tabelas até `max_pieces` peças e as grava em um arquivo"""
+
+    def __init__(self, max_pieces: int, progress: Optional[Callable[[Material, int, float], None]] = None) -> None:
+        if max_pieces < 2:
+            raise ValueError(f"A tablebase needs at least 2 pieces. Instead, max_pieces is {max_pieces}")
+        self._max_pieces = max_pieces
+        self._tables: Dict[Material, bytearray] = {}
+        self._progress = progress
+
+    @property
+    def tables(self) -> Dict[Material, bytearray]:
+        return self._tables
+
+    def build(self, workers: int = 1) -> Dict[Material, bytearray]:
+        """Resolve todas as tabelas. Com workers > 1, os grupos de cada estágio são
+        divididos entre processos"""
+
+        for stage in stages(self._max_pieces):
+            start = time.perf_counter()
+            if workers > 1 and len(stage) > 1:
+                from multiprocessing import Pool
+
+                with Pool(min(workers, len(stage)), _init_worker, (self._tables,)) as pool:
+                    results = pool.map(_solve_group, stage)
+            else:
+                results = [self._solve(group) for group in stage]
+            for tables in results:
+                self._tables.update(tables)
+                if self._progress is not None:
+                    for material in tables:
+                        self._progress(material, material.size, time.perf_counter() - start)
+        return self._tables
+
+    def write(self, path: str) -> None:
+        with open(path, "wb") as output:
+            output.write(HEADER.pack(MAGIC, VERSION, len(self._tables)))
+            offset = HEADER.size + TABLE_ENTRY.size * len(self._tables)
+            for material, table in self._tables.items():
+                output.write(TABLE_ENTRY.pack(*material, offset, len(table)))
+                offset += len(table)
+            for table in self._tables.values():
+                output.write(table)
+
+    def _lookup(self, own: int, enemy: int, kings: int) -> Tuple[Outcome, int]:
+        """Resultado de uma posição de uma tabela já resolvida (de quem joga)"""
+
+        if not own:
+            return Outcome.LOSS, 0
+        material = material_of(own, enemy, kings)
+        return decode(self._tables[material][material.index(own, enemy, kings)])
+
+    def _solve(self, group: List[Material]) -> Dict[Material, bytearray]:
+        offsets = {}
+        total = 0
+        for material in group:
+            offsets[material] = total
+            total += material.size
+
+        # Lances de cada posição: filhos no próprio grupo viram arestas; os outros já têm resultado
+        outcome = bytearray([Outcome.DRAW.value]) * total
+        distance = array("H", bytes(2 * total))
+        remaining = array("H", bytes(2 * total)) # Filhos do grupo ainda sem resultado
+        worst_loss = array("H", bytes(2 * total)) # Maior distância de derrota vista entre os filhos
+        has_win = bytearray(total)
+        starts = array("I", bytes(4 * (total + 1)))
+        children = array("I")
+        queue: List[Tuple[int, int, int]] = [] # (distância, resultado, índice), em ordem de distância
+
+        filled = 0 # Próxima posição sem início de arestas (as inválidas ficam sem arestas)
+        for material in group:
+            base = offsets[material]
+            quiet_material = material.mirrored() # Filho de um lance sem captura nem promoção
+            quiet_base = offsets[quiet_material]
+            for index, own, enemy, kings in material.positions():
+                position = base + index
+                while filled <= position:
+                    starts[filled] = len(children)
+                    filled += 1
+                moves = generate_legal_moves(own, enemy, kings, UP)
+                if not moves:
+                    queue.append((0, Outcome.LOSS.value, position))
+                    continue
+                internal = 0
+                best_win = None
+                loss = 0
+                can_draw = False # Algum filho já resolvido como empate: a posição nunca perde
+                for move in moves:
+                    child_own, child_enemy, child_kings = apply_move(own, enemy, kings, move)
+                    # Vez do adversário: espelha para que ele ande para cima
+                    child_own, child_enemy, child_kings = flip(child_enemy), flip(child_own), flip(child_kings)
+                    if not move.captured and not (move.promotes and not kings >> move.origin & 1):
+                        children.append(quiet_base + quiet_material.index(child_own, child_enemy, child_kings))
+                        internal += 1
+                        continue
+                    # Captura ou promoção muda o material para fora do grupo: o filho já foi resolvido
+                    child_outcome, child_distance = self._lookup(child_own, child_enemy, child_kings)
+                    if child_outcome == Outcome.LOSS:
+                        best_win = child_distance + 1 if best_win is None else min(best_win, child_distance + 1)
+                    elif child_outcome == Outcome.WIN:
+                        loss = max(loss, child_distance + 1)
+                    else:
+                        can_draw = True
+                if best_win is not None:
+                    has_win[position] = 1
+                    queue.append((best_win, Outcome.WIN.value, position))
+                elif internal == 0 and not can_draw:
+                    queue.append((loss, Outcome.LOSS.value, position))
+                remaining[position] = NEVER_LOSES if can_draw else internal
+                worst_loss[position] = loss
+        while filled <= total:
+            starts[filled] = len(children)
+            filled += 1
+
+        # Arestas invertidas: de cada posição para as que chegam a ela
+        counts = array("I", bytes(4 * (total + 1)))
+        for child in children:
+            counts[child + 1] += 1
+        for position in range(total):
+            counts[position + 1] += counts[position]
+        parents = array("I", bytes(4 * len(children)))
+        fill = array("I", counts)
+        for position in range(total):
+            for edge in range(starts[position], starts[position + 1]):
+                child = children[edge]
+                parents[fill[child]] = position
+                fill[child] += 1
+        del children, starts, fill
+
+        # Propagação em ordem de distância: a primeira vez que uma posição sai da fila é a definitiva
+        heapq.heapify(queue)
+        solved = bytearray(total)
+        while queue:
+            dist, result, position = heapq.heappop(queue)
+            if solved[position]:
+                continue
+            solved[position] = 1
+            outcome[position] = result
+            distance[position] = dist
+            for edge in range(counts[position], counts[position + 1]):
+                parent = parents[edge]
+                if solved[parent]:
+                    continue
+                if result == Outcome.LOSS.value:
+                    has_win[parent] = 1
+                    heapq.heappush(queue, (dist + 1, Outcome.WIN.value, parent))
+                elif remaining[parent] != NEVER_LOSES:
+                    worst_loss[parent] = max(worst_loss[parent], dist + 1)
+                    remaining[parent] -= 1
+                    if remaining[parent] == 0 and not has_win[parent]:
+                        heapq.heappush(queue, (worst_loss[parent], Outcome.LOSS.value, parent))
+
+        tables = {}
+        for material in group:
+            base = offsets[material]
+            table = bytearray(material.size)
+            for index in range(material.size):
+                if solved[base + index]:
+                    table[index] = encode(Outcome(outcome[base + index]), distance[base + index])
+            tables[material] = table
+        return tables
+
+
+_worker_builder: Optional[TablebaseBuilder] = None # Builder de cada processo, com as tabelas dos estágios anteriores
+
+
+def _init_worker(tables: Dict[Material, bytearray]) -> None:
+    global _worker_builder
+    _worker_builder = TablebaseBuilder(2)
+    _worker_builder._tables = tables
+
+
+def _solve_group(group: List[Material]) -> Dict[Material, bytearray]:
+    return _worker_builder._solve(group)
+
+
+class Tablebase:
+    """Consulta a um arquivo de tablebase mapeado em memória (sem carregá-lo na RAM)"""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} tablebase file")
+        self._offsets: Dict[Material, int] = {}
+        for entry in range(count):
+            *counts, offset, size = TABLE_ENTRY.unpack_from(self._map, HEADER.size + entry * TABLE_ENTRY.size)
+            material = Material(*counts)
+            if size != material.size:
+                self.close()
+                raise ValueError(f"Table {tuple(material)} has {size} entries, expected {material.size}")
+            self._offsets[material] = offset
+        self._max_pieces = max((material.pieces for material in self._offsets), default=0)
+
+    @property
+    def max_pieces(self) -> int:
+        return self._max_pieces
+
+    def __contains__(self, material: Material) -> bool:
+        return material in self._offsets
+
+    def probe(self, own: int, enemy: int, kings: int, own_moves_up: bool = True) -> Optional[Tuple[Outcome, int]]:
+        """Resultado para quem joga (dono de `own`) e a distância em meias-jogadas até o fim.
+        Retorna None se a posição não estiver na tablebase"""
+
+        own, enemy, kings = canonical(own, enemy, kings, own_moves_up)
+        if not own:
+            return Outcome.LOSS, 0
+        if (own | enemy) & ~kings & ~MEN_MASK:
+            return None # Peão fora das linhas alcançáveis: posição impossível em partida
+        material = material_of(own, enemy, kings)
+        offset = self._offsets.get(material)
+        if offset is None:
+            return None
+        return decode(self._map[offset + material.index(own, enemy, kings)])
+
+    def probe_board(self, board) -> Optional[Tuple[Outcome, int]]:
+        """Consulta a posição de um Board, do ponto de vista do lado que deve jogar"""
+
+        bb = board.bitboard
+        if board.side_to_move == Owner.PLAYER1.value:
+            return self.probe(bb.player1, bb.player2, bb.kings, True)
+        return self.probe(bb.player2, bb.player1, bb.kings, False)
+
+    def best_move(self, board) -> Optional[Move]:
+        """Jogada que leva à vitória mais rápida (ou ao empate, ou à derrota mais demorada),
+        se a posição estiver na tablebase"""
+
+        bb = board.bitboard
+        player1_to_move = board.side_to_move == Owner.PLAYER1.value
+        own, enemy = (bb.player1, bb.player2) if player1_to_move else (bb.player2, bb.player1)
+        best = None
+        best_key = None
+        for move in board.generate_legal_moves():
+            child_own, child_enemy, child_kings = apply_move(own, enemy, bb.kings, move)
+            result = self.probe(child_enemy, child_own, child_kings, not player1_to_move)
+            if result is None:
+                return None
+            child_outcome, child_distance = result
+            # Do ponto de vista de quem joga agora: vitória do adversário é derrota
+            if child_outcome == Outcome.LOSS:
+                key = (2, -child_distance)
+            elif child_outcome == Outcome.DRAW:
+                key = (1, 0)
+            else:
+                key = (0, child_distance)
+            if best_key is None or key > best_key:
+                best, best_key = move, key
+        return best
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "Tablebase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera e consulta a tablebase de finais.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="resolve as posições e grava o arquivo")
+    build_parser.add_argument("--pieces", type=int, default=3,
+                              help="número máximo de peças no tabuleiro (4 já leva mais de uma hora)")
+    build_parser.add_argument("--output", default="endgame.tb")
+    build_parser.add_argument("--workers", type=int, default=1, help="processos por estágio de resolução")
+    probe_parser = commands.add_parser("probe", help="consulta uma posição")
+    probe_parser.add_argument("path")
+    probe_parser.add_argument("--position", required=True, help="posição no formato de Board.position_string")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        def report(material: Material, size: int, elapsed: float) -> None:
+            print(f"{tuple(material)}: {size} entries ({elapsed:.1f} s)", file=sys.stderr)
+
+        start = time.perf_counter()
+        builder = TablebaseBuilder(args.pieces, report)
+        builder.build(args.workers)
+        builder.write(args.output)
+        total = sum(len(table) for table in builder.tables.values())
+        print(f"{len(builder.tables)} tables, {total} bytes in {time.perf_counter() - start:.1f} s -> {args.output}")
+        return 0
+
+    from board import Board
+
+    board = Board()
+    try:
+        board.load_position(args.position)
+    except ValueError as error:
+        parser.error(str(error))
+    with Tablebase(args.path) as tablebase:
+        result = tablebase.probe_board(board)
+        if result is None:
+            print("not in tablebase")
+            return 1
+        outcome, distance = result
+        move = tablebase.best_move(board)
+        print(f"{outcome.name.lower()} in {distance} plies" if outcome != Outcome.DRAW else "draw",
+              f"(best move: {move.notation})" if move is not None else "")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
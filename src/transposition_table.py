@@ -0,0 +1,151 @@
+from array import array
+from enum import Enum
+from typing import NamedTuple, Optional, Tuple
+
+from move import Move
+
+ENTRY_BYTES = 16 # Chave (8 bytes) + dados empacotados (8 bytes)
+SLOTS_PER_BUCKET = 2 # Casa 0: preferência por profundidade; casa 1: sempre substitui
+
+# Empacotamento dos dados de uma entrada em 64 bits
+SCORE_BITS = 32
+SCORE_OFFSET = 1 << (SCORE_BITS - 1)
+DEPTH_SHIFT = 32
+BOUND_SHIFT = 40
+MOVE_SHIFT = 42
+GENERATION_SHIFT = 55
+VALID_BIT = 1 << 63
+MAX_DEPTH = 0xFF
+NO_MOVE = 0
+
+
+class Bound(Enum):
+    EXACT = 0
+    LOWER = 1 # Score é um limite inferior (corte beta)
+    UPPER = 2 # Score é um limite superior (nenhum lance superou alfa)
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    score: int
+    bound: int
+    move: Optional[Tuple[int, int]] # (origem, destino) do melhor lance
+
+
+def encode_move(move: Optional[Move]) -> int:
+    """Codifica o melhor lance em 13 bits: bit de presença, origem e destino"""
+
+    if move is None:
+        return NO_MOVE
+    return 1 << 12 | move.origin << 6 | move.path[-1]
+
+
+def decode_move(code: int) -> Optional[Tuple[int, int]]:
+    if not code:
+        return None
+    return (code >> 6) & 0x3F, code & 0x3F
+
+
+class TranspositionTable:
+    """Tabela de transposição de tamanho fixo, indexada pelo hash de Zobrist do Board.
+
+    As entradas ficam em dois arrays pré-alocados (chaves e dados empacotados) divididos
+    em buckets de duas casas: a primeira só é substituída por buscas mais profundas
+    (ou de uma busca anterior), a segunda é sempre substituída."""
+
+    def __init__(self, size_mb: float = 16) -> None:
+        if size_mb <= 0:
+            raise ValueError(f"Transposition table size must be positive. Instead, size is {size_mb} MB")
+        entries = int(size_mb * 1024 * 1024) // ENTRY_BYTES
+        buckets = 1
+        while buckets * 2 * SLOTS_PER_BUCKET <= entries:
+            buckets *= 2
+        self._mask: int = buckets - 1
+        self._size: int = buckets * SLOTS_PER_BUCKET
+        self._keys = array("Q", bytes(8 * self._size))
+        self._data = array("Q", bytes(8 * self._size))
+        self._generation: int = 0
+        self.probes: int = 0
+        self.hits: int = 0
+        self.stores: int = 0
+
+    @property
+    def size(self) -> int:
+        """Número de entradas da tabela"""
+
+        return self._size
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size * ENTRY_BYTES
+
+    def clear(self) -> None:
+        """Esvazia a tabela sem realocar os arrays"""
+
+        zeros = bytes(8 * self._size)
+        memoryview(self._keys).cast("B")[:] = zeros
+        memoryview(self._data).cast("B")[:] = zeros
+        self._generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        """Marca o início de uma nova busca: entradas antigas passam a ser substituíveis"""
+
+        self._generation = (self._generation + 1) & 0xFF
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        """Procura a posição na tabela. Retorna None se não houver entrada para a chave"""
+
+        self.probes += 1
+        index = (key & self._mask) * SLOTS_PER_BUCKET
+        keys = self._keys
+        for slot in (index, index + 1):
+            if keys[slot] == key:
+                data = self._data[slot]
+                if data & VALID_BIT:
+                    self.hits += 1
+                    return TTEntry(
+                        (data >> DEPTH_SHIFT) & MAX_DEPTH,
+                        (data & 0xFFFFFFFF) - SCORE_OFFSET,
+                        (data >> BOUND_SHIFT) & 0x3,
+                        decode_move((data >> MOVE_SHIFT) & 0x1FFF),
+                    )
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: Optional[Move] = None) -> None:
+        """Guarda o resultado de uma busca, seguindo o esquema profundidade/sempre substituir"""
+
+        self.stores += 1
+        depth = min(max(depth, 0), MAX_DEPTH)
+        data = (VALID_BIT
+                | self._generation << GENERATION_SHIFT
+                | encode_move(move) << MOVE_SHIFT
+                | bound << BOUND_SHIFT
+                | depth << DEPTH_SHIFT
+                | (score + SCORE_OFFSET) & 0xFFFFFFFF)
+
+        index = (key & self._mask) * SLOTS_PER_BUCKET
+        keys = self._keys
+        stored = self._data[index]
+        stored_depth = (stored >> DEPTH_SHIFT) & MAX_DEPTH
+        stored_generation = (stored >> GENERATION_SHIFT) & 0xFF
+        if (keys[index] == key or not stored & VALID_BIT
+                or stored_generation != self._generation or depth >= stored_depth):
+            if keys[index] != key and stored & VALID_BIT:
+                # A entrada profunda desalojada ainda é útil na casa de substituição
+                keys[index + 1] = keys[index]
+                self._data[index + 1] = stored
+            keys[index] = key
+            self._data[index] = data
+        else:
+            keys[index + 1] = key
+            self._data[index + 1] = data
+
+    def hashfull(self) -> int:
+        """Ocupação da tabela em milésimos, estimada pelas primeiras 1000 entradas"""
+
+        sample = min(1000, self._size)
+        used = sum(1 for index in range(sample) if self._data[index] & VALID_BIT)
+        return used * 1000 // sample
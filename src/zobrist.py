@@ -0,0 +1,38 @@
+import random
+from typing import List, Tuple
+
+from bitboard import Bitboard, NUM_SQUARES, iter_squares
+from owner import Owner
+
+ZOBRIST_SEED = 0x5A0B1257 # Semente fixa: o mesmo tabuleiro tem o mesmo hash em qualquer processo
+
+
+def _build_keys() -> Tuple[int, Tuple[Tuple[List[int], List[int]], ...]]:
+    rng = random.Random(ZOBRIST_SEED)
+    keys = [None]
+    for _ in Owner:
+        men = [rng.getrandbits(64) for _ in range(NUM_SQUARES)]
+        kings = [rng.getrandbits(64) for _ in range(NUM_SQUARES)]
+        keys.append((men, kings))
+    return rng.getrandbits(64), tuple(keys)
+
+
+# PIECE_KEYS[dono][é dama][casa]; SIDE_KEY entra no hash quando é a vez do player2
+SIDE_KEY, PIECE_KEYS = _build_keys()
+
+
+def piece_key(square: int, owner: int, is_king: bool) -> int:
+    return PIECE_KEYS[owner][is_king][square]
+
+
+def compute_hash(bitboard: Bitboard, side_to_move: int) -> int:
+    """Calcula o hash de Zobrist do zero, percorrendo o bitboard"""
+
+    h = SIDE_KEY if side_to_move == Owner.PLAYER2.value else 0
+    for owner, pieces in ((Owner.PLAYER1.value, bitboard.player1), (Owner.PLAYER2.value, bitboard.player2)):
+        men_keys, king_keys = PIECE_KEYS[owner]
+        for square in iter_squares(pieces & ~bitboard.kings):
+            h ^= men_keys[square]
+        for square in iter_squares(pieces & bitboard.kings):
+            h ^= king_keys[square]
+    return h
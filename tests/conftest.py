@@ -0,0 +1,64 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+
+# Os módulos do jogo são importados como no src/ (ex.: from board import Board)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pytest
+
+
+def random_game(seed: int, max_plies: int = 120):
+    """Partida com jogadas sorteadas: gera (Board antes da jogada, jogada), no mesmo Board"""
+
+    from board import Board
+
+    rng = random.Random(seed)
+    board = Board()
+    for _ in range(max_plies):
+        moves = board.generate_legal_moves()
+        if not moves:
+            return
+        move = rng.choice(moves)
+        yield board, move
+        board.make_move(move)
+
+
+@pytest.fixture
+def board():
+    from board import Board
+
+    return Board()
+
+
+@pytest.fixture
+def dog_server():
+    """dog_server.py rodando numa thread, numa porta livre: gera (DogServer, url)"""
+
+    from dog_server import DEFAULT_HOST, DogServer
+
+    server = DogServer()
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        started = loop.create_future()
+        started.add_done_callback(lambda future: (state.update(port=future.result()), ready.set()))
+        state["task"] = loop.create_task(server.serve(DEFAULT_HOST, 0, started))
+        try:
+            loop.run_until_complete(state["task"])
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield server, f"http://{DEFAULT_HOST}:{state['port']}/"
+    loop.call_soon_threadsafe(state["task"].cancel)
+    thread.join(5)
@@ -0,0 +1,108 @@
+import json
+from types import SimpleNamespace
+
+import analyze
+from conftest import random_game
+from game_record import GameRecord, GameRecordWriter
+
+OPTIONS = {"time_ms": analyze.NO_TIME_LIMIT_MS, "depth": 2, "threshold": analyze.DEFAULT_THRESHOLD, "tt_mb": 1,
+           "output": None}
+
+
+def write_games(path, *records):
+    with GameRecordWriter(str(path)) as writer:
+        for record in records:
+            writer.write_game(record)
+
+
+def played(seed, plies):
+    return [move.notation for _, move in random_game(seed, max_plies=plies)]
+
+
+def test_every_played_move_gets_a_report(tmp_path):
+    path = tmp_path / "games.pdn"
+    moves = played(1, 12)
+    write_games(path, GameRecord({"Event": "x"}, moves, "*"))
+    output = tmp_path / "reports"
+    output.mkdir()
+
+    report, = analyze.analyze_files([str(path)], dict(OPTIONS, output=str(output)))
+    assert "error" not in report
+    assert report["plies"] == len(moves)
+    assert [entry["move"] for entry in report["moves"]] == moves
+    assert all(entry["loss"] >= 0 and entry["best"] is not None for entry in report["moves"])
+    assert all(entry in report["moves"] and entry["loss"] >= OPTIONS["threshold"] for entry in report["blunders"])
+    with open(output / "games-000000.json") as saved:
+        assert json.load(saved)["moves"] == report["moves"]
+
+
+def test_corrupt_games_are_skipped(tmp_path):
+    path = tmp_path / "games.pdn"
+    write_games(path, GameRecord({"Event": "x"}, ["a3-a5"], "*"), GameRecord({"Event": "y"}, played(2, 4), "*"))
+
+    reports = sorted(analyze.analyze_files([str(path)], OPTIONS), key=lambda report: report["game"])
+    assert "error" in reports[0] and reports[0]["moves"] == []
+    assert "error" not in reports[1] and len(reports[1]["moves"]) == 4
+
+
+def test_forced_moves_take_the_score_of_the_next_position():
+    board = None
+    for board, move in random_game(3, max_plies=200):
+        if len(board.generate_legal_moves()) == 1:
+            break
+    assert board is not None
+    engine = analyze.Engine(1)
+    score, best_move = analyze.position_score(board, engine, analyze.NO_TIME_LIMIT_MS, 2)
+    assert best_move == board.generate_legal_moves()[0]
+    board.make_move(best_move)
+    engine.transposition_table.clear()
+    assert score == -analyze.position_score(board, engine, analyze.NO_TIME_LIMIT_MS, 2)[0]
+
+
+def test_self_play_files_are_read(tmp_path):
+    path = tmp_path / "games.jsonl"
+    game = {"game": 1, "player1": "a", "player2": "b", "winner": "player2", "moves": played(4, 6)}
+    path.write_text(json.dumps(game) + "\n")
+
+    record, = analyze.load_games(str(path))
+    assert record.moves == game["moves"]
+    assert record.result == "0-1"
+
+
+class RecordingEngine:
+    """Engine de mentira: guarda as posições buscadas e dá sempre o mesmo score"""
+
+    def __init__(self):
+        self.searched = []
+
+    def search(self, board, time_ms, depth):
+        self.searched.append(board.position_string())
+        return SimpleNamespace(score=7, best_move=None)
+
+
+def test_forced_lines_stop_at_the_ply_limit(monkeypatch):
+    monkeypatch.setattr(analyze, "MAX_FORCED_PLIES", 1)
+    for board, move in random_game(3, max_plies=200):
+        if len(board.generate_legal_moves()) == 1:
+            break
+    forced = board.generate_legal_moves()[0]
+    position = board.position_string()
+    engine = RecordingEngine()
+
+    assert analyze.position_score(board, engine, analyze.NO_TIME_LIMIT_MS, 2) == (-7, forced)
+    assert board.position_string() == position
+    board.make_move(forced)
+    assert engine.searched == [board.position_string()]
+
+
+def test_unexpected_errors_skip_the_game(tmp_path, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("engine failure")
+
+    path = tmp_path / "games.pdn"
+    write_games(path, GameRecord({"Event": "x"}, played(1, 4), "*"))
+    monkeypatch.setattr(analyze, "analyze_game", broken)
+
+    report, = analyze.analyze_files([str(path)], OPTIONS)
+    assert report["error"] == "RuntimeError: engine failure"
+    assert report["moves"] == []
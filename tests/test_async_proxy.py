@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from dog.async_proxy import AsyncDogProxy
+
+
+class SlowProxy:
+    """DogProxy de mentira: cada pedido demora e registra a ordem e a thread em que rodou"""
+
+    def __init__(self):
+        self.calls = []
+
+    def start_match(self, number_of_players):
+        time.sleep(0.01)
+        self.calls.append(("start", threading.current_thread().name))
+        return f"started {number_of_players}"
+
+    def send_move(self, a_move):
+        if a_move.get("fail"):
+            raise ConnectionError("Move not sent")
+        time.sleep(0.01 * (3 - a_move["n"])) # Os primeiros demoram mais
+        self.calls.append(("move", a_move["n"]))
+        return a_move["n"]
+
+
+@pytest.fixture
+def network():
+    network = AsyncDogProxy(SlowProxy())
+    yield network
+    network.close()
+
+
+def test_callbacks_run_only_in_dispatch(network):
+    received = []
+    future = network.submit(network.start_match(2), lambda result: received.append(
+        (result, threading.current_thread() is threading.main_thread())))
+    future.result(timeout=5)
+    assert network.proxy.calls[0][1] != threading.main_thread().name
+    time.sleep(0.05)
+    assert received == []
+    assert network.dispatch() == 1
+    assert received == [("started 2", True)]
+
+
+def test_requests_reach_the_proxy_in_order(network):
+    futures = [network.submit(network.send_move({"n": n})) for n in range(3)]
+    assert [future.result(timeout=5) for future in futures] == [0, 1, 2]
+    assert network.proxy.calls == [("move", 0), ("move", 1), ("move", 2)]
+
+
+def test_call_in_ui_is_queued_for_dispatch(network):
+    received = []
+    network.call_in_ui(received.append, "move")
+    assert received == []
+    network.dispatch()
+    assert received == ["move"]
+    assert network.dispatch() == 0
+
+
+def test_errors_go_to_the_error_callback_in_dispatch(network):
+    received = []
+    future = network.submit(network.send_move({"fail": True}), received.append, lambda error: received.append(
+        (type(error), threading.current_thread() is threading.main_thread())))
+    with pytest.raises(ConnectionError):
+        future.result(timeout=5)
+    time.sleep(0.05)
+    assert received == []
+    network.dispatch()
+    assert received == [(ConnectionError, True)]
+
+
+def test_errors_without_error_callback_are_raised_by_dispatch(network):
+    future = network.submit(network.send_move({"fail": True}), lambda result: None)
+    with pytest.raises(ConnectionError):
+        future.result(timeout=5)
+    time.sleep(0.05)
+    with pytest.raises(ConnectionError):
+        network.dispatch()
@@ -0,0 +1,32 @@
+import pytest
+
+from batch import BoardBatch
+from engine.evaluation import evaluate
+from conftest import random_game
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_scalar_evaluation(seed):
+    states, scores = [], []
+    for board, _ in random_game(seed):
+        bb = board.bitboard
+        states.append((bb.player1, bb.player2, bb.kings, board.side_to_move == 1))
+        scores.append(evaluate(board))
+    assert BoardBatch.from_bitboards(states).evaluate().tolist() == scores
+
+
+def test_from_boards_matches_scalar_evaluation(board):
+    assert BoardBatch.from_boards([board]).evaluate().tolist() == [evaluate(board)]
+
+
+def test_grid_round_trip():
+    for board, _ in random_game(1, 30):
+        pass
+    batch = BoardBatch.from_boards([board])
+    again = BoardBatch.from_grid(batch.to_grid(), batch.player1_to_move)
+    assert again.bitboards.tolist() == batch.bitboards.tolist()
+
+
+def test_batch_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        BoardBatch([[0, 0]], [True])
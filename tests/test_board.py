@@ -0,0 +1,134 @@
+import pytest
+
+from board import Board
+from engine.evaluation import evaluate_bitboards
+from game_record import GameRecordWriter, read_games
+from game_status import GameStatus
+from zobrist import compute_hash
+from conftest import random_game
+
+
+def snapshot(board: Board):
+    """Estado completo do tabuleiro: grade de peças, bitboards e vez"""
+
+    grid = tuple((position.piece.owner, position.piece.is_king) if position.piece else None
+                 for row in board.positions for position in row)
+    bb = board.bitboard
+    return grid, (bb.player1, bb.player2, bb.kings), board.side_to_move
+
+
+def assert_consistent(board: Board) -> None:
+    """Hash e avaliação incrementais iguais aos calculados do zero"""
+
+    bb = board.bitboard
+    assert board.hash == compute_hash(bb, board.side_to_move)
+    assert board.evaluate() == evaluate_bitboards(bb.player1, bb.player2, bb.kings, board.side_to_move == 1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_make_unmake_restores_the_position(seed):
+    history = []
+    for board, move in random_game(seed):
+        assert_consistent(board)
+        history.append((snapshot(board), board.hash))
+    assert_consistent(board) # random_game já aplicou a última jogada
+    for state, key in reversed(history):
+        board.unmake_move()
+        assert snapshot(board) == state
+        assert board.hash == key
+        assert_consistent(board)
+
+
+def test_unmake_without_moves_raises(board):
+    with pytest.raises(IndexError):
+        board.unmake_move()
+
+
+def test_reset_game_restores_the_initial_position():
+    initial = snapshot(Board())
+    for board, _ in random_game(0, 40):
+        pass
+    board.reset_game()
+    assert snapshot(board) == initial
+
+
+def test_transpositions_share_the_hash(board):
+    # Os peões das colunas 0 e 7 do player1 avançam em ordens diferentes, com a mesma resposta
+    first = {move.origin: move for move in board.generate_legal_moves()}
+    board.make_move(first[40])
+    reply = board.generate_legal_moves()[1]
+    board.make_move(reply)
+    board.make_move({move.origin: move for move in board.generate_legal_moves()}[47])
+    key = board.hash
+
+    other = Board()
+    other.make_move(first[47])
+    other.make_move(reply)
+    other.make_move({move.origin: move for move in other.generate_legal_moves()}[40])
+    assert other.hash == key
+    assert snapshot(other) == snapshot(board)
+
+
+def test_load_position_round_trip():
+    position = "......../...o..../..O...../......../......../.x....../...X..../........ 2"
+    board = Board()
+    board.load_position(position)
+    assert board.position_string() == position
+    assert_consistent(board)
+
+
+def test_load_position_rejects_bad_input(board):
+    with pytest.raises(ValueError):
+        board.load_position("......../........ 1")
+
+
+def test_king_capture_loop_keeps_the_king():
+    # A dama captura em volta e termina na casa de onde saiu
+    board = Board()
+    board.load_position("......../......../......../......../..o...../.o.o..../.Xo...../........ 1")
+    loops = [move for move in board.generate_legal_moves() if move.destination == move.origin]
+    assert loops
+    for move in loops:
+        before = snapshot(board)
+        board.make_move(move)
+        assert board.bitboard.player1 >> move.origin & 1
+        assert_consistent(board)
+        board.unmake_move()
+        assert snapshot(board) == before
+
+
+def test_draw_is_recorded_as_draw(tmp_path):
+    # Cada lado fica com um peão: empate pela regra 3
+    path = tmp_path / "games.pdn"
+    board = Board()
+    board.recorder = GameRecordWriter(str(path))
+    board.load_position(".......o/......../......../...o..../...x..../......../......../........ 1")
+    board.start_match([["a", "1", "1"], ["b", "2", "2"]], "1")
+    origin = board.positions[4][3]
+    board.first_selected_origin = board.current_selected_origin = origin
+    board.move_piece(origin, board.positions[2][3])
+    board.recorder.close()
+
+    assert board.game_status == GameStatus.FINISHED.value
+    assert board.move_to_send["winner"] is None
+    (record,) = read_games(str(path))
+    assert record.result == "1/2-1/2"
+
+
+def test_accessors_follow_the_majority_rule():
+    # Captura simples para a direita ou dupla para cima: só a dupla é legal
+    board = Board()
+    board.load_position(".......o/......../...o..../......../...o..../...xo.../......../........ 1")
+    board.start_match([["a", "1", "1"], ["b", "2", "2"]], "1")
+    origin = board.positions[5][3]
+    assert board.check_mandatory_capture_pieces() == [origin.piece]
+    assert board.get_possible_moves(origin) == [board.positions[3][3]]
+
+    board.first_selected_origin = board.current_selected_origin = origin
+    board.move_piece(origin, board.positions[3][3])
+    assert board.game_status == GameStatus.OCCURRING_LOCAL_MOVE.value
+    board.current_selected_origin = board.positions[3][3]
+    assert board.get_possible_moves(board.positions[3][3]) == [board.positions[1][3]]
+    board.move_piece(board.positions[3][3], board.positions[1][3])
+    assert board.game_status == GameStatus.WAITING_REMOTE_MOVE.value
+    assert len(board.move_to_send["captured_pieces"]) == 2
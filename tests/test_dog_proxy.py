@@ -0,0 +1,173 @@
+import json
+
+import pytest
+import requests
+
+from dog import dog_proxy
+from dog.dog_proxy import BACKOFF_FACTOR, MAX_RETRIES, DogProxy
+from move_codec import from_wire
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.text = body if isinstance(body, str) else json.dumps(body if body is not None else {})
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+
+class FakeSession:
+    """Sessão HTTP de mentira: devolve (ou lança) as respostas dadas, em ordem"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    def post(self, url, data, timeout):
+        self.calls.append((url, data))
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits = []
+    monkeypatch.setattr(dog_proxy.time, "sleep", waits.append)
+    return waits
+
+
+def make_proxy(*answers):
+    proxy = DogProxy()
+    proxy.session = FakeSession(*answers)
+    return proxy
+
+
+def test_idempotent_requests_are_retried_with_backoff(sleeps):
+    proxy = make_proxy(FakeResponse(503), FakeResponse(502), FakeResponse(200))
+    assert proxy.post("match/", {}).status_code == 200
+    assert sleeps == [BACKOFF_FACTOR, BACKOFF_FACTOR * 2]
+    summary = proxy.get_metrics()["match/"]
+    assert (summary["requests"], summary["retries"], summary["failures"]) == (1, 2, 0)
+
+
+def test_moves_are_not_resent_after_reaching_the_server(sleeps):
+    proxy = make_proxy(requests.ReadTimeout(), FakeResponse(200))
+    assert proxy.post("move/", {}) is None
+    assert len(proxy.session.calls) == 1
+    assert proxy.get_metrics()["move/"]["failures"] == 1
+
+
+def test_connect_timeouts_are_retried_for_every_endpoint(sleeps):
+    proxy = make_proxy(requests.ConnectTimeout(), FakeResponse(200))
+    assert proxy.post("move/", {}).status_code == 200
+    assert len(proxy.session.calls) == 2
+
+
+def test_gives_up_after_the_last_retry(sleeps):
+    proxy = make_proxy(requests.ConnectionError())
+    assert proxy.post("started/", {}) is None
+    assert len(proxy.session.calls) == MAX_RETRIES + 1
+    assert len(sleeps) == MAX_RETRIES
+
+
+class Actor:
+    def __init__(self):
+        self.moves = []
+        self.withdrawals = 0
+
+    def receive_move(self, move):
+        self.moves.append(move)
+
+    def receive_withdrawal_notification(self):
+        self.withdrawals += 1
+
+
+def proxy_in_match(*answers):
+    proxy = make_proxy(*answers)
+    proxy.player_id, proxy.game_id, proxy.status = "1", "game", 3
+    proxy.dog_actor = Actor()
+    return proxy
+
+
+@pytest.mark.parametrize("answer", [
+    None,
+    FakeResponse(503, "<html>Service Unavailable</html>"),
+    FakeResponse(200, ""),
+    FakeResponse(200, "[1, 2]"),
+    FakeResponse(200, "\"text\""),
+])
+def test_bad_responses_are_not_parsed(answer):
+    assert DogProxy.parse_response(answer) is None
+
+
+def test_bad_responses_do_not_stop_polling(sleeps):
+    proxy = proxy_in_match(FakeResponse(503, "<html>Bad Gateway</html>"))
+    assert proxy.match_status() is False
+    proxy.session = FakeSession(FakeResponse(200, ""))
+    assert proxy.match_status() is False
+    proxy.session = FakeSession(FakeResponse(200, {"0": "Jogada", "1": "not a move"}))
+    assert proxy.match_status() is False
+    assert proxy.status == 3 and proxy.dog_actor.moves == []
+
+
+def test_start_status_ignores_bad_responses(sleeps):
+    proxy = make_proxy(FakeResponse(200, "<html></html>"))
+    proxy.status = 2
+    assert proxy.start_status() is False
+    assert proxy.status == 2
+
+
+@pytest.mark.parametrize("answer", [FakeResponse(500, "<html></html>"), requests.ReadTimeout()])
+def test_lost_moves_raise_and_keep_the_status(sleeps, answer):
+    proxy = proxy_in_match(answer)
+    with pytest.raises(ConnectionError):
+        proxy.send_move({"match_status": "next"})
+    assert proxy.status == 3
+
+
+MOVE = {"origin": {"row": 5, "col": 0}, "destination": {"row": 4, "col": 0}, "path": [{"row": 4, "col": 0}],
+        "captured_pieces": [], "promoted": False, "match_status": "next", "winner": None}
+
+
+def test_moves_are_sent_in_the_legacy_format_by_default():
+    # Clientes antigos só leem os campos origin, destination, captured_pieces...
+    proxy = proxy_in_match(FakeResponse(200, {"0": "Jogada recebida"}))
+    proxy.send_move(MOVE)
+    assert json.loads(proxy.session.calls[0][1]["move"]) == MOVE
+
+
+def test_compact_format_is_opt_in(monkeypatch):
+    monkeypatch.setattr(dog_proxy, "WIRE_FORMAT", "compact")
+    proxy = proxy_in_match(FakeResponse(200, {"0": "Jogada recebida"}))
+    proxy.send_move(MOVE)
+    sent = json.loads(proxy.session.calls[0][1]["move"])
+    assert "origin" not in sent and from_wire(sent) == MOVE
+
+
+@pytest.mark.parametrize("payload", [
+    {"winner": None},
+    {"match_status": "next", "order": "1"},
+    {"match_status": "next", "player": "2"},
+    {"match_status": "next", "player": "2", "order": "first"},
+    {"match_status": "next", "player": "2", "order": None},
+    {"match_status": "progress", "player": "2", "order": "1"},
+])
+def test_moves_without_player_or_order_are_ignored(payload):
+    proxy = proxy_in_match(FakeResponse(200, {"0": "Jogada", "1": repr(payload)}))
+    assert proxy.match_status() is False
+    assert proxy.move_order == 0 and proxy.dog_actor.moves == []
+
+
+def test_opponent_moves_are_delivered_once():
+    payload = dict(MOVE, player="2", order="1")
+    proxy = proxy_in_match(FakeResponse(200, {"0": "Jogada", "1": repr(payload)}))
+    assert proxy.match_status() is True
+    assert proxy.match_status() is False
+    assert proxy.move_order == 1 and proxy.dog_actor.moves == [payload]
@@ -0,0 +1,110 @@
+import ast
+import asyncio
+import json
+import time
+
+from dog.dog_proxy import DogProxy
+from dog_server import DogServer
+
+GAME = "game"
+
+
+def form(player_id, **fields):
+    return dict(fields, player_id=player_id, game_id=GAME)
+
+
+async def started_match(server):
+    await server.register_player(form("1", player_name="a"))
+    await server.register_player(form("2", player_name="b"))
+    return await server.start_match(form("1", number_of_players="2"))
+
+
+def test_match_flow():
+    async def scenario():
+        server = DogServer()
+        await server.register_player(form("1", player_name="a"))
+        assert (await server.start_match(form("1", number_of_players="2")))["code"] == "1"
+        await server.register_player(form("2", player_name="b"))
+        start = await server.start_match(form("1", number_of_players="2"))
+        assert start["code"] == "2"
+        assert start["players"] == [["a", "1", "1"], ["b", "2", "2"]] # Quem pediu joga primeiro
+        assert (await server.start_status(form("2")))["players"] == [["b", "2", "2"], ["a", "1", "1"]]
+        assert (await server.send_move(form("1", move=json.dumps({"match_status": "next"}))))["1"] == "1"
+        return await server.match_status(form("2"))
+
+    answer = asyncio.run(scenario())
+    move = ast.literal_eval(answer["1"]) # repr de dicionário, como no servidor Dog
+    assert move == {"match_status": "next", "player": "1", "order": "1"}
+
+
+def test_long_poll_returns_when_the_move_arrives():
+    async def scenario():
+        server = DogServer()
+        await started_match(server)
+        poll = asyncio.ensure_future(server.match_status(form("2", wait="10", order="0")))
+        await asyncio.sleep(0.05)
+        assert not poll.done()
+        start = time.monotonic()
+        await server.send_move(form("1", move=json.dumps({"match_status": "next"})))
+        answer = await poll
+        return answer, time.monotonic() - start
+
+    answer, elapsed = asyncio.run(scenario())
+    assert "next" in answer["1"]
+    assert elapsed < 1
+
+
+def test_silent_opponent_interrupts_the_match():
+    async def scenario():
+        server = DogServer(player_timeout=0.05)
+        await started_match(server)
+        await asyncio.sleep(0.1)
+        return await server.match_status(form("1"))
+
+    assert "interrupted" in asyncio.run(scenario())["1"]
+
+
+def test_bad_requests_are_rejected():
+    async def scenario():
+        server = DogServer()
+        return [(await server.dispatch("POST", "/nothing/", b""))[0],
+                (await server.dispatch("GET", "/match/", b""))[0],
+                (await server.dispatch("POST", "/move/", b"move=%5B1%5D"))[0]]
+
+    assert asyncio.run(scenario()) == [404, 405, 400]
+
+
+class Actor:
+    def __init__(self):
+        self.events = []
+
+    def receive_start(self, start_status):
+        self.events.append(("start", start_status.get_code()))
+
+    def receive_move(self, a_move):
+        self.events.append(("move", a_move))
+
+
+def test_dog_proxy_plays_against_the_local_server(dog_server, monkeypatch):
+    _, url = dog_server
+    monkeypatch.setenv("DOG_SERVER_URL", url)
+    proxies = []
+    for player_id in ("1", "2"):
+        proxy = DogProxy()
+        proxy.player_id, proxy.game_id, proxy.dog_actor = player_id, GAME, Actor()
+        assert proxy.register_player(f"p{player_id}", player_id, GAME).status_code == 200
+        proxy.status = 2
+        proxies.append(proxy)
+    first, second = proxies
+
+    assert first.start_match(2).get_code() == "2"
+    second.start_status()
+    assert second.dog_actor.events == [("start", "2")]
+    move = {"origin": {"row": 5, "col": 0}, "destination": {"row": 4, "col": 0}, "captured_pieces": [],
+            "promoted": False, "winner": None, "game_status": 5, "match_status": "next"}
+    first.send_move(move)
+    assert second.match_status()
+    kind, received = second.dog_actor.events[-1]
+    assert (kind, received["origin"], received["destination"]) == ("move", move["origin"], move["destination"])
+    for proxy in proxies:
+        proxy.close()
@@ -0,0 +1,47 @@
+from engine import Engine, evaluate
+from conftest import random_game
+
+
+def test_search_returns_a_legal_move_and_leaves_the_board_untouched(board):
+    key = board.hash
+    result = Engine().search(board, time_ms=10_000, max_depth=4)
+    assert result.depth == 4
+    assert result.best_move in board.generate_legal_moves()
+    assert result.pv[0] == result.best_move
+    assert board.hash == key
+
+
+def test_search_is_deterministic(board):
+    first = Engine().search(board, time_ms=10_000, max_depth=5)
+    second = Engine().search(board, time_ms=10_000, max_depth=5)
+    assert (first.best_move, first.score, first.nodes) == (second.best_move, second.score, second.nodes)
+
+
+def test_search_respects_the_time_budget(board):
+    result = Engine().search(board, time_ms=100)
+    assert result.best_move is not None
+    assert result.elapsed_ms < 1000
+
+
+def test_single_legal_move_is_played_without_search():
+    for board, _ in random_game(3):
+        moves = board.generate_legal_moves()
+        if len(moves) == 1:
+            result = Engine().search(board, time_ms=1000)
+            assert (result.best_move, result.nodes) == (moves[0], 0)
+            return
+    raise AssertionError("no forced move in the sample game")
+
+
+def test_initial_position_is_balanced(board):
+    assert evaluate(board) == 0
+
+
+def test_interrupted_search_leaves_nothing_for_the_next_one(board):
+    # Uma busca cortada pelo tempo não pode deixar posições no caminho (seriam falsas repetições)
+    engine = Engine()
+    engine.search(board, time_ms=20)
+    engine.transposition_table.clear()
+    result = engine.search(board, time_ms=10_000, max_depth=5)
+    fresh = Engine().search(board, time_ms=10_000, max_depth=5)
+    assert (result.best_move, result.score, result.nodes) == (fresh.best_move, fresh.score, fresh.nodes)
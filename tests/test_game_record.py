@@ -0,0 +1,80 @@
+import io
+
+import pytest
+
+from conftest import random_game
+from game_record import GameRecord, GameRecordWriter, game_tags, read_games, replay
+from owner import Owner
+
+
+def record_games(path, seeds):
+    played = []
+    with GameRecordWriter(str(path)) as writer:
+        for seed in seeds:
+            writer.begin_game("Ana", "Bia")
+            moves = []
+            for _, move in random_game(seed, max_plies=60):
+                writer.add_move(move)
+                moves.append(move)
+            writer.finish_game(Owner.PLAYER1.value)
+            played.append(moves)
+    return played
+
+
+def test_recorded_games_are_read_back_and_replayed(tmp_path):
+    path = tmp_path / "games.pdn"
+    played = record_games(path, [1, 2, 3])
+
+    records = list(read_games(str(path)))
+    assert len(records) == 3
+    for record, moves in zip(records, played):
+        assert record.finished and record.winner == Owner.PLAYER1.value
+        assert record.tags["Player1"] == "Ana" and record.tags["Player2"] == "Bia"
+        assert record.moves == [move.notation for move in moves]
+        assert [move for _, move in replay(record)] == moves
+
+
+def test_game_in_progress_is_already_on_disk(tmp_path):
+    path = tmp_path / "games.pdn"
+    writer = GameRecordWriter(str(path))
+    writer.begin_game("Ana", "Bia")
+    for _, move in random_game(4, max_plies=5):
+        writer.add_move(move)
+
+    record, = read_games(str(path))
+    assert not record.finished
+    assert len(record.moves) == 5
+    writer.close()
+
+
+def test_write_game_keeps_tags_and_result(tmp_path):
+    path = tmp_path / "games.pdn"
+    moves = [move.notation for _, move in random_game(5, max_plies=30)]
+    tags = game_tags("Ana \"A\"", "Bia\\B", Round="2")
+    with GameRecordWriter(str(path)) as writer:
+        writer.write_game(GameRecord(tags, moves, "1/2-1/2"))
+
+    record, = read_games(str(path))
+    assert record.tags["Player1"] == "Ana \"A\"" and record.tags["Player2"] == "Bia\\B"
+    assert record.tags["Round"] == "2"
+    assert record.moves == moves
+    assert record.finished and record.winner is None
+
+
+def test_reader_skips_comments_and_accepts_compact_numbers():
+    text = io.StringIO('[Event "x"]\n\n1.a3-a4 {abertura} h6-h5 2. a4-a5 {comentário\nem duas linhas} 0-1\n')
+
+    record, = read_games(text)
+    assert record.moves == ["a3-a4", "h6-h5", "a4-a5"]
+    assert record.winner == Owner.PLAYER2.value
+
+
+def test_reader_rejects_invalid_moves():
+    with pytest.raises(ValueError):
+        list(read_games(io.StringIO('[Event "x"]\n\n1. a3-z9 *\n')))
+
+
+def test_replay_rejects_illegal_moves():
+    record, = read_games(io.StringIO('[Event "x"]\n\n1. a3-a5 *\n'))
+    with pytest.raises(ValueError):
+        list(replay(record))
@@ -0,0 +1,30 @@
+import pytest
+
+import load_test
+
+
+@pytest.mark.parametrize("long_poll", [False, True])
+def test_every_client_finishes_its_games(dog_server, monkeypatch, long_poll):
+    _, url = dog_server
+    monkeypatch.setenv("DOG_SERVER_URL", url)
+    report = load_test.run_load(4, 1, max_plies=20, long_poll=long_poll, timeout=60)
+    assert (report["clients"], report["games"], report["unfinished"], report["withdrawals"]) == (4, 2, 0, 0)
+    assert report["moves"] > 0
+    assert report["p50_ms"] <= report["p95_ms"] <= report["max_ms"]
+    assert report["requests"]["move/"]["failures"] == 0
+
+
+def test_consecutive_runs_are_not_paired_with_old_clients(dog_server, monkeypatch):
+    # Os clientes da primeira execução continuam "conectados" no servidor
+    server, url = dog_server
+    server.player_timeout = 60
+    monkeypatch.setenv("DOG_SERVER_URL", url)
+    for _ in range(2):
+        report = load_test.run_load(2, 1, max_plies=10, timeout=60)
+        assert (report["games"], report["unfinished"]) == (1, 0)
+
+
+def test_percentile():
+    assert load_test.percentile([], 0.5) == 0.0
+    assert load_test.percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 3.0
+    assert load_test.percentile([1.0, 2.0], 0.99) == 2.0
@@ -0,0 +1,51 @@
+import pytest
+
+from move import Move
+from move_codec import decode_move, encode_move, from_wire, move_from_dict, move_to_dict, parse_payload, to_wire
+from conftest import random_game
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_legal_moves_round_trip(seed):
+    for board, _ in random_game(seed):
+        for move in board.generate_legal_moves():
+            assert decode_move(encode_move(move)) == move
+            assert move_from_dict(move_to_dict(move)) == move
+
+
+def test_wire_round_trip():
+    move = Move(49, (33, 35, 51, 49), (41, 34, 43, 50), False)
+    a_move = dict(move_to_dict(move), winner=None, match_status="next")
+    wire = to_wire(a_move)
+    assert "origin" not in wire
+    assert from_wire(parse_payload(repr(wire))) == a_move
+
+
+def test_finished_match_passes_through():
+    a_move = {"match_status": "finished", "winner": "a"}
+    assert to_wire(a_move) == a_move
+    assert from_wire(a_move) == a_move
+
+
+@pytest.mark.parametrize("text", [
+    "", "1", "1\x00", "9ab", "1ab.", "1abc.d", "1abc.dd", "1ab*x", None, 42,
+])
+def test_decode_rejects_malformed_moves(text):
+    with pytest.raises(ValueError):
+        decode_move(text)
+
+
+def test_move_from_dict_rejects_squares_off_the_board():
+    with pytest.raises(ValueError):
+        move_from_dict({"origin": {"row": 8, "col": 0}, "destination": {"row": 7, "col": 0}})
+
+
+@pytest.mark.parametrize("text", ["", "{", "[1, 2]", "__import__('os')", "{'a': f()}"])
+def test_parse_payload_rejects_invalid_payloads(text):
+    with pytest.raises(ValueError):
+        parse_payload(text)
+
+
+def test_parse_payload_reads_flat_and_json():
+    assert parse_payload("{'m': '1ab', 'winner': None, 'n': 3}") == {"m": "1ab", "winner": None, "n": 3}
+    assert parse_payload('{"m": "1ab", "winner": null}') == {"m": "1ab", "winner": None}
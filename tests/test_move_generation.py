@@ -0,0 +1,34 @@
+from bitboard import UP, generate_legal_moves
+from move import Move
+
+
+def bits(*squares: int) -> int:
+    return sum(1 << square for square in squares)
+
+
+def test_initial_position_has_only_forward_steps(board):
+    moves = board.generate_legal_moves()
+    assert len(moves) == 8
+    assert all(move.path == (move.origin - 8,) and not move.captured for move in moves)
+
+
+def test_capture_is_mandatory_and_the_longest_sequence_wins():
+    # Captura simples para a direita (44) ou dupla para cima (35 e 19): só a dupla é legal
+    moves = generate_legal_moves(bits(43), bits(35, 19, 44), 0, UP)
+    assert moves == [Move(43, (27, 11), (35, 19), False)]
+
+
+def test_men_never_move_or_capture_backwards():
+    moves = generate_legal_moves(bits(43), bits(51), 0, UP)
+    assert sorted(move.path for move in moves) == [(35,), (42,), (44,)]
+
+
+def test_man_promotes_on_the_last_row():
+    (move,) = [move for move in generate_legal_moves(bits(11), bits(63), 0, UP) if move.path == (3,)]
+    assert move.promotes
+
+
+def test_king_can_capture_around_back_to_its_square():
+    moves = generate_legal_moves(bits(49), bits(41, 34, 43, 50), bits(49), UP)
+    assert sorted(moves) == sorted([Move(49, (33, 35, 51, 49), (41, 34, 43, 50), False),
+                                    Move(49, (51, 35, 33, 49), (50, 43, 34, 41), False)])
@@ -0,0 +1,86 @@
+import pytest
+
+from board import Board
+from opening_book import OpeningBook, OpeningBookBuilder
+from conftest import random_game
+
+
+def notations(seed, plies):
+    return [move.notation for _, move in random_game(seed, plies)]
+
+
+def test_write_then_probe(tmp_path):
+    path = str(tmp_path / "book.bin")
+    builder = OpeningBookBuilder(plies=4)
+    main_line = notations(0, 4)
+    for _ in range(3):
+        builder.add_game(main_line, 1)
+    builder.add_game(notations(1, 4), None)
+    count = builder.write(path)
+
+    board = Board()
+    with OpeningBook(path) as book:
+        assert len(book) == count
+        assert book.plies == 4
+        entries = book.probe(board.hash)
+        assert sum(entry.games for entry in entries) == 4
+        chosen = book.choose_move(board)
+        assert chosen.notation == main_line[0]
+        (entry,) = [entry for entry in entries if entry.move == (chosen.origin, chosen.destination)]
+        assert (entry.games, entry.wins) == (3, 3)
+        assert book.probe(board.hash ^ 1) == []
+
+
+def test_min_games_filters_records(tmp_path):
+    path = str(tmp_path / "book.bin")
+    builder = OpeningBookBuilder(plies=2)
+    builder.add_game(notations(2, 2), 2)
+    assert builder.write(path, min_games=2) == 0
+    with OpeningBook(path) as book:
+        assert book.choose_move(Board()) is None
+
+
+def test_illegal_move_is_rejected():
+    with pytest.raises(ValueError):
+        OpeningBookBuilder(plies=2).add_game(["a1-a2"], None)
+
+
+def test_min_score_filters_moves(tmp_path):
+    path = str(tmp_path / "book.bin")
+    builder = OpeningBookBuilder(plies=2)
+    line = notations(2, 2)
+    builder.add_game(line, 2) # O player1 jogou e perdeu
+    builder.write(path)
+    with OpeningBook(path) as book:
+        assert book.choose_move(Board()).notation == line[0]
+        assert book.choose_move(Board(), min_score=0.5) is None
+
+
+def write_book(path, games):
+    builder = OpeningBookBuilder(plies=2)
+    for line, winner in games:
+        builder.add_game(line, winner)
+    builder.write(path)
+
+
+def test_engine_plays_the_book_move(tmp_path):
+    from engine import Engine
+    from engine.search import BOOK_MIN_GAMES
+
+    path = str(tmp_path / "book.bin")
+    line = notations(4, 2)
+    write_book(path, [(line, 1)] * BOOK_MIN_GAMES)
+    with OpeningBook(path) as book:
+        result = Engine(book=book).search(Board(), time_ms=1000)
+    assert (result.best_move.notation, result.nodes) == (line[0], 0)
+
+
+@pytest.mark.parametrize("games, winner", [(1, 1), (20, 2)])
+def test_engine_searches_past_thin_or_losing_book_moves(tmp_path, games, winner):
+    from engine import Engine
+
+    path = str(tmp_path / "book.bin")
+    write_book(path, [(notations(4, 2), winner)] * games)
+    with OpeningBook(path) as book:
+        result = Engine(book=book).search(Board(), time_ms=1000, max_depth=2)
+    assert result.nodes > 0
@@ -0,0 +1,150 @@
+import pytest
+
+from bitboard import DOWN, UP, generate_legal_moves
+from conftest import random_game
+from move import Move
+from owner import Owner
+from perft import GOLDEN_NODES, divide, perft_board
+
+# Gerador de referência: o gerador do Board original, casa a casa (get_possible_moves_as_man/king,
+# get_capture_moves_as_man/king e verify_multiple_capture), sobre uma lista de 64 casas com
+# None ou (é de quem joga, é dama). Quem joga sempre anda para cima: o player2 é espelhado.
+# O Board original não tinha a regra da maioria; ela é aplicada por cima, ao fim das sequências
+MAN_DIRECTIONS = ((-1, 0), (0, -1), (0, 1)) # Frente, esquerda e direita
+KING_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def on_board(row, col):
+    return 0 <= row < 8 and 0 <= col < 8
+
+
+def capture_hops(grid, square):
+    """(pouso, capturada) de um salto da peça na casa, como get_capture_moves_as_man/king"""
+
+    row, col = divmod(square, 8)
+    is_king = grid[square][1]
+    hops = []
+    for d_row, d_col in KING_DIRECTIONS if is_king else MAN_DIRECTIONS:
+        r, c = row + d_row, col + d_col
+        enemy = None
+        while on_board(r, c):
+            piece = grid[r * 8 + c]
+            if piece is not None:
+                if piece[0] or enemy is not None:
+                    break
+                enemy = r * 8 + c
+            elif enemy is not None:
+                hops.append((r * 8 + c, enemy))
+                break
+            elif not is_king:
+                break
+            r, c = r + d_row, c + d_col
+    return hops
+
+
+def step_targets(grid, square):
+    row, col = divmod(square, 8)
+    is_king = grid[square][1]
+    targets = []
+    for d_row, d_col in KING_DIRECTIONS if is_king else MAN_DIRECTIONS:
+        r, c = row + d_row, col + d_col
+        while on_board(r, c) and grid[r * 8 + c] is None:
+            targets.append(r * 8 + c)
+            if not is_king:
+                break
+            r, c = r + d_row, c + d_col
+    return targets
+
+
+def capture_sequences(grid, origin, square, path, captured, out):
+    # A peça capturada sai na hora, como em move_piece; a promoção só vem no fim do turno
+    hops = capture_hops(grid, square)
+    if not hops and captured:
+        out.append(Move(origin, tuple(path), tuple(captured), not grid[square][1] and square < 8))
+    for landing, enemy in hops:
+        child = list(grid)
+        child[landing], child[square], child[enemy] = grid[square], None, None
+        capture_sequences(child, origin, landing, path + [landing], captured + [enemy], out)
+
+
+def reference_moves(grid):
+    own = [square for square, piece in enumerate(grid) if piece is not None and piece[0]]
+    captures = []
+    for square in own:
+        capture_sequences(grid, square, square, [], [], captures)
+    if captures:
+        most = max(len(move.captured) for move in captures)
+        return [move for move in captures if len(move.captured) == most]
+    return [Move(square, (target,), (), not grid[square][1] and target < 8)
+            for square in own for target in step_targets(grid, square)]
+
+
+def reference_play(grid, move):
+    """Posição seguinte, já do ponto de vista do adversário (espelhada)"""
+
+    child = list(grid)
+    piece = child[move.origin]
+    for square in move.captured:
+        child[square] = None
+    child[move.origin] = None
+    child[move.destination] = (True, piece[1] or move.promotes)
+    return [None if child[mirror(square)] is None else (not child[mirror(square)][0], child[mirror(square)][1])
+            for square in range(64)]
+
+
+def mirror(square):
+    row, col = divmod(square, 8)
+    return (7 - row) * 8 + col
+
+
+def reference_perft(grid, depth):
+    moves = reference_moves(grid)
+    if depth == 1:
+        return len(moves)
+    return sum(reference_perft(reference_play(grid, move), depth - 1) for move in moves)
+
+
+def reference_grid(board):
+    bb = board.bitboard
+    player1_to_move = board.side_to_move == Owner.PLAYER1.value
+    own = bb.player1 if player1_to_move else bb.player2
+    grid = [None] * 64
+    for square in range(64):
+        source = square if player1_to_move else mirror(square)
+        if (bb.player1 | bb.player2) >> source & 1:
+            grid[square] = (bool(own >> source & 1), bool(bb.kings >> source & 1))
+    return grid
+
+
+def mirrored_move(move):
+    return Move(mirror(move.origin), tuple(map(mirror, move.path)), tuple(map(mirror, move.captured)), move.promotes)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4, 5])
+def test_perft_from_initial_position(board, depth):
+    assert perft_board(board, depth) == GOLDEN_NODES[depth]
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_golden_nodes_match_the_reference_generator(board, depth):
+    # GOLDEN_NODES saiu do gerador de bitboards; o gerador casa a casa do Board original confere
+    assert reference_perft(reference_grid(board), depth) == GOLDEN_NODES[depth]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_legal_moves_match_the_reference_generator(seed):
+    for board, _ in random_game(seed, max_plies=200):
+        moves = reference_moves(reference_grid(board))
+        if board.side_to_move != Owner.PLAYER1.value:
+            moves = [mirrored_move(move) for move in moves]
+        assert sorted(moves) == sorted(board.generate_legal_moves())
+
+
+def test_perft_leaves_board_untouched(board):
+    before = board.position_string()
+    perft_board(board, 3)
+    assert board.position_string() == before
+
+
+def test_divide_sums_to_perft(board):
+    assert sum(nodes for _, nodes in divide(board, 3)) == GOLDEN_NODES[3]
@@ -0,0 +1,87 @@
+import pytest
+
+from dog import polling_thread
+from dog.polling_thread import IDLE_INTERVAL, LONG_POLL_WAIT, MAX_INTERVAL, MIN_INTERVAL, PollingThread
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubProxy:
+    """Responde match_status com as respostas dadas; cada consulta leva `duration` segundos"""
+
+    def __init__(self, status, answers, clock, duration=0.0):
+        self.status = status
+        self.answers = list(answers)
+        self.clock = clock
+        self.duration = duration
+        self.waits = []
+
+    def get_status(self):
+        return self.status
+
+    def match_status(self, wait=0):
+        self.waits.append(wait)
+        self.clock.now += self.duration
+        return self.answers.pop(0)
+
+    start_status = match_status
+
+
+def run(proxy, polls, long_poll=False):
+    """Roda o laço da PollingThread na thread do teste e retorna as esperas pedidas"""
+
+    thread = PollingThread(proxy, True, long_poll)
+    delays = []
+
+    def wait(delay):
+        delays.append(delay)
+        if len(delays) == polls:
+            thread.stop_event.set()
+
+    thread.wait = wait
+    thread.run()
+    return delays
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(polling_thread.time, "monotonic", clock)
+    monkeypatch.setattr(polling_thread.random, "uniform", lambda low, high: 1.0)
+    return clock
+
+
+def test_interval_backs_off_while_nothing_happens(clock):
+    delays = run(StubProxy(3, [False] * 6, clock), 6)
+    assert delays == [MIN_INTERVAL, MIN_INTERVAL * 2, MIN_INTERVAL * 4, MAX_INTERVAL, MAX_INTERVAL, MAX_INTERVAL]
+
+
+def test_news_resets_the_interval(clock):
+    delays = run(StubProxy(3, [False, False, True, False], clock), 4)
+    assert delays == [MIN_INTERVAL, MIN_INTERVAL * 2, MIN_INTERVAL, MIN_INTERVAL * 2]
+
+
+def test_long_poll_counts_the_time_held_by_the_server(clock):
+    proxy = StubProxy(3, [False, False], clock, duration=LONG_POLL_WAIT)
+    delays = run(proxy, 2, long_poll=True)
+    assert proxy.waits == [LONG_POLL_WAIT, LONG_POLL_WAIT]
+    assert all(delay <= 0 for delay in delays)
+
+
+def test_idle_without_match(clock):
+    assert run(StubProxy(1, [], clock), 2) == [IDLE_INTERVAL, IDLE_INTERVAL]
+
+
+def test_poll_now_wakes_the_thread_and_resets_the_interval():
+    thread = PollingThread(StubProxy(3, [], Clock()), True)
+    thread.interval = MAX_INTERVAL
+    thread.poll_now()
+    thread.wait(60) # Retorna na hora: o evento já está marcado
+    assert thread.interval == MIN_INTERVAL
+    assert not thread.wake_event.is_set()
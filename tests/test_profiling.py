@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+import profiling
+from board import Board
+
+
+class Counted:
+    """Classe com os métodos instrumentados; cada um só devolve o próprio nome"""
+
+
+for name in profiling.PROFILED_METHODS + (profiling.TURN_METHOD,):
+    setattr(Counted, name, lambda self, name=name: name)
+
+
+@pytest.fixture(autouse=True)
+def clean_profiling():
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_enable_counts_calls_and_turns():
+    profiling.enable(Counted)
+    assert profiling.is_enabled()
+    counted = Counted()
+    assert counted.move_piece() == "move_piece"
+    counted.move_piece()
+    counted.get_possible_moves()
+    counted.switch_turn()
+
+    stats = profiling.snapshot()
+    assert stats["turns"] == 1
+    assert stats["methods"]["move_piece"]["calls"] == 2
+    assert stats["methods"]["get_possible_moves"]["calls"] == 1
+    assert stats["methods"]["receive_move"]["calls"] == 0
+    assert stats["methods"]["move_piece"]["total_ms"] >= 0
+
+    output = io.StringIO()
+    profiling.dump(output)
+    assert "move_piece" in output.getvalue() and "1 turns" in output.getvalue()
+
+
+def test_disable_restores_the_methods_and_keeps_the_numbers():
+    originals = {name: Counted.__dict__[name] for name in profiling.PROFILED_METHODS}
+    profiling.enable(Counted)
+    assert Counted.__dict__["move_piece"] is not originals["move_piece"]
+    Counted().move_piece()
+    profiling.disable()
+
+    assert not profiling.is_enabled()
+    assert {name: Counted.__dict__[name] for name in profiling.PROFILED_METHODS} == originals
+    assert profiling.snapshot()["methods"]["move_piece"]["calls"] == 1
+    profiling.reset()
+    assert profiling.snapshot()["methods"]["move_piece"]["calls"] == 0
+
+
+def test_board_is_untouched_when_disabled():
+    original = Board.__dict__["move_piece"]
+    profiling.enable()
+    assert Board.__dict__["move_piece"] is not original
+    profiling.disable()
+    assert Board.__dict__["move_piece"] is original
+
+
+def test_profile_session_writes_the_profile(tmp_path):
+    path = tmp_path / "session.prof"
+    output = io.StringIO()
+    with profiling.profile_session(str(path), file=output):
+        sum(range(1000))
+    assert path.exists()
+    assert "function calls" in output.getvalue()
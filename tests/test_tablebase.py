@@ -0,0 +1,45 @@
+import pytest
+
+from board import Board
+from tablebase import Material, Outcome, Tablebase, TablebaseBuilder, decode
+
+
+@pytest.fixture(scope="module")
+def builder():
+    builder = TablebaseBuilder(2)
+    builder.build()
+    return builder
+
+
+@pytest.fixture
+def tablebase(builder, tmp_path):
+    path = tmp_path / "tb.bin"
+    builder.write(str(path))
+    with Tablebase(str(path)) as tablebase:
+        yield tablebase
+
+
+def test_probe_matches_builder_tables(builder, tablebase):
+    assert tablebase.max_pieces == 2
+    for material, table in builder.tables.items():
+        assert material in tablebase
+        for index, own, enemy, kings in material.positions():
+            assert tablebase.probe(own, enemy, kings) == decode(table[index])
+
+
+def test_adjacent_king_captures_and_wins(tablebase):
+    # Dama na casa 0 salta a dama adversária da casa 1
+    assert tablebase.probe(1 << 0, 1 << 1, 1 << 0 | 1 << 1) == (Outcome.WIN, 1)
+    assert Material(0, 1, 0, 1) in tablebase
+
+
+def test_best_move_takes_the_win(tablebase):
+    board = Board()
+    board.load_position("XO....../......../......../......../......../......../......../........ 1")
+    assert tablebase.probe_board(board) == (Outcome.WIN, 1)
+    assert tablebase.best_move(board).captured == (1,)
+
+
+def test_builder_rejects_single_piece():
+    with pytest.raises(ValueError):
+        TablebaseBuilder(1)
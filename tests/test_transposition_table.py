@@ -0,0 +1,66 @@
+import pytest
+
+from move import Move
+from transposition_table import Bound, TTEntry, TranspositionTable
+
+# Chaves que diferem só nos bits altos caem no mesmo bucket
+A, B, C, D = (5 | index << 48 for index in range(1, 5))
+
+
+@pytest.fixture
+def table():
+    return TranspositionTable(0.01)
+
+
+def test_store_then_probe(table):
+    table.store(A, 6, -1234, Bound.LOWER.value, Move(43, (27, 11), (35, 19), False))
+    assert table.probe(A) == TTEntry(6, -1234, Bound.LOWER.value, (43, 11))
+    assert table.probe(B) is None
+    assert (table.probes, table.hits, table.stores) == (2, 1, 1)
+
+
+def test_size_is_bounded():
+    table = TranspositionTable(1)
+    assert table.size_bytes <= 1024 * 1024
+    assert table.size & (table.size - 1) == 0
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
+
+
+def test_shallow_entries_use_the_always_replace_slot(table):
+    table.store(A, 5, 10, Bound.EXACT.value)
+    table.store(B, 3, 20, Bound.EXACT.value)
+    table.store(C, 2, 30, Bound.EXACT.value) # Substitui B, não a entrada mais profunda
+    assert table.probe(A).depth == 5
+    assert table.probe(B) is None
+    assert table.probe(C).score == 30
+
+
+def test_deeper_entry_moves_the_old_one_to_the_replace_slot(table):
+    table.store(A, 5, 10, Bound.EXACT.value)
+    table.store(D, 7, 40, Bound.EXACT.value)
+    assert table.probe(D).depth == 7
+    assert table.probe(A).depth == 5
+
+
+def test_entries_from_an_older_search_are_replaceable(table):
+    table.store(A, 9, 10, Bound.EXACT.value)
+    table.new_search()
+    table.store(B, 1, 20, Bound.EXACT.value) # Mais rasa, mas a de A é de outra busca
+    table.store(C, 1, 30, Bound.EXACT.value)
+    assert table.probe(B).score == 20
+    assert table.probe(C).score == 30
+    assert table.probe(A) is None
+
+
+def test_same_key_is_updated_in_place(table):
+    table.store(A, 8, 10, Bound.EXACT.value)
+    table.store(A, 2, 50, Bound.UPPER.value)
+    assert table.probe(A) == TTEntry(2, 50, Bound.UPPER.value, None)
+
+
+def test_clear_empties_the_table(table):
+    table.store(A, 5, 10, Bound.EXACT.value)
+    table.clear()
+    assert table.probe(A) is None
+    assert table.hashfull() == 0